@@ -1,11 +1,14 @@
 import os
 import shutil
 import sys
+import threading
 import time
 import unittest
 from os import listdir
 
-from core.device.emulator import Emulator
+from core.device.emulator import Emulator, EmulatorPool
+from core.device.helpers.android_uiautomator import UIAuto
+from core.device.helpers.logcat import Logcat
 from core.device.simulator import Simulator
 from core.gradle.gradle import Gradle
 from core.logger import Logger
@@ -14,25 +17,30 @@ from core.osutils.folder import Folder
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
 from core.osutils.screen import Screen
-from core.settings.settings import OUTPUT_FOLDER, TEST_RUN_HOME, CURRENT_OS
+from core.settings.context import Context, ContextAttribute
+from core.settings.settings import CURRENT_OS
 from core.tns.tns import Tns
 
 
 class BaseClass(unittest.TestCase):
-    app_name = "TestApp"
-    app_name_ts = "TestAppTS"
-    app_name_ng = "TestAppNG"
+    # App names are resolved from current context (can be overwritten in test classes)
+    app_name = ContextAttribute('app_name')
+    app_name_ts = ContextAttribute('app_name_ts')
+    app_name_ng = ContextAttribute('app_name_ng')
 
     errors = 0
     failures = 0
 
+    # Context with emulator leased from emulator pool by class running in current thread (only if pool is started)
+    __leases = threading.local()
+
     @classmethod
     def __copy_images(cls, artifacts_folder):
         """
         Archive test app (without platforms and node_modules)
         :param artifacts_folder: Base folder where artifacts from failed tests are stored.
         """
-        src = os.path.join(TEST_RUN_HOME, 'out', 'images')
+        src = os.path.join(Context.current().output_folder, 'images')
         dest = os.path.join(artifacts_folder, 'artifacts')
         if os.path.isdir(src):
             try:
@@ -49,7 +57,7 @@ class BaseClass(unittest.TestCase):
         Archive test app (without platforms and node_modules)
         :param artifacts_folder: Base folder where artifacts from failed tests are stored.
         """
-        src = os.path.join(TEST_RUN_HOME, cls.app_name)
+        src = os.path.join(Context.current().test_run_home, cls.app_name)
         dest = os.path.join(artifacts_folder, cls.app_name)
         if os.path.isdir(src):
             try:
@@ -74,6 +82,31 @@ class BaseClass(unittest.TestCase):
         screen_path = os.path.join(artifacts_folder, "{0}.png".format(test_method_name))
         Screen.save_screen(screen_path)
 
+    @staticmethod
+    def __lease_emulator():
+        """
+        Lease emulator from emulator pool and use it in current thread until `__release_emulator` is called.
+        Lease of previous class is released first (it is left when setUpClass of that class fails,
+        because tearDownClass is not called then).
+        """
+        if getattr(BaseClass.__leases, 'context', None) is not None:
+            print 'Release emulator leased by previous test class.'
+            BaseClass.__release_emulator()
+        context = EmulatorPool.lease()
+        context.__enter__()
+        BaseClass.__leases.context = context
+
+    @staticmethod
+    def __release_emulator():
+        """
+        Return emulator leased in current thread to emulator pool.
+        """
+        context = getattr(BaseClass.__leases, 'context', None)
+        if context is not None:
+            BaseClass.__leases.context = None
+            context.__exit__(None, None, None)
+            EmulatorPool.release(context)
+
     @classmethod
     def IsFailed(cls, res):
         is_failed = False
@@ -96,24 +129,34 @@ class BaseClass(unittest.TestCase):
         print "Start Time:  {0}".format(time.strftime("%X"))
         print ""
 
-        Tns.kill()
-        Gradle.kill()
-        Process.kill('node')
-        Process.kill('adb')
-        if CURRENT_OS == OSType.OSX:
-            Process.kill('NativeScript Inspector')
-            Process.kill('Safari')
-            Process.kill('Xcode')
-
-        if class_name is not None:
-            logfile = os.path.join('out', class_name + '.txt')
-        else:
-            logfile = os.path.join(OUTPUT_FOLDER, cls.__name__ + ".txt")
+        # Lease blocks until snapshot of released emulator is loaded, so it is done before processes are killed
+        if EmulatorPool.is_started():
+            BaseClass.__lease_emulator()
+
+        try:
+            Tns.kill()
+            Gradle.kill()
+            Logcat.stop()
+            filters = [('node', None)]
+            if not EmulatorPool.is_started():
+                # Emulator pool restores emulators in background via adb, so adb is killed only without pool
+                filters.append(('adb', None))
+            if CURRENT_OS == OSType.OSX:
+                filters += [('NativeScript Inspector', None), ('Safari', None), ('Xcode', None)]
+            Process.kill_all(filters)
+
+            if class_name is not None:
+                logfile = os.path.join(Context.current().output_folder, class_name + '.txt')
+            else:
+                logfile = os.path.join(Context.current().output_folder, cls.__name__ + ".txt")
 
-        File.remove(logfile)
-        sys.stdout = sys.stderr = Logger.Logger(logfile)
+            File.remove(logfile)
+            sys.stdout = sys.stderr = Logger.Logger(logfile)
 
-        Folder.cleanup(cls.app_name)
+            Folder.cleanup(cls.app_name)
+        except:
+            BaseClass.__release_emulator()
+            raise
 
     def setUp(self):
         print ""
@@ -121,12 +164,12 @@ class BaseClass(unittest.TestCase):
         print "Test Method: {0}".format(self._testMethodName)
         print "Start Time:  {0}".format(time.strftime("%X"))
         print ""
-        Folder.cleanup(os.path.join(TEST_RUN_HOME, 'out', 'images'))
+        Folder.cleanup(os.path.join(Context.current().output_folder, 'images'))
 
     def tearDown(self):
         # Logic executed only on test failure
         test_name = self._testMethodName
-        artifacts_folder = os.path.join(OUTPUT_FOLDER, self.__class__.__name__ + "_" + test_name)
+        artifacts_folder = os.path.join(Context.current().output_folder, self.__class__.__name__ + "_" + test_name)
         outcome = "PASSED"
         if self.IsFailed(self._resultForDoCleanups) is True:
             outcome = "FAILED"
@@ -152,9 +195,11 @@ class BaseClass(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         Tns.kill()
+        Logcat.stop()
+        UIAuto.stop()
         Emulator.stop()
+        BaseClass.__release_emulator()
         Gradle.kill()
         if CURRENT_OS == OSType.OSX:
-            Process.kill('NativeScript Inspector')
-            Process.kill('Safari')
+            Process.kill_all([('NativeScript Inspector', None), ('Safari', None)])
             Simulator.stop()
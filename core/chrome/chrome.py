@@ -7,14 +7,15 @@ from core.osutils.command import run
 from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
-from core.settings.settings import TEST_RUN_HOME, CURRENT_OS
+from core.settings.context import Context
+from core.settings.settings import CURRENT_OS
 
 
 class Chrome(object):
     @staticmethod
     def start(url=""):
         if CURRENT_OS is OSType.OSX:
-            chrome_path = os.path.join(TEST_RUN_HOME, 'core', 'chrome', 'start_chrome')
+            chrome_path = os.path.join(Context.current().test_run_home, 'core', 'chrome', 'start_chrome')
             command = "osascript " + chrome_path + " " + url.replace("&", "\&")
             run(command=command, log_level=CommandLogLevel.SILENT)
             print "Open Google Chrome at {0}".format(url)
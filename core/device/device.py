@@ -4,9 +4,9 @@ Helper for working with real devices
 import os
 import time
 
-import pytesseract
 from PIL import Image
 
+from core.device.device_executor import DeviceExecutor
 from core.device.device_type import DeviceType
 from core.device.helpers.adb import Adb
 from core.device.helpers.android_uiautomator import UIAuto
@@ -17,9 +17,12 @@ from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.image_utils import ImageUtils
-from core.settings.settings import OUTPUT_FOLDER
+from core.osutils.ocr import Ocr
+from core.settings.context import Context
 from core.tns.tns_platform_type import Platform
 
+SCREEN_POLL_INTERVAL = 0.5
+
 
 class Device(object):
     @staticmethod
@@ -67,6 +70,27 @@ class Device(object):
                 image_saved = True
         return image_saved
 
+    @staticmethod
+    def get_screen_image(device_id):
+        """
+        Get screen of mobile device as PIL Image.
+        Screen of Android devices is captured in memory, screen of iOS devices is saved in `out` folder first.
+        :param device_id: Device identifier (example: `emulator-5554`).
+        :return: PIL Image (None if screen is not captured).
+        """
+        device_type = Device.__get_device_type(device_id)
+        if (device_type == DeviceType.EMULATOR) or (device_type == DeviceType.ANDROID):
+            try:
+                return Adb.get_screen_image(device_id=device_id)
+            except IOError as e:
+                print 'Failed to capture screen in memory: {0}'.format(e)
+        file_path = os.path.join(Context.current().output_folder, "images", device_id, "screen.png")
+        if Device.get_screen(device_id=device_id, file_path=file_path):
+            image = Image.open(file_path)
+            image.load()
+            return image
+        return None
+
     @staticmethod
     def screen_match(device_name, device_id, expected_image, tolerance=0.1, timeout=30):
         """
@@ -87,9 +111,11 @@ class Device(object):
 
         print "Verify {0} looks correct...".format(expected_image)
         expected_image_original_path = os.path.join("data", "images", device_name, "{0}.png".format(expected_image))
-        actual_image_path = os.path.join(OUTPUT_FOLDER, "images", device_name, "{0}_actual.png".format(expected_image))
-        diff_image_path = os.path.join(OUTPUT_FOLDER, "images", device_name, "{0}_diff.png".format(expected_image))
-        expected_image_path = os.path.join(OUTPUT_FOLDER, "images", device_name,
+        actual_image_path = os.path.join(Context.current().output_folder, "images", device_name,
+                                         "{0}_actual.png".format(expected_image))
+        diff_image_path = os.path.join(Context.current().output_folder, "images", device_name,
+                                       "{0}_diff.png".format(expected_image))
+        expected_image_path = os.path.join(Context.current().output_folder, "images", device_name,
                                            "{0}_expected.png".format(expected_image))
 
         if File.exists(expected_image_original_path):
@@ -97,10 +123,20 @@ class Device(object):
             diff = 100.0
             are_equal = False
             comparison_result = None
+            actual_image = None
             while time.time() < t_end:
-                time.sleep(1)
-                if Device.get_screen(device_id=device_id, file_path=actual_image_path):
-                    comparison_result = ImageUtils.image_match(actual_image_path=actual_image_path,
+                time.sleep(SCREEN_POLL_INTERVAL)
+                actual_image = Device.get_screen_image(device_id=device_id)
+                comparison_result = None
+                if actual_image is None:
+                    print "Failed to get image from {0}".format(device_id)
+                elif not ImageUtils.is_near_match(actual_image=actual_image,
+                                                  expected_image_path=expected_image_original_path,
+                                                  tolerance=tolerance):
+                    # Obvious mismatch, exact diff is calculated only for reporting after timeout.
+                    print "{0} does not match. Wait...".format(expected_image)
+                else:
+                    comparison_result = ImageUtils.image_match(actual_image_path=actual_image,
                                                                expected_image_path=expected_image_original_path,
                                                                tolerance=tolerance)
                     are_equal = comparison_result[0]
@@ -109,16 +145,21 @@ class Device(object):
                         print "{0} looks OK.".format(expected_image)
                         break  # Exist if images look OK.
                     else:
-                        time.sleep(2)
                         print "{0} does not match. Diff is {1} %. Wait...".format(expected_image, diff)
-                else:
-                    print "Failed to get image from {0}".format(device_id)
 
             # Report results after timeout is over
+            assert actual_image is not None, "Failed to get image from {0}".format(device_id)
+            if not are_equal and comparison_result is None:
+                comparison_result = ImageUtils.image_match(actual_image_path=actual_image,
+                                                           expected_image_path=expected_image_original_path,
+                                                           tolerance=tolerance)
+                diff = comparison_result[1]
             if not are_equal:
                 # Save expected and diff images (actual is already there)
-                diff_image_final_path = os.path.join("out", diff_image_path)
+                diff_image_final_path = diff_image_path
                 print "Diff image will be saved at " + diff_image_final_path
+                Folder.create(os.path.dirname(actual_image_path))
+                actual_image.save(actual_image_path)
                 File.copy(src=expected_image_original_path, dest=expected_image_path)
                 comparison_result[2].save(diff_image_final_path)
                 # Get logs (from android devices).
@@ -145,14 +186,9 @@ class Device(object):
         :param device_id: Device identifier (example: `emulator-5554`).
         :return: All the text visible on screen as string
         """
-        img_name = "actual_{0}_{1}.png".format(device_id, time.time())
-        actual_image_path = os.path.join(OUTPUT_FOLDER, "images", device_id, img_name)
-        if File.exists(actual_image_path):
-            File.remove(actual_image_path)
-        Device.get_screen(device_id=device_id, file_path=actual_image_path)
-        image = Image.open(actual_image_path).convert('LA')
-        text = pytesseract.image_to_string(image)
-        return text
+        image = Device.get_screen_image(device_id=device_id)
+        assert image is not None, "Failed to get screen of " + device_id
+        return Ocr.get_text(image)
 
     @staticmethod
     def get_log(device_id):
@@ -192,14 +228,23 @@ class Device(object):
         :return: True if text found, False if not found.
         """
 
-        # IMPORTANT NOTE !!!!
-        # UIAuto.wait_for_text() does not work well with cases when you specify partial text of element.
-        # Example: Element text is "42 taps left" and you try to wait for "taps" string only
-        # TODO: Think about some fix (may be xpath on view hierarchy)
-
+        # On Android text is searched in view hierarchy (partial text of elements is also found),
+        # OCR is used only if view hierarchy is not available.
         device_type = Device.__get_device_type(device_id)
         if device_type == DeviceType.ANDROID or device_type == DeviceType.EMULATOR:
-            return Adb.wait_for_text(device_id=device_id, text=text, timeout=timeout)
+            t_end = time.time() + timeout
+            while time.time() < t_end:
+                hierarchy = Adb.get_hierarchy(device_id=device_id)
+                if hierarchy is not None:
+                    found = hierarchy.contains_text(text)
+                else:
+                    found = text in Device.get_screen_text(device_id=device_id)
+                if found:
+                    print text + " found on screen of " + device_id
+                    return True
+                time.sleep(0.2)
+            print text + " NOT found on screen of " + device_id
+            return False
         else:
             t_end = time.time() + timeout
             found = False
@@ -244,6 +289,13 @@ class Device(object):
         else:
             raise NotImplementedError("Click on text not implemented for iOS devices and simulators.")
 
+    @staticmethod
+    def __clean_tmp(device_id):
+        """
+        Clean /data/local/tmp of Android device.
+        """
+        Adb.run(command="shell rm -rf /data/local/tmp/*", device_id=device_id, log_level=CommandLogLevel.FULL)
+
     @staticmethod
     def ensure_available(platform):
         """
@@ -258,8 +310,8 @@ class Device(object):
 
         # If device is Android, make sure /data/local/tmp is clean
         if platform == Platform.ANDROID:
-            for device_id in Device.get_ids(platform=Platform.ANDROID, include_emulators=True):
-                Adb.run(command="shell rm -rf /data/local/tmp/*", device_id=device_id, log_level=CommandLogLevel.FULL)
+            DeviceExecutor.run(device_ids=Device.get_ids(platform=Platform.ANDROID, include_emulators=True),
+                               operation=Device.__clean_tmp)
 
     @staticmethod
     def get_id(platform):
@@ -321,12 +373,15 @@ class Device(object):
         """
         device_ids = Device.get_ids(platform=platform, include_emulators=True)
         if platform == Platform.ANDROID:
-            for device_id in device_ids:
-                Adb.uninstall_all_apps(device_id=device_id)
-                Adb.run(command="shell rm -rf /data/local/tmp/*", device_id=device_id, log_level=CommandLogLevel.FULL)
+            def uninstall(device_id):
+                Adb.uninstall_all_apps(device_id=device_id, app_prefix=app_prefix)
+                Device.__clean_tmp(device_id)
         elif platform == Platform.IOS:
-            for device_id in device_ids:
+            def uninstall(device_id):
                 IDevice.uninstall_all_app(device_id=device_id, app_prefix=app_prefix)
+        else:
+            return
+        DeviceExecutor.run(device_ids=device_ids, operation=uninstall)
 
     @staticmethod
     def start_app(device_id, app_id):
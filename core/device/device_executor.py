@@ -0,0 +1,66 @@
+"""
+Run same operation on several devices in parallel.
+"""
+import Queue
+import collections
+import threading
+import traceback
+
+from core.settings.context import Context
+
+MAX_WORKERS = 8
+
+DeviceResult = collections.namedtuple('DeviceResult', ['result', 'error'])
+
+
+class DeviceExecutor(object):
+    @staticmethod
+    def run(device_ids, operation, max_workers=MAX_WORKERS, raise_on_error=True):
+        """
+        Run operation for each device (in pool of threads).
+        Workers use context of caller thread (see `Context`).
+        :param device_ids: List of device identifiers.
+        :param operation: Function that accepts device id.
+        :param max_workers: Max number of devices processed at the same time.
+        :param raise_on_error: If True raise AssertionError (after all devices are processed) if operation fails on
+        any device.
+        :return: Dict with device id as key and DeviceResult (result and error of operation) as value.
+        """
+        device_ids = list(device_ids)
+        results = {}
+        if not device_ids:
+            return results
+
+        context = Context.current()
+        tasks = Queue.Queue()
+        for device_id in device_ids:
+            tasks.put(device_id)
+        lock = threading.Lock()
+
+        def work():
+            with context:
+                while True:
+                    try:
+                        device_id = tasks.get_nowait()
+                    except Queue.Empty:
+                        return
+                    try:
+                        result = DeviceResult(operation(device_id), None)
+                    except Exception as e:
+                        print 'Operation failed on {0}: {1}'.format(device_id, e)
+                        traceback.print_exc()
+                        result = DeviceResult(None, e)
+                    with lock:
+                        results[device_id] = result
+
+        workers = [threading.Thread(target=work) for _ in range(min(max_workers, len(device_ids)))]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        failed = dict((device_id, result.error) for device_id, result in results.items() if result.error is not None)
+        if raise_on_error and failed:
+            raise AssertionError('Operation failed on {0} device(s): {1}'.format(len(failed), failed))
+        return results
@@ -1,51 +1,66 @@
 """
 Helper for working with emulator
 """
+import Queue
+import copy
 import os
+import threading
 import time
 
 from core.device.device import Device
+from core.device.device_executor import DeviceExecutor
 from core.device.helpers.adb import Adb
 from core.osutils.command import run
 from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
-from core.settings.settings import EMULATOR_NAME, EMULATOR_PORT, EMULATOR_ID, CURRENT_OS
+from core.settings.context import Context
+from core.settings.settings import EMULATOR_NAME, CURRENT_OS, SHARD_INDEX, EMULATOR_POOL_SIZE, EMULATOR_SNAPSHOT
 
 EMULATOR_PATH = os.path.join(os.environ.get('ANDROID_HOME'), 'emulator', 'emulator')
+AVD_HOME = os.environ.get('ANDROID_AVD_HOME', os.path.join(os.path.expanduser('~'), '.android', 'avd'))
 
 
 class Emulator(object):
     @staticmethod
-    def stop():
+    def stop(force=False):
         """
         Stop all running emulators.
+        If emulator pool is started emulators are not stopped (use `force` to stop them anyway).
+        :param force: If True stop emulators of pool too.
         """
-        print 'Stop all running emulators.'
+        if not force and EmulatorPool.is_started():
+            print 'Emulators are kept running by emulator pool.'
+            return
 
-        Process.kill_by_commandline('qemu')
-        Process.kill_by_commandline('emulator64')
+        print 'Stop all running emulators.'
 
-        Process.kill('emulator64-arm')
-        Process.kill('emulator64-x86')
-        Process.kill('emulator-arm')
-        Process.kill('emulator-x86')
-        Process.kill('qemu-system-arm')
-        Process.kill('qemu-system-i386')
-        Process.kill('qemu-system-i38')
+        Process.kill_all([(None, 'qemu'),
+                          (None, 'emulator64'),
+                          ('emulator64-arm', None),
+                          ('emulator64-x86', None),
+                          ('emulator-arm', None),
+                          ('emulator-x86', None),
+                          ('qemu-system-arm', None),
+                          ('qemu-system-i386', None),
+                          ('qemu-system-i38', None)])
 
-        assert not Emulator.is_running(device_id=EMULATOR_ID), 'Emulator is still running!'
+        assert not Emulator.is_running(device_id=Context.current().emulator_id), 'Emulator is still running!'
 
     @staticmethod
-    def start(emulator_name=EMULATOR_NAME, port=EMULATOR_PORT, timeout=300, wipe_data=True):
+    def start(emulator_name=EMULATOR_NAME, port=None, timeout=300, wipe_data=True, snapshot=None, read_only=False):
         """
         Start emulator.
         :param wipe_data: If true it will wipe emulator date.
         :param emulator_name: Name of android emulator image (avd).
-        :param port: Port for Android emulator.
+        :param port: Port for Android emulator (if None port of current context is used).
         :param timeout: Time to wait until emulator boot.
+        :param snapshot: Boot from this snapshot of avd (data is not wiped and snapshot is not overwritten on exit).
+        :param read_only: If True avd is not modified (required to run more instances of same avd).
         """
+        if port is None:
+            port = Context.current().emulator_port
         print 'Starting emulator {0}'.format(emulator_name)
 
         if CURRENT_OS == OSType.WINDOWS:
@@ -53,8 +68,13 @@ class Emulator(object):
         else:
             start_command = EMULATOR_PATH + ' -avd ' + emulator_name + ' -port ' + port
 
-        if wipe_data:
+        if snapshot is not None:
+            start_command += ' -snapshot ' + snapshot + ' -no-snapshot-save'
+        elif wipe_data:
             start_command += ' -wipe-data'
+        if read_only or SHARD_INDEX is not None:
+            # Each shard runs its own instance of the same avd
+            start_command += ' -read-only'
         log_file = run(start_command, timeout=timeout, wait=False, log_level=CommandLogLevel.COMMAND_ONLY)
 
         # Check if emulator is running
@@ -112,19 +132,250 @@ class Emulator(object):
                 Device.click(device_id=device_id, text="OK", timeout=10)
         return booted
 
+    @staticmethod
+    def kill(device_id):
+        """
+        Stop emulator (other running emulators are not stopped).
+        :param device_id: Device id.
+        """
+        Adb.run(command='emu kill', device_id=device_id)
+        Process.wait(lambda: device_id not in Adb.get_devices(include_emulators=True), timeout=60)
+
+    @staticmethod
+    def has_snapshot(emulator_name=EMULATOR_NAME, snapshot=EMULATOR_SNAPSHOT):
+        """
+        Check if avd has snapshot.
+        :param emulator_name: Name of android emulator image (avd).
+        :param snapshot: Snapshot name.
+        """
+        return os.path.isdir(os.path.join(AVD_HOME, emulator_name + '.avd', 'snapshots', snapshot))
+
+    @staticmethod
+    def save_snapshot(device_id, snapshot=EMULATOR_SNAPSHOT):
+        """
+        Save state of running emulator as snapshot of its avd.
+        :param device_id: Device id.
+        :param snapshot: Snapshot name.
+        """
+        output = Adb.run(command='emu avd snapshot save ' + snapshot, device_id=device_id)
+        assert 'OK' in output, 'Failed to save snapshot {0} of {1}. Output: {2}'.format(snapshot, device_id, output)
+
+    @staticmethod
+    def load_snapshot(device_id, snapshot=EMULATOR_SNAPSHOT, timeout=300):
+        """
+        Restore running emulator to snapshot (emulator process is not restarted).
+        :param device_id: Device id.
+        :param snapshot: Snapshot name.
+        :param timeout: Time to wait until emulator is available.
+        """
+        output = Adb.run(command='emu avd snapshot load ' + snapshot, device_id=device_id)
+        assert 'OK' in output, 'Failed to load snapshot {0} on {1}. Output: {2}'.format(snapshot, device_id, output)
+        assert Process.wait(lambda: Emulator.is_running(device_id=device_id), timeout=timeout), \
+            'Emulator {0} is not available after snapshot {1} is loaded.'.format(device_id, snapshot)
+
+    @staticmethod
+    def create_snapshot(emulator_name=EMULATOR_NAME, snapshot=EMULATOR_SNAPSHOT, port=None, timeout=300):
+        """
+        Boot avd with wiped data and save it as snapshot.
+        :param emulator_name: Name of android emulator image (avd).
+        :param snapshot: Snapshot name.
+        :param port: Port for Android emulator (if None port of current context is used).
+        :param timeout: Time to wait until emulator boot.
+        """
+        if port is None:
+            port = Context.current().emulator_port
+        print 'Create snapshot {0} of {1}.'.format(snapshot, emulator_name)
+        Emulator.start(emulator_name=emulator_name, port=port, timeout=timeout, wipe_data=True)
+        device_id = 'emulator-' + port
+        Emulator.save_snapshot(device_id=device_id, snapshot=snapshot)
+        Emulator.kill(device_id=device_id)
+
     @staticmethod
     def ensure_available(emulator_name=EMULATOR_NAME):
         """
         Ensure Android Emulator is running.
+        If emulator is part of emulator pool its clean snapshot is loaded instead of reboot.
         """
-        found = Emulator.is_running(device_id=EMULATOR_ID)
+        emulator_id = Context.current().emulator_id
+        if EmulatorPool.contains(emulator_id):
+            EmulatorPool.ensure_clean(emulator_id)
+            return True
+        found = Emulator.is_running(device_id=emulator_id)
         if found:
             print 'Emulator already running, reboot it...'
-            Adb.run(command="shell rm -rf /data/local/tmp/*", device_id=EMULATOR_ID, log_level=CommandLogLevel.FULL)
-            Adb.uninstall_all_apps(device_id=EMULATOR_ID)
-            Adb.run(command="reboot", device_id=EMULATOR_ID, log_level=CommandLogLevel.FULL)
-            Emulator.wait(device_id=EMULATOR_ID)
+            Adb.run(command="shell rm -rf /data/local/tmp/*", device_id=emulator_id, log_level=CommandLogLevel.FULL)
+            Adb.uninstall_all_apps(device_id=emulator_id)
+            Adb.run(command="reboot", device_id=emulator_id, log_level=CommandLogLevel.FULL)
+            Emulator.wait(device_id=emulator_id)
         else:
             Emulator.stop()
-            Emulator.start(emulator_name=emulator_name, port=EMULATOR_PORT)
+            Emulator.start(emulator_name=emulator_name, port=Context.current().emulator_port)
         return found
+
+
+class EmulatorPool(object):
+    """
+    Warm emulators booted from clean snapshot of avd (see EMULATOR_POOL_SIZE and EMULATOR_SNAPSHOT settings).
+
+    Test classes lease emulator (`lease` returns `Context` with its port) and release it when they are done.
+    On release clean snapshot is loaded in background, emulator process is not restarted.
+    """
+    __device_ids = []
+    __free = Queue.Queue()
+    # Emulators with clean snapshot loaded that are not used since then
+    __clean = set()
+    __lock = threading.Lock()
+    __emulator_name = EMULATOR_NAME
+    __snapshot = EMULATOR_SNAPSHOT
+
+    @staticmethod
+    def is_started():
+        return len(EmulatorPool.__device_ids) > 0
+
+    @staticmethod
+    def contains(device_id):
+        return device_id in EmulatorPool.__device_ids
+
+    @staticmethod
+    def prepare(emulator_name=EMULATOR_NAME, snapshot=EMULATOR_SNAPSHOT, timeout=300):
+        """
+        Create snapshot of avd if it does not exist.
+        Call it once in main process before shards are started (workers of sharded run only boot from snapshot).
+        :param emulator_name: Name of android emulator image (avd).
+        :param snapshot: Snapshot name.
+        :param timeout: Time to wait until emulator boot.
+        """
+        if not Emulator.has_snapshot(emulator_name=emulator_name, snapshot=snapshot):
+            Emulator.create_snapshot(emulator_name=emulator_name, snapshot=snapshot, timeout=timeout)
+
+    @staticmethod
+    def start(size=EMULATOR_POOL_SIZE, emulator_name=EMULATOR_NAME, snapshot=EMULATOR_SNAPSHOT, timeout=300):
+        """
+        Boot emulators from snapshot (snapshot is created if avd does not have it, except in shard workers).
+        Emulators use ports starting from port of current context (sharded runs use only emulator of its shard).
+        :param size: Number of emulators.
+        :param emulator_name: Name of android emulator image (avd).
+        :param snapshot: Snapshot name.
+        :param timeout: Time to wait until emulator boot.
+        """
+        if SHARD_INDEX is not None:
+            size = min(size, 1)
+        base_port = int(Context.current().emulator_port)
+        ports = [str(base_port + 2 * index) for index in range(size)]
+        print 'Start emulator pool with {0} emulator(s) of {1}.'.format(size, emulator_name)
+
+        if not Emulator.has_snapshot(emulator_name=emulator_name, snapshot=snapshot):
+            if SHARD_INDEX is not None:
+                # All workers share the same avd, snapshot must be created by main process (see `prepare`)
+                raise NameError('Snapshot {0} of {1} does not exist.'.format(snapshot, emulator_name))
+            Emulator.create_snapshot(emulator_name=emulator_name, snapshot=snapshot, port=ports[0], timeout=timeout)
+
+        def boot(port):
+            device_id = 'emulator-' + port
+            if Emulator.is_running(device_id=device_id):
+                Emulator.load_snapshot(device_id=device_id, snapshot=snapshot, timeout=timeout)
+            else:
+                Emulator.start(emulator_name=emulator_name, port=port, timeout=timeout, snapshot=snapshot,
+                               read_only=size > 1)
+            return device_id
+
+        results = DeviceExecutor.run(device_ids=ports, operation=boot)
+        EmulatorPool.__emulator_name = emulator_name
+        EmulatorPool.__snapshot = snapshot
+        for port in ports:
+            device_id = results[port].result
+            EmulatorPool.__device_ids.append(device_id)
+            EmulatorPool.__mark_clean(device_id)
+            EmulatorPool.__free.put(device_id)
+
+    @staticmethod
+    def stop():
+        """
+        Stop all emulators of pool.
+        """
+        del EmulatorPool.__device_ids[:]
+        with EmulatorPool.__lock:
+            EmulatorPool.__clean.clear()
+        while not EmulatorPool.__free.empty():
+            EmulatorPool.__free.get_nowait()
+        Emulator.stop(force=True)
+
+    @staticmethod
+    def lease(timeout=600):
+        """
+        Take free emulator from pool.
+        :param timeout: Time to wait for free emulator.
+        :return: Copy of current `Context` with port and id of emulator (use it with `with` statement).
+        """
+        try:
+            device_id = EmulatorPool.__free.get(timeout=timeout)
+        except Queue.Empty:
+            raise NameError('No free emulator in emulator pool.')
+        print 'Lease {0} from emulator pool.'.format(device_id)
+        context = copy.copy(Context.current())
+        context.emulator_port = device_id.split('-')[-1]
+        context.emulator_id = device_id
+        return context
+
+    @staticmethod
+    def __mark_clean(device_id):
+        with EmulatorPool.__lock:
+            EmulatorPool.__clean.add(device_id)
+
+    @staticmethod
+    def restore(device_id):
+        """
+        Load clean snapshot on emulator of pool.
+        :param device_id: Device id.
+        """
+        Emulator.load_snapshot(device_id=device_id, snapshot=EmulatorPool.__snapshot)
+        EmulatorPool.__mark_clean(device_id)
+
+    @staticmethod
+    def ensure_clean(device_id):
+        """
+        Ensure emulator of pool is in clean state.
+        Snapshot is loaded only if emulator is used since it is booted or restored (first call after lease is free,
+        because emulator is restored on release), next calls load snapshot again.
+        :param device_id: Device id.
+        """
+        with EmulatorPool.__lock:
+            clean = device_id in EmulatorPool.__clean
+            EmulatorPool.__clean.discard(device_id)
+        if clean:
+            print '{0} is clean, snapshot is not loaded.'.format(device_id)
+        else:
+            print 'Emulator is part of emulator pool, restore its snapshot...'
+            EmulatorPool.restore(device_id)
+            with EmulatorPool.__lock:
+                EmulatorPool.__clean.discard(device_id)
+
+    @staticmethod
+    def release(context):
+        """
+        Return emulator to pool (it is available for next lease once clean snapshot is loaded).
+        If snapshot can not be loaded emulator is restarted from snapshot.
+        :param context: Context returned by `lease`.
+        """
+        device_id = context.emulator_id
+        print 'Release {0} to emulator pool.'.format(device_id)
+
+        def restore():
+            try:
+                EmulatorPool.restore(device_id)
+            except Exception as e:
+                print 'Failed to restore {0} ({1}), restart it...'.format(device_id, e)
+                try:
+                    Emulator.kill(device_id=device_id)
+                    Emulator.start(emulator_name=EmulatorPool.__emulator_name, port=context.emulator_port,
+                                   snapshot=EmulatorPool.__snapshot, read_only=len(EmulatorPool.__device_ids) > 1)
+                    EmulatorPool.__mark_clean(device_id)
+                except Exception as e:
+                    print 'Failed to restart {0}, remove it from emulator pool: {1}'.format(device_id, e)
+                    return
+            if EmulatorPool.contains(device_id):
+                EmulatorPool.__free.put(device_id)
+
+        thread = threading.Thread(target=restore)
+        thread.daemon = True
+        thread.start()
@@ -4,20 +4,43 @@ Wrapper around adb
 import os
 import platform
 import re
+import struct
 import time
+from StringIO import StringIO
 
+from PIL import Image
+
+from core.device.helpers.adb_client import AdbClient
+from core.device.helpers.android_uiautomator import UIAuto
+from core.device.helpers.logcat import Logcat
+from core.device.helpers.view_hierarchy import ViewHierarchy
 from core.osutils.command import run
 from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.os_type import OSType
-from core.settings.settings import CURRENT_OS, EMULATOR_ID
+from core.settings.context import Context
+from core.settings.settings import CURRENT_OS
 from core.tns.tns_platform_type import Platform
 
 ANDROID_HOME = os.environ.get('ANDROID_HOME')
 ADB_PATH = os.path.join(ANDROID_HOME, 'platform-tools', 'adb')
 
+# Duration in `Displayed` logcat lines, for example `+1s234ms`, `+850ms` or `+1m2s3ms`.
+DISPLAYED_TIME_REGEX = re.compile(r'\+(?:(\d+)m(?!s))?(?:(\d+)s)?(?:(\d+)ms)?')
+
+# Pixel formats of raw `screencap` output with 4 bytes per pixel (RGBA_8888, RGBX_8888) as (mode, raw mode).
+SCREENCAP_FORMATS = {1: ('RGBA', 'RGBA'), 2: ('RGB', 'RGBX')}
+
+# Commands with these characters are interpreted by host shell, so they are not sent to persistent session.
+HOST_SHELL_CHARS = set('|&;<>()$`\\"\'*?[]{}~#\n')
+
+# Timeout (in seconds) per package in `uninstall_all_apps` (whole batch must be done in UNINSTALL_TIMEOUT * packages).
+UNINSTALL_TIMEOUT = 30
+
 
 class Adb(object):
+    __hierarchies = {}
+
     @staticmethod
     def __find_aapt():
         """
@@ -78,9 +101,13 @@ class Adb(object):
     def get_logcat(device_id):
         """
         Dump the log and then exit (don't block).
+        Log is taken from logcat stream of the device (`logcat -d` is used only if stream can not be started).
         :param device_id: Device id.
         """
-        return Adb.run(command='logcat -d', device_id=device_id)
+        try:
+            return Logcat.get(device_id).get_text()
+        except IOError:
+            return Adb.run(command='logcat -d', device_id=device_id)
 
     @staticmethod
     def clear_logcat(device_id):
@@ -89,35 +116,47 @@ class Adb(object):
         :param device_id: Device id.
         """
         Adb.run(command='logcat -c', device_id=device_id)
+        try:
+            Logcat.get(device_id).clear()
+        except IOError:
+            pass
         print "The logcat on {0} is cleared.".format(device_id)
 
+    @staticmethod
+    def parse_displayed_time(line):
+        """
+        Parse duration of `Displayed` logcat line.
+        :param line: Line like `Displayed org.nativescript.TestApp/com.tns.NativeScriptActivity: +3s452ms`.
+        :return: Time in milliseconds (None if line does not contain duration).
+        """
+        for match in DISPLAYED_TIME_REGEX.finditer(line):
+            if any(match.groups()):
+                minutes, seconds, milliseconds = [int(value or 0) for value in match.groups()]
+                return (minutes * 60 + seconds) * 1000 + milliseconds
+        return None
+
     @staticmethod
     def get_start_time(device_id, app_id):
         """
         Get start time of application.
         :param device_id: Device id.
         :param app_id: App id.
-        :return: Start time as string.
-        """
-        command = 'logcat -d | grep \'Displayed {0}\''.format(app_id)
-        output = Adb.run(command=command, device_id=device_id, log_level=CommandLogLevel.SILENT)
+        :return: Start time in milliseconds as string.
+        """
+        try:
+            # Line may still be on its way from device, so wait a bit for it.
+            lines = Logcat.get(device_id).wait_for(pattern='Displayed ' + re.escape(app_id), timeout=5)
+            output = '\n'.join(lines)
+        except IOError:
+            command = 'logcat -d | grep \'Displayed {0}\''.format(app_id)
+            output = Adb.run(command=command, device_id=device_id, log_level=CommandLogLevel.SILENT)
         # Example: I/ActivityManager(19531): Displayed org.nativescript.TestApp/com.tns.NativeScriptActivity: +3s452ms
         if len(output) > 0:
             print "Start time: {0}.".format(output)
-
-            start_time = output.rsplit("+")[1]
-            print "Start time: {0}.".format(start_time)
-
-            numbers = map(int, re.findall('\d+', start_time))
-            num_len = len(str(numbers[-1]))
-            if num_len == 1:
-                numbers[1] = '00' + str(numbers[1])
-            elif num_len == 2:
-                numbers[1] = '0' + str(numbers[1])
-
-            result = ''.join(str(x) for x in numbers)
+            result = Adb.parse_displayed_time(output.splitlines()[0])
+            assert result is not None, 'Failed to parse start time of {0}.'.format(app_id)
             print "Start time: {0}.".format(result)
-            return result
+            return str(result)
         else:
             raise IOError('{0} has not displayed its activity - the app crashed!'.format(app_id))
 
@@ -131,20 +170,67 @@ class Adb(object):
         :param log_level: Log level.
         :return: Output of executed command.
         """
+        if command.startswith('shell ') and not HOST_SHELL_CHARS.intersection(command):
+            try:
+                return Adb.shell(command=command[len('shell '):], device_id=device_id, timeout=timeout,
+                                 log_level=log_level)
+            except IOError:
+                print 'Failed to run command in adb shell session, fallback to adb executable.'
         return run(ADB_PATH + ' -s ' + device_id + ' ' + command, timeout=timeout, log_level=log_level)
 
     @staticmethod
-    def uninstall_all_apps(device_id):
+    def shell(command, device_id, timeout=60, log_level=CommandLogLevel.COMMAND_ONLY):
+        """
+        Run shell command in persistent shell session of device (no `adb` process is spawned).
+        :param command: Shell command (executed on device).
+        :param device_id: Device id.
+        :param timeout: Timeout.
+        :param log_level: Log level.
+        :return: Output of executed command.
+        """
+        full_command = ADB_PATH + ' -s ' + device_id + ' shell ' + command
+        if log_level is not CommandLogLevel.SILENT:
+            File.append(Context.current().test_log, full_command)
+            print "##### {0} Executing command : {1}\n".format(time.strftime("%X"), full_command)
+        output = AdbClient.shell(device_id=device_id, command=command, timeout=timeout)
+        if log_level is CommandLogLevel.FULL:
+            print "##### OUTPUT BEGIN #####\n"
+            print output
+            print "##### OUTPUT END #####\n"
+        return output.strip('\r\n')
+
+    @staticmethod
+    def uninstall_all_apps(device_id, app_prefix=None):
         """
         Uninstall all 3rd party applications.
+        Packages are uninstalled with `pm uninstall` in one shell session of device
+        (one `adb uninstall` per package if session is not available).
         :param device_id: Device id.
+        :param app_prefix: Uninstall only packages that start with this prefix (by default all 3rd party packages).
+        :return: Dict with package as key and output of uninstall as value.
         """
         print 'Uninstall all apps on {0}.'.format(device_id)
-        apps = Adb.run(command='shell pm list packages -3', device_id=device_id)
-        for line in apps.splitlines():
-            if 'package:' in line:
-                app = line.replace('package:', '')
-                Adb.uninstall(app_id=app, device_id=device_id)
+        output = Adb.run(command='shell pm list packages -3', device_id=device_id)
+        apps = [line.replace('package:', '').strip() for line in output.splitlines() if 'package:' in line]
+        if app_prefix is not None:
+            apps = [app for app in apps if app.startswith(app_prefix)]
+        if not apps:
+            return {}
+
+        commands = ['pm uninstall ' + app for app in apps]
+        File.append(Context.current().test_log, '\n'.join(commands))
+        try:
+            outputs = AdbClient.shell_many(device_id=device_id, commands=commands,
+                                           timeout=UNINSTALL_TIMEOUT * len(commands))
+        except IOError as e:
+            print '{0} Uninstall apps one by one.'.format(e)
+            outputs = [Adb.run(command='uninstall ' + app, device_id=device_id) for app in apps]
+
+        results = dict(zip(apps, [output.strip('\r\n') for output in outputs]))
+        failed = dict((app, output) for app, output in results.items() if 'Success' not in output)
+        print 'Uninstalled {0} of {1} apps from {2}.'.format(len(apps) - len(failed), len(apps), device_id)
+        assert not failed, 'Failed to uninstall {0}'.format(failed)
+        return results
 
     @staticmethod
     def install(apk_file_path, device_id):
@@ -188,8 +274,7 @@ class Adb(object):
         :param device_id: Device identifier
         :param app_id: Bundle identifier (example: org.nativescript.TestApp)
         """
-        command = ADB_PATH + " -s " + device_id + " shell am force-stop " + app_id
-        output = run(command=command, log_level=CommandLogLevel.FULL)
+        output = Adb.run(command="shell am force-stop " + app_id, device_id=device_id, log_level=CommandLogLevel.FULL)
         time.sleep(5)
         assert app_id not in output, "Failed to stop " + app_id
         time.sleep(5)
@@ -202,8 +287,7 @@ class Adb(object):
         :param device_id: Device identifier
         :return: True if application is running
         """
-        command = ADB_PATH + " -s " + device_id + " shell ps | grep -i " + app_id
-        output = run(command=command, log_level=CommandLogLevel.SILENT)
+        output = Adb.run(command="shell ps", device_id=device_id, log_level=CommandLogLevel.SILENT)
         if app_id in output:
             return True
         else:
@@ -292,6 +376,9 @@ class Adb(object):
         :param device_id: Device identifier.
         :return: XML document with UI tree.
         """
+        source = UIAuto.get_page_source(device_id=device_id)
+        if source is not None:
+            return source
         remove_command = 'shell rm -rf /sdcard/view.xml'
         get_source_command = 'shell uiautomator dump /sdcard/view.xml'
         read_source_command = 'shell cat /sdcard/view.xml'
@@ -300,6 +387,25 @@ class Adb(object):
         output = Adb.run(command=read_source_command, device_id=device_id, log_level=CommandLogLevel.SILENT)
         return output
 
+    @staticmethod
+    def get_hierarchy(device_id):
+        """
+        Get parsed UI Tree of device (it is parsed and indexed again only if it is changed since previous call).
+        :param device_id: Device identifier.
+        :return: ViewHierarchy object (None if UI Tree is not available).
+        """
+        source = Adb.get_page_source(device_id=device_id)
+        hierarchy = Adb.__hierarchies.get(device_id)
+        if hierarchy is not None and hierarchy.xml == source:
+            return hierarchy
+        try:
+            hierarchy = ViewHierarchy(source)
+        except Exception:
+            Adb.__hierarchies.pop(device_id, None)
+            return None
+        Adb.__hierarchies[device_id] = hierarchy
+        return hierarchy
+
     @staticmethod
     def wait_for_text(device_id, text, timeout=20):
         """
@@ -312,8 +418,8 @@ class Adb(object):
         t_end = time.time() + timeout
         found = False
         while time.time() < t_end:
-            source = Adb.get_page_source(device_id=device_id)
-            if text in source:
+            hierarchy = Adb.get_hierarchy(device_id=device_id)
+            if hierarchy is not None and hierarchy.contains_text(text):
                 print '{0} found on current screen of {1}'.format(text, device_id)
                 found = True
                 break
@@ -321,6 +427,26 @@ class Adb(object):
             print '{0} NOT found on current screen of {1}'.format(text, device_id)
         return found
 
+    @staticmethod
+    def get_screen_image(device_id):
+        """
+        Get screen of mobile device as image (captured in memory, no file is created on device or localhost).
+        :param device_id: Device identifier (example: `emulator-5554`).
+        :return: PIL Image in RGBA mode.
+        """
+        data = AdbClient.exec_out(device_id=device_id, command='screencap')
+        if len(data) >= 12:
+            # Header is width, height, format (and colorspace on Android 9+) followed by pixels.
+            width, height, pixel_format = struct.unpack('<III', data[:12])
+            header_size = len(data) - width * height * 4
+            if pixel_format in SCREENCAP_FORMATS and header_size in (12, 16):
+                mode, raw_mode = SCREENCAP_FORMATS[pixel_format]
+                image = Image.frombytes(mode, (width, height), data[header_size:], 'raw', raw_mode)
+                return image.convert('RGBA') if mode != 'RGBA' else image
+        # Unknown raw format, get png instead
+        data = AdbClient.exec_out(device_id=device_id, command='screencap -p')
+        return Image.open(StringIO(data)).convert('RGBA')
+
     @staticmethod
     def get_screen(device_id, file_path):
         """
@@ -328,6 +454,11 @@ class Adb(object):
         :param device_id: Device identifier (example: `emulator-5554`).
         :param file_path: Name of image that will be saved.
         """
+        try:
+            Adb.get_screen_image(device_id=device_id).save(file_path)
+            return
+        except IOError as e:
+            print 'Failed to capture screen in memory ({0}), fallback to screencap on sdcard.'.format(e)
 
         base_path, file_name = os.path.split(file_path)
         file_name = file_name.rsplit('.', 1)[0]
@@ -335,13 +466,13 @@ class Adb(object):
         # Cleanup sdcard
         output = Adb.run(command="shell rm /sdcard/*.png", device_id=device_id)
         if "Read-only file system" in output:
-            Adb.unlock_sdcard(device_id=EMULATOR_ID)
+            Adb.unlock_sdcard(device_id=Context.current().emulator_id)
             output = Adb.run(command="shell rm /sdcard/*.png", device_id=device_id)
             assert "error" not in output.lower(), "Screencap failed with: " + output
         # Get current screen of mobile device
         output = Adb.run(command="shell screencap -p /sdcard/{0}.png".format(file_name), device_id=device_id)
         if "Read-only file system" in output:
-            Adb.unlock_sdcard(device_id=EMULATOR_ID)
+            Adb.unlock_sdcard(device_id=Context.current().emulator_id)
             output = Adb.run(command="shell screencap -p /sdcard/{0}.png".format(file_name), device_id=device_id)
             assert "error" not in output.lower(), "Screencap failed with: " + output
         # Transfer image from device to localhost
@@ -376,28 +507,28 @@ class Adb(object):
         Turn on screen.
         :param device_id: Device identifier
         """
-        cmd_key_event = ADB_PATH + " -s " + device_id + " shell input keyevent 26"
-        cmd_input_method = ADB_PATH + " -s " + device_id + " shell dumpsys input_method | grep mActive"
+        cmd_key_event = "shell input keyevent 26"
+        cmd_input_method = "shell dumpsys input_method"
 
-        output = run(command=cmd_input_method, log_level=CommandLogLevel.SILENT)
+        output = Adb.run(command=cmd_input_method, device_id=device_id, log_level=CommandLogLevel.SILENT)
         is_active = "mActive=true" in output
 
         if is_active:
             print "The screen is already active."
-            run(command=cmd_key_event, log_level=CommandLogLevel.SILENT)
+            Adb.run(command=cmd_key_event, device_id=device_id, log_level=CommandLogLevel.SILENT)
             time.sleep(1)
-            output = run(command=cmd_input_method, log_level=CommandLogLevel.SILENT)
+            output = Adb.run(command=cmd_input_method, device_id=device_id, log_level=CommandLogLevel.SILENT)
             assert "mActive=false" in output
             time.sleep(1)
-            run(command=cmd_key_event)
+            Adb.run(command=cmd_key_event, device_id=device_id, log_level=CommandLogLevel.FULL)
             time.sleep(1)
-            output = run(command=cmd_input_method, log_level=CommandLogLevel.SILENT)
+            output = Adb.run(command=cmd_input_method, device_id=device_id, log_level=CommandLogLevel.SILENT)
             assert "mActive=true" in output
         else:
             print "The screen is not active. Turn it on..."
-            run(command=cmd_key_event)
+            Adb.run(command=cmd_key_event, device_id=device_id, log_level=CommandLogLevel.FULL)
             time.sleep(1)
-            output = run(command=cmd_input_method, log_level=CommandLogLevel.SILENT)
+            output = Adb.run(command=cmd_input_method, device_id=device_id, log_level=CommandLogLevel.SILENT)
             assert "mActive=true" in output
 
     @staticmethod
@@ -0,0 +1,236 @@
+"""
+Client of adb server (talks to adb server socket instead of spawning `adb` processes).
+
+Protocol: each request is sent as 4 hex digits length + payload, server responds with `OKAY` or `FAIL` + message.
+`host:transport:<serial>` switches connection to device, next request opens service on device (`shell:`, `exec:`).
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+
+ADB_SERVER_HOST = '127.0.0.1'
+ADB_SERVER_PORT = int(os.environ.get('ANDROID_ADB_SERVER_PORT', 5037))
+CONNECT_TIMEOUT = 2
+READ_SIZE = 64 * 1024
+
+
+class AdbShellSession(object):
+    """
+    Long running `sh` on device, commands are written to its stdin and end of output is detected by marker.
+    """
+
+    def __init__(self, device_id, timeout=60):
+        """
+        :param device_id: Device identifier.
+        :param timeout: Timeout to open session.
+        """
+        self.device_id = device_id
+        self.lock = threading.Lock()
+        self.marker = '__ADB_END_{0}__'.format(uuid.uuid4().hex)
+        self.socket = AdbClient.open_service(device_id=device_id, service='exec:sh', timeout=timeout)
+        self.buffer = ''
+
+    def __read_result(self, end_time):
+        """
+        Read output of next command (until marker and exit code).
+        :param end_time: Time when reading times out (raise socket.timeout).
+        :return: Tuple of output and exit code.
+        """
+        while True:
+            position = self.buffer.find(self.marker)
+            if position >= 0:
+                end = self.buffer.find('\n', position)
+                if end >= 0:
+                    output = self.buffer[:position]
+                    exit_code = self.buffer[position + len(self.marker):end].strip()
+                    self.buffer = self.buffer[end + 1:]
+                    return output, int(exit_code) if exit_code.isdigit() else None
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                raise socket.timeout('Shell session on {0} timed out.'.format(self.device_id))
+            self.socket.settimeout(remaining)
+            data = self.socket.recv(READ_SIZE)
+            if not data:
+                raise IOError('Shell session on {0} is closed.'.format(self.device_id))
+            self.buffer += data
+
+    def run_many(self, commands, timeout=60):
+        """
+        Run commands (all commands are sent at once, outputs are read in order).
+        :param commands: List of shell commands.
+        :param timeout: Timeout in seconds for all commands.
+        :return: List of (output, exit code) tuples.
+        """
+        script = ''
+        for command in commands:
+            # stdin of commands is redirected, so they do not consume next commands sent to the session
+            script += '( {0} ) </dev/null 2>&1; echo "{1}$?"\n'.format(command, self.marker)
+        end_time = time.time() + timeout
+        with self.lock:
+            self.socket.settimeout(timeout)
+            self.socket.sendall(script)
+            return [self.__read_result(end_time) for _ in commands]
+
+    def run(self, command, timeout=60):
+        """
+        Run command.
+        :param command: Shell command.
+        :param timeout: Timeout in seconds.
+        :return: Tuple of output and exit code.
+        """
+        return self.run_many([command], timeout=timeout)[0]
+
+    def close(self):
+        try:
+            self.socket.close()
+        except socket.error:
+            pass
+
+
+class AdbClient(object):
+    __sessions = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def __read_exact(sock, size):
+        data = ''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise IOError('adb server closed connection.')
+            data += chunk
+        return data
+
+    @staticmethod
+    def __request(sock, request):
+        """
+        Send request to adb server and check response status.
+        """
+        sock.sendall('{0:04x}{1}'.format(len(request), request))
+        status = AdbClient.__read_exact(sock, 4)
+        if status != 'OKAY':
+            message = ''
+            if status == 'FAIL':
+                length = int(AdbClient.__read_exact(sock, 4), 16)
+                message = AdbClient.__read_exact(sock, length)
+            raise IOError('adb request {0} failed: {1} {2}'.format(request, status, message))
+
+    @staticmethod
+    def is_available():
+        """
+        Check if adb server is running.
+        """
+        try:
+            sock = socket.create_connection((ADB_SERVER_HOST, ADB_SERVER_PORT), CONNECT_TIMEOUT)
+            sock.close()
+            return True
+        except socket.error:
+            return False
+
+    @staticmethod
+    def open_service(device_id, service, timeout=60):
+        """
+        Open service on device.
+        :param device_id: Device identifier.
+        :param service: Service (for example `shell:ls`, `exec:screencap -p` or `exec:sh`).
+        :param timeout: Socket timeout in seconds.
+        :return: Connected socket (stream of the service).
+        """
+        try:
+            sock = socket.create_connection((ADB_SERVER_HOST, ADB_SERVER_PORT), CONNECT_TIMEOUT)
+        except socket.error as e:
+            raise IOError('Failed to connect to adb server: {0}'.format(e))
+        try:
+            sock.settimeout(timeout)
+            AdbClient.__request(sock, 'host:transport:' + device_id)
+            AdbClient.__request(sock, service)
+        except (IOError, socket.error):
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def read_all(sock):
+        """
+        Read stream of service until device closes it.
+        """
+        chunks = []
+        try:
+            while True:
+                data = sock.recv(READ_SIZE)
+                if not data:
+                    break
+                chunks.append(data)
+        finally:
+            sock.close()
+        return ''.join(chunks)
+
+    @staticmethod
+    def exec_out(device_id, command, timeout=60):
+        """
+        Run command without shell session (binary safe output, for example `screencap -p`).
+        :param device_id: Device identifier.
+        :param command: Command.
+        :param timeout: Timeout in seconds.
+        :return: Raw output.
+        """
+        return AdbClient.read_all(AdbClient.open_service(device_id=device_id, service='exec:' + command,
+                                                         timeout=timeout))
+
+    @staticmethod
+    def get_session(device_id):
+        """
+        Get persistent shell session of device (open it if there is no session yet).
+        """
+        with AdbClient.__lock:
+            session = AdbClient.__sessions.get(device_id)
+            if session is None:
+                session = AdbShellSession(device_id=device_id)
+                AdbClient.__sessions[device_id] = session
+            return session
+
+    @staticmethod
+    def shell_many(device_id, commands, timeout=60):
+        """
+        Run commands in persistent shell session of device (commands are pipelined).
+        Session is closed on any error (next call opens new one).
+        :param device_id: Device identifier.
+        :param commands: List of shell commands.
+        :param timeout: Timeout in seconds for all commands (raise NameError if it is exceeded).
+        :return: List of outputs.
+        """
+        session = AdbClient.get_session(device_id)
+        try:
+            results = session.run_many(commands, timeout=timeout)
+        except socket.timeout:
+            AdbClient.close(device_id)
+            raise NameError('Process has timed out.')
+        except (IOError, socket.error):
+            AdbClient.close(device_id)
+            raise IOError('Shell session on {0} failed.'.format(device_id))
+        return [output for output, _ in results]
+
+    @staticmethod
+    def shell(device_id, command, timeout=60):
+        """
+        Run command in persistent shell session of device.
+        :param device_id: Device identifier.
+        :param command: Shell command.
+        :param timeout: Timeout in seconds.
+        :return: Output of the command.
+        """
+        return AdbClient.shell_many(device_id=device_id, commands=[command], timeout=timeout)[0]
+
+    @staticmethod
+    def close(device_id=None):
+        """
+        Close shell session of device (by default close all sessions).
+        """
+        with AdbClient.__lock:
+            device_ids = [device_id] if device_id is not None else AdbClient.__sessions.keys()
+            for key in device_ids:
+                session = AdbClient.__sessions.pop(key, None)
+                if session is not None:
+                    session.close()
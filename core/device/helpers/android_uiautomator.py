@@ -1,18 +1,58 @@
 """
 Wrapper around uiautomator
+
+uiautomator server on device is started once per device and kept running (it is killed only by `UIAuto.stop()`).
 """
+import threading
+
 from core.osutils.process import Process
 
 
 class UIAuto(object):
+    __devices = {}
+    __lock = threading.Lock()
+
     @staticmethod
     def __kill_uiautomator():
         Process.kill(proc_name="adb", proc_cmdline="uiautomator")
 
     @staticmethod
     def __get_device(device_id):
-        from uiautomator import Device
-        return Device(device_id)
+        with UIAuto.__lock:
+            device = UIAuto.__devices.get(device_id)
+            if device is None:
+                from uiautomator import Device
+                device = Device(device_id)
+                UIAuto.__devices[device_id] = device
+            return device
+
+    @staticmethod
+    def stop(device_id=None):
+        """
+        Stop uiautomator sessions (by default sessions of all devices).
+        :param device_id: Device identifier.
+        """
+        with UIAuto.__lock:
+            if device_id is None:
+                UIAuto.__devices.clear()
+            else:
+                UIAuto.__devices.pop(device_id, None)
+        UIAuto.__kill_uiautomator()
+
+    @staticmethod
+    def get_page_source(device_id):
+        """
+        Get UI Tree as XML document from uiautomator session of device.
+        :param device_id: Device identifier.
+        :return: XML document with UI tree (None if uiautomator session is not available).
+        """
+        try:
+            return UIAuto.__get_device(device_id=device_id).dump(compressed=False)
+        except Exception as e:
+            print 'Failed to get UI tree via uiautomator session: {0}'.format(e)
+            with UIAuto.__lock:
+                UIAuto.__devices.pop(device_id, None)
+            return None
 
     @staticmethod
     def click(device_id, text, timeout=10):
@@ -27,9 +67,7 @@ class UIAuto(object):
         if element.wait.exists(timeout=timeout * 1000):
             element.click()
             print 'Click on "{0}"'.format(text)
-            UIAuto.__kill_uiautomator()
         else:
-            UIAuto.__kill_uiautomator()
             raise NameError("Can't find " + text + " on the screen of " + device_id)
 
     @staticmethod
@@ -42,6 +80,4 @@ class UIAuto(object):
         :return True if text is found, False if text is not found.
         """
         d = UIAuto.__get_device(device_id=device_id)
-        found = d(text=text).wait.exists(timeout=timeout * 1000)
-        UIAuto.__kill_uiautomator()
-        return found
+        return d(text=text).wait.exists(timeout=timeout * 1000)
@@ -0,0 +1,212 @@
+"""
+Streaming logcat reader.
+
+Logcat of each device is streamed (over adb server socket) in background thread into bounded ring buffer.
+Every line gets sequence number, so callers can take marker and later ask only for lines logged after it.
+"""
+import collections
+import re
+import select
+import socket
+import threading
+import time
+
+from core.device.helpers.adb_client import AdbClient
+
+LOGCAT_BUFFER_SIZE = 100000
+
+# Initial dump of log is read when no data arrives for DUMP_IDLE_TIMEOUT seconds (wait for it max DUMP_TIMEOUT seconds)
+DUMP_IDLE_TIMEOUT = 0.5
+DUMP_TIMEOUT = 10
+
+# Example (threadtime format):
+# 01-15 10:20:30.123  1234  1250 I ActivityManager: Displayed org.nativescript.TestApp/com.tns.NativeScriptActivity
+LINE_REGEX = re.compile(r'^\S+\s+\S+\s+(\d+)\s+\d+\s+[VDIWEFS]\s+(.*?)\s*: ')
+
+
+class LogcatStream(object):
+    def __init__(self, device_id, size=LOGCAT_BUFFER_SIZE):
+        """
+        Start streaming logcat of device.
+        :param device_id: Device identifier.
+        :param size: Max number of lines kept in memory (older lines are dropped).
+        """
+        self.device_id = device_id
+        self.size = size
+        self.condition = threading.Condition()
+        self.lines = collections.deque(maxlen=size)
+        self.by_tag = collections.defaultdict(lambda: collections.deque(maxlen=size))
+        self.by_pid = collections.defaultdict(lambda: collections.deque(maxlen=size))
+        self.next_seq = 0
+        self.running = True
+        self.dumped = threading.Event()
+        self.socket = AdbClient.open_service(device_id=device_id, service='exec:logcat -v threadtime', timeout=None)
+        reader = threading.Thread(target=self.__read)
+        reader.daemon = True
+        reader.start()
+        # Log written before stream is started should be in buffer when stream is returned to caller
+        self.dumped.wait(DUMP_TIMEOUT)
+
+    def __read(self):
+        buffer = ''
+        try:
+            while True:
+                if not self.dumped.is_set():
+                    ready, _, _ = select.select([self.socket], [], [], DUMP_IDLE_TIMEOUT)
+                    if not ready:
+                        self.dumped.set()
+                        continue
+                data = self.socket.recv(64 * 1024)
+                if not data:
+                    break
+                buffer += data
+                lines = buffer.split('\n')
+                buffer = lines.pop()
+                with self.condition:
+                    for line in lines:
+                        self.__add(line.rstrip('\r'))
+                    self.condition.notify_all()
+        except socket.error:
+            pass
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            self.dumped.set()
+            self.socket.close()
+
+    def __add(self, line):
+        seq = self.next_seq
+        self.next_seq += 1
+        self.lines.append((seq, line))
+        match = LINE_REGEX.match(line)
+        if match:
+            self.by_pid[match.group(1)].append(seq)
+            self.by_tag[match.group(2)].append(seq)
+
+    @staticmethod
+    def __since(items, since, key=lambda item: item):
+        """
+        Get items with sequence number >= since (buffer is walked from the end, so only new items are visited).
+        """
+        result = []
+        for item in reversed(items):
+            if key(item) < since:
+                break
+            result.append(item)
+        result.reverse()
+        return result
+
+    def __line(self, seq):
+        """
+        Get line by sequence number (None if it is already dropped from buffer).
+        """
+        first_seq = self.lines[0][0] if self.lines else self.next_seq
+        if seq < first_seq:
+            return None
+        return self.lines[seq - first_seq][1]
+
+    def marker(self):
+        """
+        Get marker of current position in log.
+        :return: Sequence number of next line.
+        """
+        with self.condition:
+            return self.next_seq
+
+    def get_lines(self, since=None, tag=None, pid=None):
+        """
+        Get lines from buffer.
+        :param since: Marker returned by `marker()` (by default all lines in buffer).
+        :param tag: Log tag (for example `ActivityManager`).
+        :param pid: Process id.
+        :return: List of lines.
+        """
+        since = since or 0
+        with self.condition:
+            if tag is None and pid is None:
+                return [line for seq, line in LogcatStream.__since(self.lines, since, key=lambda item: item[0])]
+            seqs = None
+            if tag is not None:
+                seqs = LogcatStream.__since(self.by_tag.get(tag, []), since)
+            if pid is not None:
+                pid_seqs = LogcatStream.__since(self.by_pid.get(str(pid), []), since)
+                seqs = pid_seqs if seqs is None else sorted(set(seqs).intersection(pid_seqs))
+            lines = [self.__line(seq) for seq in seqs]
+            return [line for line in lines if line is not None]
+
+    def get_text(self, since=None):
+        """
+        Get log as text.
+        :param since: Marker returned by `marker()` (by default all lines in buffer).
+        """
+        return '\n'.join(self.get_lines(since=since))
+
+    def wait_for(self, pattern, since=None, tag=None, timeout=60):
+        """
+        Wait until line that match pattern is logged.
+        :param pattern: Regular expression (or plain text).
+        :param since: Marker returned by `marker()` (by default all lines in buffer).
+        :param tag: Check only lines with this log tag.
+        :param timeout: Timeout in seconds.
+        :return: List of matching lines (empty list if pattern is not found before timeout).
+        """
+        regex = re.compile(pattern)
+        since = since or 0
+        end_time = time.time() + timeout
+        with self.condition:
+            while True:
+                # Lines before `since` are already checked, so only new lines are matched on each wakeup
+                lines = self.get_lines(since=since, tag=tag)
+                since = self.next_seq
+                matches = [line for line in lines if regex.search(line)]
+                remaining = end_time - time.time()
+                if matches or remaining <= 0 or not self.running:
+                    return matches
+                self.condition.wait(remaining)
+
+    def clear(self):
+        """
+        Drop all lines in buffer.
+        """
+        with self.condition:
+            self.lines.clear()
+            self.by_tag.clear()
+            self.by_pid.clear()
+
+    def stop(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+
+class Logcat(object):
+    __streams = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get(device_id):
+        """
+        Get logcat stream of device (start it if it is not running).
+        :param device_id: Device identifier.
+        :return: LogcatStream object.
+        """
+        with Logcat.__lock:
+            stream = Logcat.__streams.get(device_id)
+            if stream is None or not stream.running:
+                stream = LogcatStream(device_id=device_id)
+                Logcat.__streams[device_id] = stream
+            return stream
+
+    @staticmethod
+    def stop(device_id=None):
+        """
+        Stop logcat stream of device (by default stop all streams).
+        """
+        with Logcat.__lock:
+            device_ids = [device_id] if device_id is not None else Logcat.__streams.keys()
+            for key in device_ids:
+                stream = Logcat.__streams.pop(key, None)
+                if stream is not None:
+                    stream.stop()
@@ -0,0 +1,172 @@
+"""
+Measure start time of Android applications.
+
+Values are collected as integers (milliseconds):
+- `total_time` and `wait_time` from `am start -W` output.
+- `displayed` from `ActivityManager: Displayed <activity>: +1s234ms` logcat line.
+"""
+import csv
+import json
+import math
+import os
+import re
+import time
+
+from core.device.helpers.adb import Adb
+from core.device.helpers.logcat import Logcat
+from core.osutils.command_log_level import CommandLogLevel
+from core.osutils.folder import Folder
+from core.settings.settings import START_TIME_FOLDER
+
+DEFAULT_ACTIVITY = 'com.tns.NativeScriptActivity'
+METRICS = ['total_time', 'wait_time', 'displayed']
+
+
+class StartTime(object):
+    @staticmethod
+    def parse_am_start(output):
+        """
+        Parse output of `am start -W`.
+        :return: Dict with `total_time` and `wait_time` in milliseconds (None if value is not reported).
+        """
+        result = {}
+        for key, name in (('total_time', 'TotalTime'), ('wait_time', 'WaitTime')):
+            match = re.search(name + r':\s*(\d+)', output)
+            result[key] = int(match.group(1)) if match else None
+        return result
+
+    @staticmethod
+    def launch(device_id, app_id, activity=DEFAULT_ACTIVITY, cold=True):
+        """
+        Launch application and measure its start time.
+        :param device_id: Device id.
+        :param app_id: App id.
+        :param activity: Launcher activity.
+        :param cold: If True application is stopped before launch, else it is only sent to background.
+        :return: Dict with `total_time`, `wait_time` and `displayed` values in milliseconds.
+        """
+        if cold:
+            Adb.run(command='shell am force-stop ' + app_id, device_id=device_id, log_level=CommandLogLevel.SILENT)
+        else:
+            Adb.run(command='shell input keyevent 3', device_id=device_id, log_level=CommandLogLevel.SILENT)
+        try:
+            logcat = Logcat.get(device_id)
+            marker = logcat.marker()
+        except IOError:
+            logcat = None
+            marker = None
+
+        component = app_id + '/' + activity
+        output = Adb.run(command='shell am start -W -n ' + component, device_id=device_id,
+                         log_level=CommandLogLevel.SILENT)
+        assert 'Error' not in output, 'Failed to start {0}. Output: {1}'.format(component, output)
+        result = StartTime.parse_am_start(output)
+
+        result['displayed'] = None
+        if logcat is not None:
+            # `Displayed` is not logged for warm start if activity is only brought to front.
+            lines = logcat.wait_for(pattern='Displayed ' + re.escape(app_id), since=marker, timeout=5 if cold else 1)
+            if lines:
+                result['displayed'] = Adb.parse_displayed_time(lines[0])
+        return result
+
+    @staticmethod
+    def get_stats(values):
+        """
+        Get statistics of measured values (None values are ignored).
+        :return: Dict with count, min, max, median, p90 and stddev.
+        """
+        values = sorted(value for value in values if value is not None)
+        count = len(values)
+        if count == 0:
+            return {'count': 0, 'min': None, 'max': None, 'median': None, 'p90': None, 'stddev': None}
+        middle = count // 2
+        median = values[middle] if count % 2 else (values[middle - 1] + values[middle]) / 2.0
+        p90 = values[int(math.ceil(0.9 * count)) - 1]
+        mean = float(sum(values)) / count
+        stddev = math.sqrt(sum((value - mean) ** 2 for value in values) / (count - 1)) if count > 1 else 0.0
+        return {'count': count, 'min': values[0], 'max': values[-1], 'median': median, 'p90': p90,
+                'stddev': round(stddev, 2)}
+
+    @staticmethod
+    def measure(device_id, app_id, runs=10, activity=DEFAULT_ACTIVITY, cold=True):
+        """
+        Launch application several times.
+        :return: Dict with metric name as key and dict with `values` and statistics as value.
+        """
+        samples = dict((metric, []) for metric in METRICS)
+        if not cold:
+            # Warm start needs running application
+            StartTime.launch(device_id=device_id, app_id=app_id, activity=activity, cold=True)
+        for run_number in range(runs):
+            result = StartTime.launch(device_id=device_id, app_id=app_id, activity=activity, cold=cold)
+            print '{0} start #{1} of {2}: {3}'.format('Cold' if cold else 'Warm', run_number + 1, app_id, result)
+            for metric in METRICS:
+                samples[metric].append(result[metric])
+        report = {}
+        for metric in METRICS:
+            report[metric] = StartTime.get_stats(samples[metric])
+            report[metric]['values'] = samples[metric]
+        return report
+
+    @staticmethod
+    def benchmark(device_id, app_id, runs=10, activity=DEFAULT_ACTIVITY, name=None, output_folder=None):
+        """
+        Measure cold and warm start time of application and append results to history files.
+        History is saved in `<output_folder>/<name>.json` (list of reports)
+        and `<output_folder>/<name>.csv` (one row per mode and metric).
+        :param device_id: Device id.
+        :param app_id: App id.
+        :param runs: Number of launches for each mode.
+        :param activity: Launcher activity.
+        :param name: Name of benchmark (default is app id).
+        :param output_folder: Folder where history is saved (default is START_TIME_FOLDER, `out` folder is not
+        used because it is deleted on each test run).
+        :return: Report as dict.
+        """
+        report = {'app_id': app_id, 'device_id': device_id, 'runs': runs,
+                  'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'cold': StartTime.measure(device_id=device_id, app_id=app_id, runs=runs, activity=activity,
+                                            cold=True),
+                  'warm': StartTime.measure(device_id=device_id, app_id=app_id, runs=runs, activity=activity,
+                                            cold=False)}
+        for mode in ('cold', 'warm'):
+            for metric in METRICS:
+                stats = report[mode][metric]
+                print '{0} {1} {2}: median={3} p90={4} stddev={5}'.format(app_id, mode, metric, stats['median'],
+                                                                          stats['p90'], stats['stddev'])
+        StartTime.save(report=report, name=name or app_id, output_folder=output_folder)
+        return report
+
+    @staticmethod
+    def save(report, name, output_folder=None):
+        """
+        Append report to JSON and CSV history files.
+        """
+        folder = output_folder or START_TIME_FOLDER
+        if not os.path.isdir(folder):
+            Folder.create(folder)
+
+        json_path = os.path.join(folder, name + '.json')
+        history = []
+        if os.path.isfile(json_path):
+            with open(json_path, 'r') as f:
+                history = json.load(f)
+        history.append(report)
+        with open(json_path, 'w') as f:
+            json.dump(history, f, indent=2, sort_keys=True)
+
+        csv_path = os.path.join(folder, name + '.csv')
+        columns = ['timestamp', 'app_id', 'device_id', 'mode', 'metric', 'count', 'min', 'max', 'median', 'p90',
+                   'stddev']
+        write_header = not os.path.isfile(csv_path)
+        with open(csv_path, 'ab') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(columns)
+            for mode in ('cold', 'warm'):
+                for metric in METRICS:
+                    row = dict(report[mode][metric], timestamp=report['timestamp'], app_id=report['app_id'],
+                               device_id=report['device_id'], mode=mode, metric=metric)
+                    writer.writerow([row[column] for column in columns])
+        print 'Start time history saved at ' + json_path
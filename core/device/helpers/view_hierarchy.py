@@ -0,0 +1,52 @@
+"""
+Parsed view hierarchy (uiautomator dump) of Android device.
+"""
+import collections
+from xml.etree import ElementTree
+
+
+class ViewHierarchy(object):
+    def __init__(self, xml):
+        """
+        Parse view hierarchy and index its nodes by text, content description and resource id.
+        :param xml: XML document returned by uiautomator dump.
+        """
+        self.xml = xml
+        self.nodes = []
+        self.by_text = collections.defaultdict(list)
+        self.by_resource_id = collections.defaultdict(list)
+        root = ElementTree.fromstring(xml.encode('utf-8') if isinstance(xml, unicode) else xml)
+        for node in root.iter('node'):
+            attributes = node.attrib
+            self.nodes.append(attributes)
+            for key in ('text', 'content-desc'):
+                value = attributes.get(key)
+                if value:
+                    self.by_text[value].append(attributes)
+            resource_id = attributes.get('resource-id')
+            if resource_id:
+                self.by_resource_id[resource_id].append(attributes)
+
+    def find(self, text=None, resource_id=None, partial=False):
+        """
+        Find nodes.
+        :param text: Text or content description of node.
+        :param resource_id: Resource id of node (for example `org.nativescript.TestApp:id/button`).
+        :param partial: If True text is matched as sub string.
+        :return: List of dicts with attributes of nodes.
+        """
+        if text is None:
+            nodes = self.by_resource_id.get(resource_id, []) if resource_id is not None else self.nodes
+        elif partial:
+            nodes = [node for value, value_nodes in self.by_text.items() if text in value for node in value_nodes]
+        else:
+            nodes = self.by_text.get(text, [])
+        if resource_id is not None:
+            nodes = [node for node in nodes if node.get('resource-id') == resource_id]
+        return nodes
+
+    def contains_text(self, text):
+        """
+        Check if text is on the screen (as part of text or content description of any node).
+        """
+        return any(text in value for value in self.by_text)
@@ -8,7 +8,12 @@ from core.osutils.command import run
 from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.process import Process
-from core.settings.settings import SIMULATOR_NAME, TEST_RUN_HOME, SIMULATOR_TYPE, SIMULATOR_SDK
+from core.osutils.watcher import Watcher
+from core.settings.context import Context
+from core.settings.settings import SIMULATOR_TYPE, SIMULATOR_SDK
+
+# App container changes when app is reinstalled, so path waits resolve it again at least this often (in seconds).
+APP_CONTAINER_CHECK_INTERVAL = 1
 
 
 class Simulator(object):
@@ -25,7 +30,8 @@ class Simulator(object):
         Check if simulator app is visible
         :return: True if visible, False if not visible
         """
-        script_path = os.path.join(TEST_RUN_HOME, 'core', 'device', 'helpers', 'macos_get_visible_apps')
+        script_path = os.path.join(Context.current().test_run_home, 'core', 'device', 'helpers',
+                                   'macos_get_visible_apps')
         visible_apps = run(command='osascript ' + script_path, log_level=CommandLogLevel.SILENT)
         if "Simulator" in visible_apps:
             return True
@@ -195,12 +201,7 @@ class Simulator(object):
         """
         if device_id == 'booted':
             print 'Stop all running simulators.'
-            Process.kill('Simulator')
-            Process.kill('tail')
-            Process.kill('launchd_sim')
-            command = "ps -ef  | grep 'CoreSimulator' | grep -v grep | awk '{ print $2 }' | xargs kill -9"
-            run(command=command, log_level=CommandLogLevel.SILENT)
-            time.sleep(1)
+            Process.kill_all([('Simulator', None), ('tail', None), ('launchd_sim', None), (None, 'CoreSimulator')])
         else:
             print 'Stop simulator with id ' + device_id
         run(command='xcrun simctl shutdown {0}'.format(device_id), timeout=60, log_level=CommandLogLevel.SILENT)
@@ -223,7 +224,7 @@ class Simulator(object):
         """
         delete_output = ""
         output = run(command='xcrun simctl list | grep \'{0}\''.format(name), log_level=CommandLogLevel.SILENT)
-        while (SIMULATOR_NAME in output) and ('Invalid' not in output):
+        while (name in output) and ('Invalid' not in output):
             if 'Booted' in output:
                 run('xcrun simctl shutdown \'{0}\''.format(name), log_level=CommandLogLevel.SILENT)
                 Simulator.stop()
@@ -268,13 +269,19 @@ class Simulator(object):
         :return: True if path exists, false if path does not exists
         """
         t_end = time.time() + timeout
-        found = False
-        while time.time() < t_end:
-            files = Simulator.__list_path(package_id=package_id, path=path)
-            if 'No such file or directory' not in files:
-                found = True
-                break
-        return found
+        while True:
+            remaining = max(t_end - time.time(), 0)
+            try:
+                base_path = Simulator.__get_bundle_path(package_id=package_id)
+            except NameError:
+                # App is not installed (yet)
+                time.sleep(min(APP_CONTAINER_CHECK_INTERVAL, remaining))
+            else:
+                wait_timeout = min(APP_CONTAINER_CHECK_INTERVAL, remaining)
+                if Watcher.wait_for_path(path=os.path.join(base_path, path), timeout=wait_timeout):
+                    return True
+            if time.time() >= t_end:
+                return False
 
     @staticmethod
     def path_does_not_exist(package_id, path, timeout=20):
@@ -5,20 +5,20 @@ import os
 
 from core.npm.npm import Npm
 from core.osutils.file import File
-from core.settings.settings import SUT_FOLDER, TEST_RUN_HOME
+from core.settings.context import Context
 
 
 class Cli(object):
     @staticmethod
     def install():
-        package = File.find(base_path=SUT_FOLDER, file_name="nativescript")
-        output = Npm.install(package=package, folder=TEST_RUN_HOME)
+        package = File.find(base_path=Context.current().sut_folder, file_name="nativescript")
+        output = Npm.install(package=package, folder=Context.current().test_run_home)
         message = "NativeScript CLI installation failed - \"{e}\" found in output."
         assert "dev-post-install" not in output, message.format(e="dev-post-install")
-        cli_path = os.path.join(TEST_RUN_HOME, "node_modules", ".bin", "tns")
+        cli_path = os.path.join(Context.current().test_run_home, "node_modules", ".bin", "tns")
         assert File.exists(cli_path), "NativeScript CLI installation failed - tns does not exist."
 
     @staticmethod
     def uninstall():
-        output = Npm.uninstall(package="nativescript", folder=TEST_RUN_HOME)
+        output = Npm.uninstall(package="nativescript", folder=Context.current().test_run_home)
         print output
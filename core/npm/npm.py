@@ -6,7 +6,8 @@ from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.os_type import OSType
-from core.settings.settings import TEST_RUN_HOME, CURRENT_OS, USE_YARN
+from core.settings.context import Context
+from core.settings.settings import CURRENT_OS, USE_YARN
 
 
 class Npm(object):
@@ -16,7 +17,7 @@ class Npm(object):
             Folder.navigate_to(folder=folder, relative_from_current_folder=True)
         output = run('npm {0}'.format(command), log_level=log_level)
         if folder is not None:
-            Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+            Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         return output
 
     @staticmethod
@@ -25,7 +26,7 @@ class Npm(object):
             Folder.navigate_to(folder=folder, relative_from_current_folder=True)
         output = run('yarn {0}'.format(command), log_level=log_level)
         if folder is not None:
-            Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+            Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         return output
 
     @staticmethod
@@ -47,7 +48,7 @@ class Npm(object):
             File.remove(src_file)
         except:
             print 'Failed to pack {0}'.format(folder)
-        Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
 
     @staticmethod
     def install(package='', option='', folder=None, log_level=CommandLogLevel.FULL):
@@ -3,6 +3,9 @@ This file contains all the commons.
 """
 
 import os
+import select
+import signal
+import subprocess
 import threading
 import time
 from datetime import datetime
@@ -11,95 +14,267 @@ from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
-from core.settings.settings import OUTPUT_FILE, COMMAND_TIMEOUT, TEST_LOG, OUTPUT_FILE_ASYNC, CURRENT_OS
+from core.settings.context import Context
+from core.settings.settings import COMMAND_TIMEOUT, CURRENT_OS
 
+# How often reader of command output checks if command has exited (when no output is available).
+PIPE_POLL_INTERVAL = 0.05
+# Max time to wait for remaining output after command has exited (only on Windows, where pipes can not be polled).
+WINDOWS_DRAIN_TIMEOUT = 1
 
-def run(command, timeout=COMMAND_TIMEOUT, output=True, wait=True, log_level=CommandLogLevel.FULL):
+
+def _new_group_args():
     """
-    Execute command in shell.
-    :param command: Command to be executed.
-    :param timeout: Timeout for command execution.
-    :param output:
-    :param wait: Specify if method should wait until command execution complete.
-    :param log_level: CommandLogLevel value (SILENT, COMMAND_ONLY, FULL).
-    :return: If wait=True return output of the command, else return path to file where command writes log.
+    Popen arguments that start the child in its own process group (session on posix).
+    All processes spawned by the command (node, gradle, webpack) stay in this group.
     """
+    if CURRENT_OS is OSType.WINDOWS:
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        return {'preexec_fn': os.setsid}
+
+
+def _kill_group(process):
+    """
+    Kill process tree started by `run()` without scanning the process table.
+    :param process: subprocess.Popen object started with `_new_group_args()`.
+    """
+    if CURRENT_OS is OSType.WINDOWS:
+        with open(os.devnull, 'w') as devnull:
+            subprocess.call('taskkill /F /T /PID {0}'.format(process.pid), stdout=devnull, stderr=devnull)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def _read_pipe(pipe, buffer_list, exited):
+    """
+    Drain pipe of a child process in the buffer of the current invocation.
+    Daemons started by the command (adb server, gradle daemon) may inherit the pipe and keep it open,
+    so reading stops at EOF or once the process has exited and there is no more data in the pipe.
+    :param pipe: Readable pipe (stdout of the child process).
+    :param buffer_list: List where chunks of output are collected.
+    :param exited: threading.Event set when the process has exited.
+    """
+    if CURRENT_OS is OSType.WINDOWS:
+        for line in iter(pipe.readline, b''):
+            buffer_list.append(line)
+    else:
+        fd = pipe.fileno()
+        while True:
+            ready, _, _ = select.select([fd], [], [], PIPE_POLL_INTERVAL)
+            if ready:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                buffer_list.append(chunk)
+            elif exited.is_set():
+                break
+    pipe.close()
+
+
+class CommandHandle(object):
+    """
+    Handle of command started with `run(wait=False, handle=True)`.
+
+    Output of the command is still written to `log_file` (so `Tns.wait_for_log` works as before),
+    but it is also available line by line as soon as the process prints it.
+    """
+
+    def __init__(self, command, process, log_file):
+        self.command = command
+        self.process = process
+        self.log_file = log_file
+        self.__output = []
+        self.__position = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__reader = threading.Thread(target=self.__read)
+        self.__reader.daemon = True
+        self.__reader.start()
+
+    def __read(self):
+        # Log is opened in append mode, so `Tns.wait_for_log(clean_log=True)` can truncate it while process writes.
+        with open(self.log_file, 'a') as log:
+            for line in iter(self.process.stdout.readline, b''):
+                log.write(line)
+                log.flush()
+                with self.__condition:
+                    self.__output.append(line)
+                    self.__condition.notify_all()
+        self.process.stdout.close()
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+    def __iter__(self):
+        """
+        Iterate over lines of the output (blocks until next line is available or output is closed).
+        """
+        position = 0
+        while True:
+            with self.__condition:
+                while position >= len(self.__output) and not self.__closed:
+                    self.__condition.wait()
+                if position >= len(self.__output):
+                    return
+                line = self.__output[position]
+            position += 1
+            yield line.rstrip('\r\n')
+
+    def wait_for_output(self, count, timeout):
+        """
+        Wait until output has more than `count` lines or output is closed.
+        :param count: Number of lines already processed by caller.
+        :param timeout: Timeout in seconds.
+        :return: Number of lines of the output.
+        """
+        t_end = time.time() + timeout
+        with self.__condition:
+            while len(self.__output) <= count and not self.__closed:
+                remaining = t_end - time.time()
+                if remaining <= 0:
+                    break
+                self.__condition.wait(remaining)
+            return len(self.__output)
 
-    def fork_it():
+    @property
+    def output(self):
+        """
+        :return: Output collected so far.
         """
-        This function will be emulate in a parallel thread.
+        with self.__condition:
+            return ''.join(self.__output)
 
-        You can redirect the output to one place and the errors to another:
-        # dir file.xxx > output.msg 2> output.err
+    @property
+    def exit_code(self):
+        """
+        :return: Exit code of the process or None if it is still running.
+        """
+        return self.process.poll()
 
-        You can print the errors and standard output to a single file
-        by using the "&1" command to redirect the output for STDERR to STDOUT
-        and then sending the output from STDOUT to a file:
-        # dir file.xxx 1> output.msg 2>&1
+    def expect(self, patterns, timeout=60):
+        """
+        Wait until output line contains any of the patterns.
+        Each call continues from the line after previous match.
+        :param patterns: String or list of strings.
+        :param timeout: Timeout in seconds.
+        :return: First matched pattern or None if timeout is reached or output is closed.
         """
+        if isinstance(patterns, basestring):
+            patterns = [patterns]
+        t_end = time.time() + timeout
+        with self.__condition:
+            while True:
+                while self.__position < len(self.__output):
+                    line = self.__output[self.__position]
+                    self.__position += 1
+                    for pattern in patterns:
+                        if pattern in line:
+                            print "'{0}' found.".format(pattern)
+                            return pattern
+                remaining = t_end - time.time()
+                if self.__closed or remaining <= 0:
+                    print "'{0}' NOT found.".format(patterns)
+                    return None
+                self.__condition.wait(remaining)
 
-        # execute command
-        # print "Thread started"
-        if output:
-            os.system(command + ' 1> ' + out_file + ' 2>&1')
-        else:
-            os.system(command)
+    def wait(self, timeout=COMMAND_TIMEOUT):
+        """
+        Wait until process exit.
+        :param timeout: Timeout in seconds.
+        :return: Exit code of the process or None if it is still running after timeout.
+        """
+        # Process is reaped only via poll() in caller thread (Popen of Python 2 is not thread safe)
+        if Process.wait_for_exit(self.process, timeout=timeout) is not None:
+            self.__reader.join(5)
+        return self.exit_code
 
-    # If wait=False log should be writen
-    out_file = OUTPUT_FILE
-    if not wait:
-        time_string = "_" + datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
-        out_file = OUTPUT_FILE_ASYNC.replace('.', time_string + '.')
-        if CURRENT_OS is OSType.WINDOWS:
-            command = command + " 1> " + out_file + " 2>&1"
-        elif CURRENT_OS is OSType.LINUX:
-            command = command + " 1> " + out_file + " 2>&1 &"
-        else:
-            command = command + " &> " + out_file + " 2>&1 &"
-
-    # remove output.txt
-    try:
-        File.remove(out_file)
-    except OSError:
-        print "Failed to delete " + out_file
-        time.sleep(1)
-        File.remove(out_file)
+    def terminate(self):
+        """
+        Kill the process and all its children.
+        :return: Exit code of the process.
+        """
+        if self.exit_code is None:
+            _kill_group(self.process)
+            print "Process {0} has been killed.".format(self.process.pid)
+        return self.wait()
+
+
+def run(command, timeout=COMMAND_TIMEOUT, output=True, wait=True, log_level=CommandLogLevel.FULL, handle=False):
+    """
+    Execute command in shell.
+    :param command: Command to be executed.
+    :param timeout: Timeout for command execution.
+    :param output:
+    :param wait: Specify if method should wait until command execution complete.
+    :param log_level: CommandLogLevel value (SILENT, COMMAND_ONLY, FULL).
+    :param handle: If True and wait=False return CommandHandle instead of path to log file.
+    :return: If wait=True return output of the command, else return path to file where command writes log
+    (or CommandHandle if handle=True).
+    """
 
     # log command that is executed (and append to TEST_LOG file)
     if log_level is not CommandLogLevel.SILENT:
-        File.append(TEST_LOG, command)
+        File.append(Context.current().test_log, command)
         print "##### {0} Executing command : {1}\n".format(time.strftime("%X"), command)
 
-    # Hack for async commands on Windows
-    if CURRENT_OS is OSType.WINDOWS:
-        if not wait:
-            timeout = 10
+    # If wait=False log should be writen (stdout and stderr of the process go directly to the log file)
+    if not wait:
+        time_string = "_" + datetime.now().strftime('%Y_%m_%d_%H_%M_%S')
+        base_name, extension = os.path.splitext(Context.current().output_file_async)
+        out_file = base_name + time_string + extension
+        File.remove(out_file)
+        if handle:
+            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       **_new_group_args())
+            return CommandHandle(command=command, process=process, log_file=out_file)
+        # Log is opened in append mode, so `Tns.wait_for_log(clean_log=True)` can truncate it while process writes.
+        with open(out_file, 'a') as log:
+            subprocess.Popen(command, shell=True, stdout=log, stderr=subprocess.STDOUT, **_new_group_args())
+        return out_file
+
+    # Output of the command is collected in memory (per invocation buffer)
+    buffer_list = []
+    reader = None
+    exited = threading.Event()
+    if output:
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   **_new_group_args())
+        reader = threading.Thread(target=_read_pipe, args=(process.stdout, buffer_list, exited))
+        reader.daemon = True
+        reader.start()
+    else:
+        process = subprocess.Popen(command, shell=True, **_new_group_args())
 
-    # prepare command line
-    thread = threading.Thread(target=fork_it)
-    thread.start()
+    # wait for process to finish or timeout
+    waiter = threading.Thread(target=process.wait)
+    waiter.daemon = True
+    waiter.start()
+    waiter.join(timeout)
 
-    # wait for thread to finish or timeout
-    thread.join(timeout)
+    # kill process (and all its children) if it exceed the timeout
+    if waiter.is_alive():
+        _kill_group(process)
+        print "Process {0} has been killed.".format(process.pid)
+        waiter.join()
+        exited.set()
+        raise NameError('Process has timed out at ' + time.strftime("%X"))
 
-    # kill thread if it exceed the timeout
-    if thread.is_alive():
-        if wait:
-            Process.kill_by_commandline(command.partition(' ')[0].rpartition(os.sep)[-1])
-            thread.join()
-            raise NameError('Process has timed out at ' + time.strftime("%X"))
+    # Reader stops as soon as pipe is drained (see `_read_pipe`).
+    exited.set()
+    if reader is not None:
+        reader.join(WINDOWS_DRAIN_TIMEOUT if CURRENT_OS is OSType.WINDOWS else None)
 
-    # get whenever exist in the pipe ?
     pipe_output = 'NOT_COLLECTED'
     if output:
-        pipe_output = File.read(out_file)
+        pipe_output = ''.join(buffer_list)
 
-    if (log_level is CommandLogLevel.FULL) and wait:
+    if log_level is CommandLogLevel.FULL:
         print "##### OUTPUT BEGIN #####\n"
         print pipe_output
         print "##### OUTPUT END #####\n"
 
-    if wait:
-        return pipe_output.strip('\r\n')
-    else:
-        return out_file
+    return pipe_output.strip('\r\n')
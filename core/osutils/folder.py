@@ -2,6 +2,8 @@
 Wrapper around Folders
 """
 
+import ctypes
+import ctypes.util
 import errno
 import os
 import platform
@@ -9,10 +11,24 @@ import shutil
 
 from core.osutils.command import run
 from core.osutils.file import File
+from core.osutils.os_type import OSType
 from core.osutils.process import Process
+from core.osutils.trash import Trash
+from core.settings.settings import CURRENT_OS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl request to share data blocks of two files (btrfs, xfs with reflink=1, ...)
+FICLONE = 0x40049409
 
 
 class Folder(object):
+    # (source device, destination device) pairs on which reflink failed
+    __reflink_unsupported = set()
+
     @staticmethod
     def create(folder):
         if not os.path.exists(folder):
@@ -22,7 +38,15 @@ class Folder(object):
                 raise
 
     @staticmethod
-    def cleanup(folder, force=True):
+    def cleanup(folder, force=True, wait=False):
+        """
+        Delete folder.
+        :param folder: Folder path.
+        :param force: If True kill processes that lock the folder (on Windows).
+        :param wait: If False folder is moved to trash and deleted in background.
+        """
+        if os.path.lexists(folder) and not wait and Trash.move(folder):
+            return
         if os.path.exists(folder):
             try:
                 shutil.rmtree(folder, False)
@@ -69,13 +93,63 @@ class Folder(object):
         os.chdir(new_folder)
 
     @staticmethod
-    def copy(src, dst, only_files=False):
+    def __reflink(src, dst):
+        """
+        Clone file with copy-on-write (reflink on Linux, clonefile on macOS).
+        :return: True if file is cloned, False if file system does not support it.
+        """
+        if CURRENT_OS is OSType.WINDOWS:
+            return False
+        devices = (os.stat(src).st_dev, os.stat(os.path.dirname(os.path.abspath(dst))).st_dev)
+        if devices in Folder.__reflink_unsupported:
+            return False
+        try:
+            if CURRENT_OS is OSType.OSX:
+                libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+                if libc.clonefile(src, dst, 0) != 0:
+                    raise OSError(ctypes.get_errno(), 'clonefile failed')
+            else:
+                with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+                    fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+                shutil.copystat(src, dst)
+            return True
+        except (IOError, OSError, AttributeError):
+            # Do not try again on same file systems, they do not support it
+            Folder.__reflink_unsupported.add(devices)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            return False
+
+    @staticmethod
+    def __clone_tree(src, dst):
+        """
+        Clone folder (files are reflinked, copied if reflink fails).
+        :param src: Source folder.
+        :param dst: Destination folder.
+        """
+        os.makedirs(dst)
+        for name in os.listdir(src):
+            src_path = os.path.join(src, name)
+            dst_path = os.path.join(dst, name)
+            if os.path.islink(src_path):
+                os.symlink(os.readlink(src_path), dst_path)
+            elif os.path.isdir(src_path):
+                Folder.__clone_tree(src_path, dst_path)
+            elif not Folder.__reflink(src_path, dst_path):
+                shutil.copy2(src_path, dst_path)
+        shutil.copystat(src, dst)
+
+    @staticmethod
+    def copy(src, dst, only_files=False, clone=False):
         """
         Copy src folder in the dst folder.
         :param only_files: If it's set to True - only the files from src folder are copied to dst folder.
         If it's set to False - src folder with all files in it are copied.
+        :param clone: If True files are reflinked (copy-on-write) when file system supports it (copied if not).
         """
-        if only_files is True:
+        if clone and not only_files and os.path.isdir(src) and CURRENT_OS is not OSType.WINDOWS:
+            Folder.__clone_tree(src, dst)
+        elif only_files is True:
             files = os.listdir(src)
 
             for f in files:
@@ -1,40 +1,247 @@
+import collections
+import json
+import os
+
 from PIL import Image
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Rows on top of the image (status bar) that are not compared.
+CROP_TOP = 40
+# Pixels are different if sum of their RGB values differs more than this.
+PIXEL_THRESHOLD = 30
+DIFF_COLOR = (255, 0, 0)
+# Size of blocks (in pixels) used by `is_near_match`.
+BLOCK_SIZE = 16
+# Max number of decoded expected images kept in memory.
+EXPECTED_CACHE_SIZE = 20
+# Sidecar file next to expected image (`<name>.mask.json` for `<name>.png`) with regions that are compared/ignored.
+# Example: {"roi": [[0, 100, 1080, 1600]], "ignore": [[900, 40, 180, 60]]}, regions are [x, y, width, height].
+MASK_EXTENSION = '.mask.json'
+
+ExpectedImage = collections.namedtuple('ExpectedImage', ['image', 'mask', 'compared', 'block_sums', 'block_counts'])
+
 
 class ImageUtils(object):
+    __expected_cache = collections.OrderedDict()
+
     @staticmethod
-    def image_match(actual_image_path, expected_image_path, tolerance=0.05):
+    def get_mask_path(image_path):
         """
-        Compare two images.
-        :param actual_image_path: Path to actual image.
+        Get path of mask sidecar file of image.
+        """
+        return os.path.splitext(image_path)[0] + MASK_EXTENSION
+
+    @staticmethod
+    def read_mask(image_path):
+        """
+        Read mask sidecar file of image.
+        :param image_path: Path to image.
+        :return: Dict with `roi` and `ignore` lists of (x, y, width, height) regions
+        (empty `roi` means whole image is compared), None if image has no mask.
+        """
+        mask_path = ImageUtils.get_mask_path(image_path)
+        if not os.path.isfile(mask_path):
+            return None
+        with open(mask_path, 'r') as f:
+            mask = json.load(f)
+        for key in ('roi', 'ignore'):
+            mask[key] = [tuple(region) for region in mask.get(key, [])]
+            for region in mask[key]:
+                assert len(region) == 4, 'Invalid region {0} in {1}'.format(region, mask_path)
+        return mask
+
+    @staticmethod
+    def __is_compared(x, y, mask):
+        """
+        Check if pixel is compared (used when numpy is not available).
+        """
+        def inside(region):
+            return region[0] <= x < region[0] + region[2] and region[1] <= y < region[1] + region[3]
+
+        if mask['roi'] and not any(inside(region) for region in mask['roi']):
+            return False
+        return not any(inside(region) for region in mask['ignore'])
+
+    @staticmethod
+    def __compared_area(width, height, mask):
+        """
+        Get boolean array (height x width) where True means pixel is compared.
+        """
+        if mask is None or not mask['roi']:
+            compared = numpy.ones((height, width), dtype=bool)
+        else:
+            compared = numpy.zeros((height, width), dtype=bool)
+            for x, y, region_width, region_height in mask['roi']:
+                compared[max(y, 0):max(y + region_height, 0), max(x, 0):max(x + region_width, 0)] = True
+        if mask is not None:
+            for x, y, region_width, region_height in mask['ignore']:
+                compared[max(y, 0):max(y + region_height, 0), max(x, 0):max(x + region_width, 0)] = False
+        compared[:CROP_TOP, :] = False
+        return compared
+
+    @staticmethod
+    def __block_sums(image, compared):
+        """
+        Get sums of RGB values of compared pixels in blocks of BLOCK_SIZE x BLOCK_SIZE pixels.
+        Blocks start at CROP_TOP row (incomplete blocks are skipped).
+        :return: Tuple of arrays with sums and with number of compared pixels in each block.
+        """
+        height, width = compared.shape
+        rows = max(0, (height - CROP_TOP) // BLOCK_SIZE)
+        columns = width // BLOCK_SIZE
+        area = (slice(CROP_TOP, CROP_TOP + rows * BLOCK_SIZE), slice(0, columns * BLOCK_SIZE))
+        pixels = numpy.asarray(image)[area[0], area[1], :3]
+        sums = pixels.sum(axis=2, dtype=numpy.int64) * compared[area]
+        counts = compared[area].astype(numpy.int64)
+        return (sums.reshape(rows, BLOCK_SIZE, columns, BLOCK_SIZE).sum(axis=(1, 3)),
+                counts.reshape(rows, BLOCK_SIZE, columns, BLOCK_SIZE).sum(axis=(1, 3)))
+
+    @staticmethod
+    def get_expected(image_path):
+        """
+        Get decoded expected image with its mask and block sums (cached in memory until image or mask is changed).
+        :param image_path: Path to image.
+        :return: ExpectedImage tuple (`compared`, `block_sums` and `block_counts` are None if numpy is not available).
+        """
+        mask_path = ImageUtils.get_mask_path(image_path)
+        stat = os.stat(image_path)
+        version = (stat.st_mtime, stat.st_size, os.path.getmtime(mask_path) if os.path.isfile(mask_path) else None)
+        key = os.path.abspath(image_path)
+        entry = ImageUtils.__expected_cache.pop(key, None)
+        if entry is None or entry[0] != version:
+            image = Image.open(image_path)
+            image.load()
+            mask = ImageUtils.read_mask(image_path)
+            compared = block_sums = block_counts = None
+            if numpy is not None and image.mode in ('RGB', 'RGBA'):
+                compared = ImageUtils.__compared_area(image.size[0], image.size[1], mask)
+                block_sums, block_counts = ImageUtils.__block_sums(image, compared)
+            entry = (version, ExpectedImage(image, mask, compared, block_sums, block_counts))
+        ImageUtils.__expected_cache[key] = entry
+        while len(ImageUtils.__expected_cache) > EXPECTED_CACHE_SIZE:
+            ImageUtils.__expected_cache.popitem(last=False)
+        return entry[1]
+
+    @staticmethod
+    def is_near_match(actual_image, expected_image_path, tolerance=0.05):
+        """
+        Cheap check if images can match (call `image_match` only if it returns True).
+
+        Images are compared by sums of RGB values in blocks. In block of n compared pixels at least
+        (|actual sum - expected sum| - n * PIXEL_THRESHOLD) / (765 - PIXEL_THRESHOLD) pixels are different,
+        so False is returned only if `image_match` would report diff above tolerance.
+        :param actual_image: Path to actual image (or PIL Image).
         :param expected_image_path: Path to expected image.
         :param tolerance: Tolerance in percents.
-        :return: match (boolean value), diff_percent (diff %), diff_image (diff image)
+        :return: False if images do not match for sure, True if they may match.
+        """
+        expected = ImageUtils.get_expected(expected_image_path)
+        actual_image = ImageUtils.__open(actual_image)
+        if expected.block_sums is None or actual_image.mode not in ('RGB', 'RGBA'):
+            return True
+        width, height = expected.image.size
+        if actual_image.size[0] < width or actual_image.size[1] < height:
+            return True
+        actual_sums, _ = ImageUtils.__block_sums(actual_image, expected.compared)
+        min_diff = numpy.abs(actual_sums - expected.block_sums) - expected.block_counts * PIXEL_THRESHOLD
+        min_diff_pixels = numpy.ceil(numpy.clip(min_diff, 0, None) / float(765 - PIXEL_THRESHOLD)).sum()
+        return 100 * float(min_diff_pixels) / (width * height) < tolerance
+
+    @staticmethod
+    def __open(image):
+        """
+        Open image (images that are already loaded are returned as they are).
+        :param image: Path to image or PIL Image.
+        """
+        if isinstance(image, Image.Image):
+            return image
+        return Image.open(image)
+
+    @staticmethod
+    def __diff_pixels(actual_image, expected_image, diff_image, mask):
+        """
+        Compare images pixel by pixel (used when numpy is not available).
+        :return: Number of different pixels (they are marked in `diff_image`).
         """
-        actual_image = Image.open(actual_image_path)
         actual_pixels = actual_image.load()
-        expected_image = Image.open(expected_image_path)
         expected_pixels = expected_image.load()
+        diff_pixels_access = diff_image.load()
         width, height = expected_image.size
-
-        total_pixels = width * height
         diff_pixels = 0
-        match = False
-        diff_image = actual_image.copy()
         for x in range(0, width):
-            for y in range(40, height):
+            for y in range(CROP_TOP, height):
                 actual_pixel = actual_pixels[x, y]
                 expected_pixel = expected_pixels[x, y]
                 if actual_pixel != expected_pixel:
+                    if mask is not None and not ImageUtils.__is_compared(x, y, mask):
+                        continue
                     actual_r = actual_pixel[0]
                     actual_g = actual_pixel[1]
                     actual_b = actual_pixel[2]
                     expected_r = expected_pixel[0]
                     expected_g = expected_pixel[1]
                     expected_b = expected_pixel[2]
-                    if abs(actual_r + actual_g + actual_b - expected_r - expected_g - expected_b) > 30:
+                    if abs(actual_r + actual_g + actual_b - expected_r - expected_g - expected_b) > PIXEL_THRESHOLD:
                         diff_pixels += 1
-                        diff_image.load()[x, y] = (255, 0, 0)
+                        diff_pixels_access[x, y] = DIFF_COLOR
+        return diff_pixels
+
+    @staticmethod
+    def __diff_mask(actual_image, expected_image, compared):
+        """
+        Compare images with numpy (only bounding box of compared pixels is processed).
+        :return: Tuple of bounding box (rows and columns slices) and boolean array where True means different pixel.
+        """
+        rows = numpy.flatnonzero(compared.any(axis=1))
+        columns = numpy.flatnonzero(compared.any(axis=0))
+        if len(rows) == 0:
+            return (slice(0, 0), slice(0, 0)), numpy.zeros((0, 0), dtype=bool)
+        box = (slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1))
+        actual = numpy.asarray(actual_image)[box[0], box[1], :3]
+        expected = numpy.asarray(expected_image)[box[0], box[1], :3]
+        if actual.shape != expected.shape:
+            raise IndexError('image index out of range')
+        actual_sum = actual.sum(axis=2, dtype=numpy.int32)
+        expected_sum = expected.sum(axis=2, dtype=numpy.int32)
+        return box, (numpy.abs(actual_sum - expected_sum) > PIXEL_THRESHOLD) & compared[box]
+
+    @staticmethod
+    def image_match(actual_image_path, expected_image_path, tolerance=0.05):
+        """
+        Compare two images.
+        Only pixels below status bar (CROP_TOP) and inside mask of expected image (see MASK_EXTENSION) are compared.
+        :param actual_image_path: Path to actual image (or PIL Image).
+        :param expected_image_path: Path to expected image (or PIL Image).
+        :param tolerance: Tolerance in percents.
+        :return: match (boolean value), diff_percent (diff %), diff_image (diff image)
+        """
+        actual_image = ImageUtils.__open(actual_image_path)
+        if isinstance(expected_image_path, Image.Image):
+            expected_image = expected_image_path
+            mask = compared = None
+        else:
+            expected = ImageUtils.get_expected(expected_image_path)
+            expected_image, mask, compared = expected.image, expected.mask, expected.compared
+        width, height = expected_image.size
+
+        total_pixels = width * height
+        match = False
+        if numpy is not None and actual_image.mode in ('RGB', 'RGBA') and expected_image.mode in ('RGB', 'RGBA'):
+            if compared is None:
+                compared = ImageUtils.__compared_area(width, height, mask)
+            box, diff_mask = ImageUtils.__diff_mask(actual_image, expected_image, compared)
+            diff_pixels = int(diff_mask.sum())
+            diff = numpy.array(actual_image)
+            color = DIFF_COLOR + (255,) if actual_image.mode == 'RGBA' else DIFF_COLOR
+            diff[box][diff_mask] = color
+            diff_image = Image.fromarray(diff, actual_image.mode)
+        else:
+            diff_image = actual_image.copy()
+            diff_pixels = ImageUtils.__diff_pixels(actual_image, expected_image, diff_image, mask)
 
         diff_percent = 100 * float(diff_pixels) / total_pixels
         if diff_percent < tolerance:
@@ -0,0 +1,108 @@
+"""
+Incremental matcher for log files of long running commands.
+"""
+import os
+import re
+
+# Strings that mean there is no need to wait for the log any more (and message printed when they are found).
+ABORT_MARKERS = [('BUILD FAILED', 'BUILD FAILED. No need to wait more time!'),
+                 ('Unable to sync files', 'Sync process failed. No need to wait more time!'),
+                 ('????????????????????????????', 'Log seems to be corrupted. No need to wait more time!'),
+                 ('errors were thrown', 'Multiple errors were thrown. No need to wait more time!')]
+
+
+class LogMatcher(object):
+    """
+    Remember offset in log file and match only appended bytes on each check.
+
+    All expected, not expected and abort strings are matched in a single pass with one compiled regex,
+    so each check is O(new bytes) instead of O(log size).
+    """
+
+    def __init__(self, log_file, string_list, not_existing_string_list=None, abort_markers=ABORT_MARKERS):
+        self.log_file = log_file
+        self.string_list = list(string_list)
+        self.not_existing_string_list = list(not_existing_string_list or [])
+        self.abort_markers = list(abort_markers or [])
+        self.found = set()
+        self.__offset = 0
+        self.__tail = ''
+
+        patterns = set(self.string_list + self.not_existing_string_list + [m[0] for m in self.abort_markers])
+        patterns.discard('')
+        self.__patterns = sorted(patterns, key=len, reverse=True)
+        self.__max_len = max([len(p) for p in self.__patterns] or [0])
+        self.__regex = None
+        if self.__patterns:
+            # Lookahead is used to find overlapping occurrences.
+            self.__regex = re.compile('(?=(' + '|'.join(re.escape(p) for p in self.__patterns) + '))')
+
+        # Empty strings are always in the log.
+        if '' in self.string_list:
+            self.found.add('')
+
+    def __read_new(self):
+        """
+        Read bytes appended since last check (start from the beginning if log file is truncated).
+        :return: New content of log file.
+        """
+        try:
+            size = os.path.getsize(self.log_file)
+        except OSError:
+            return ''
+        if size < self.__offset:
+            self.__offset = 0
+            self.__tail = ''
+        if size == self.__offset:
+            return ''
+        try:
+            with open(self.log_file, 'rb') as log:
+                log.seek(self.__offset)
+                data = log.read()
+        except IOError:
+            return ''
+        self.__offset += len(data)
+        return data
+
+    def check(self):
+        """
+        Match new content of log file.
+        :return: True if all strings from `string_list` are found.
+        """
+        data = self.__read_new()
+        if data and self.__regex is not None:
+            # Keep the end of previous chunk, so strings split between two reads are found.
+            text = self.__tail + data
+            for match in self.__regex.finditer(text):
+                position = match.start()
+                for pattern in self.__patterns:
+                    if pattern not in self.found and text.startswith(pattern, position):
+                        self.found.add(pattern)
+                        if pattern in self.string_list:
+                            print "'{0}' found.".format(pattern)
+            self.__tail = text[-(self.__max_len - 1):] if self.__max_len > 1 else ''
+        return not self.not_found
+
+    @property
+    def not_found(self):
+        """
+        :return: List of expected strings that are not found yet.
+        """
+        return [item for item in self.string_list if item not in self.found]
+
+    @property
+    def existing(self):
+        """
+        :return: List of strings from `not_existing_string_list` that are found.
+        """
+        return [item for item in self.not_existing_string_list if item in self.found]
+
+    @property
+    def abort_reason(self):
+        """
+        :return: Message for first found abort marker or None.
+        """
+        for marker, message in self.abort_markers:
+            if marker in self.found:
+                return message
+        return None
@@ -0,0 +1,139 @@
+"""
+Text recognition (OCR) of screen images.
+
+If `tesserocr` is installed tesseract engine is loaded once and kept for whole test run (no process per call),
+otherwise `pytesseract` is used (it starts tesseract process per call).
+Results are cached by hash of image, so screens that did not change are not recognized again.
+With persistent engine image is also split in horizontal bands (separated by blank rows) which are cached separately,
+so only bands changed since previous frame are recognized.
+"""
+import collections
+import hashlib
+import threading
+
+import pytesseract
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+CACHE_SIZE = 500
+# Rows where difference between lightest and darkest pixel is below this are blank.
+BLANK_ROW_RANGE = 8
+# Bands separated by less blank rows are merged.
+MIN_BAND_GAP = 6
+# Blank rows kept around each band.
+BAND_PADDING = 4
+# If image has more bands it is recognized as whole.
+MAX_BANDS = 40
+
+
+class Ocr(object):
+    __cache = collections.OrderedDict()
+    __lock = threading.Lock()
+    __api = None
+
+    @staticmethod
+    def is_persistent():
+        """
+        Check if tesseract engine is kept loaded between calls.
+        """
+        return tesserocr is not None
+
+    @staticmethod
+    def __hash(image):
+        sha1 = hashlib.sha1('{0}{1}'.format(image.mode, image.size))
+        sha1.update(image.tobytes())
+        return sha1.hexdigest()
+
+    @staticmethod
+    def __recognize(image):
+        """
+        Recognize text of image (without cache).
+        """
+        if tesserocr is None:
+            return pytesseract.image_to_string(image)
+        with Ocr.__lock:
+            if Ocr.__api is None:
+                Ocr.__api = tesserocr.PyTessBaseAPI()
+            Ocr.__api.SetImage(image)
+            return Ocr.__api.GetUTF8Text()
+
+    @staticmethod
+    def __get_cached(key):
+        with Ocr.__lock:
+            text = Ocr.__cache.pop(key, None)
+            if text is not None:
+                Ocr.__cache[key] = text
+            return text
+
+    @staticmethod
+    def __set_cached(key, text):
+        with Ocr.__lock:
+            Ocr.__cache[key] = text
+            while len(Ocr.__cache) > CACHE_SIZE:
+                Ocr.__cache.popitem(last=False)
+
+    @staticmethod
+    def __recognize_cached(image):
+        key = Ocr.__hash(image)
+        text = Ocr.__get_cached(key)
+        if text is None:
+            text = Ocr.__recognize(image)
+            Ocr.__set_cached(key, text)
+        return text
+
+    @staticmethod
+    def __get_bands(image):
+        """
+        Split grayscale image in horizontal bands separated by blank rows.
+        :return: List of (top, bottom) tuples (None if image should be recognized as whole).
+        """
+        pixels = numpy.asarray(image, dtype=numpy.int16)
+        blank = (pixels.max(axis=1) - pixels.min(axis=1)) < BLANK_ROW_RANGE
+        bands = []
+        top = None
+        last = None
+        for row in numpy.flatnonzero(~blank):
+            if top is None:
+                top = row
+            elif row - last > MIN_BAND_GAP:
+                bands.append((top, last + 1))
+                top = row
+            last = row
+        if top is not None:
+            bands.append((top, last + 1))
+        if len(bands) > MAX_BANDS:
+            return None
+        height = image.size[1]
+        return [(max(0, top - BAND_PADDING), min(height, bottom + BAND_PADDING)) for top, bottom in bands]
+
+    @staticmethod
+    def get_text(image):
+        """
+        Get text of image.
+        :param image: PIL Image.
+        :return: Recognized text.
+        """
+        image = image.convert('L')
+        key = Ocr.__hash(image)
+        text = Ocr.__get_cached(key)
+        if text is not None:
+            return text
+        bands = None
+        if tesserocr is not None and numpy is not None:
+            bands = Ocr.__get_bands(image)
+        if bands is None:
+            text = Ocr.__recognize(image)
+        else:
+            width = image.size[0]
+            texts = [Ocr.__recognize_cached(image.crop((0, top, width, bottom))) for top, bottom in bands]
+            text = '\n'.join(band_text.strip() for band_text in texts if band_text.strip())
+        Ocr.__set_cached(key, text)
+        return text
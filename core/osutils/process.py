@@ -1,16 +1,56 @@
 """
 Process utils.
 """
-
+import ctypes
+import ctypes.util
+import os
+import select
 import time
 
 import psutil
 
 from core.osutils.os_type import OSType
-from core.settings.settings import CURRENT_OS
+from core.osutils.process_snapshot import ProcessSnapshot
+from core.settings.settings import CURRENT_OS, SHARD_INDEX
+
+BACKOFF_START = 0.05
+BACKOFF_MAX = 2
+# Max time (in seconds) to wait until killed processes exit
+KILL_TIMEOUT = 10
+SYS_PIDFD_OPEN = 434
+
+
+def _pidfd_open(pid):
+    """
+    Open pidfd of process (Linux 5.3+), it becomes readable when process exits.
+    :return: File descriptor or None if pidfd is not available.
+    """
+    if CURRENT_OS is not OSType.LINUX:
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.syscall(SYS_PIDFD_OPEN, pid, 0)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return fd
 
 
 class Process(object):
+    @staticmethod
+    def __killable_processes():
+        """
+        Get processes that can be killed.
+        In sharded test run only processes started by current worker are returned, so workers do not kill each other.
+        """
+        if SHARD_INDEX is None:
+            return psutil.process_iter()
+        try:
+            return psutil.Process().children(recursive=True)
+        except psutil.Error:
+            return []
+
     @staticmethod
     def is_running(proc_name):
         """Check if process is running"""
@@ -49,78 +89,156 @@ class Process(object):
                 break
         return result
 
+    @staticmethod
+    def wait(condition, timeout=60):
+        """
+        Wait until condition is met.
+        Condition is checked immediately and then with exponential backoff (from 50ms up to 2s).
+        :param condition: Function without arguments, waiting stops once it returns value that is not False/None.
+        :param timeout: Timeout in seconds.
+        :return: Last value returned by condition.
+        """
+        interval = BACKOFF_START
+        end_time = time.time() + timeout
+        while True:
+            result = condition()
+            remaining = end_time - time.time()
+            if result or remaining <= 0:
+                return result
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, BACKOFF_MAX)
+
     @staticmethod
     def wait_until_running(proc_name, timeout=60):
         """Wait until process is running
-        :param proc_name: Process name.
+        :param proc_name: Process name (or list of names, waits until any of them is running).
         :param timeout: Timeout in seconds.
-        :return: True if running, false if not running.
+        :return: True if running, raise NameError if not running.
         """
-        running = False
-        end_time = time.time() + timeout
-        while not running:
-            time.sleep(5)
-            running = Process.is_running(proc_name)
-            if running:
-                running = True
-                break
-            if (running is False) and (time.time() > end_time):
-                raise NameError("{0} not running in {1} seconds.", proc_name, timeout)
+        names = proc_name if isinstance(proc_name, list) else [proc_name]
+        running = Process.wait(lambda: any(Process.is_running(name) for name in names), timeout=timeout)
+        if not running:
+            raise NameError("{0} not running in {1} seconds.".format(proc_name, timeout))
         return running
 
     @staticmethod
-    def kill(proc_name, proc_cmdline=None):
+    def __has_exited(proc):
+        """
+        Check if process has exited.
+        :param proc: subprocess.Popen, psutil.Process or pid.
+        """
+        if hasattr(proc, 'poll'):
+            # Own child started by subprocess, poll() reaps it.
+            return proc.poll() is not None
+        pid = proc if isinstance(proc, int) else proc.pid
+        try:
+            return psutil.Process(pid).status() == psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.Error:
+            return False
+
+    @staticmethod
+    def wait_for_exit(procs, timeout=60):
+        """
+        Wait until process (or any of processes) exits.
+        On Linux 5.3+ waits on pidfd of processes, otherwise processes are polled with exponential backoff.
+        :param procs: subprocess.Popen, psutil.Process or pid (or list of them).
+        :param timeout: Timeout in seconds.
+        :return: First process that exited (None if all processes are still running after timeout).
+        """
+        if not isinstance(procs, list):
+            procs = [procs]
+
+        def exited():
+            for proc in procs:
+                if Process.__has_exited(proc):
+                    return proc
+            return None
+
+        result = exited()
+        if result is not None:
+            return result
+
+        fds = {}
+        for proc in procs:
+            fd = _pidfd_open(proc if isinstance(proc, int) else proc.pid)
+            if fd is None:
+                break
+            fds[fd] = proc
+        if len(fds) != len(procs):
+            for fd in fds:
+                os.close(fd)
+            return Process.wait(exited, timeout=timeout)
+
+        try:
+            end_time = time.time() + timeout
+            while True:
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    return exited()
+                ready, _, _ = select.select(fds.keys(), [], [], remaining)
+                for fd in ready:
+                    if Process.__has_exited(fds[fd]):
+                        return fds[fd]
+                if ready:
+                    # pidfd is readable, but zombie of process started by others is not reaped yet
+                    time.sleep(BACKOFF_START)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    @staticmethod
+    def __wait_for_killed(procs, timeout=KILL_TIMEOUT):
+        """
+        Wait until all killed processes exit (so they do not hold files, ports or devices any more).
+        :param procs: List of psutil.Process objects.
+        :param timeout: Timeout in seconds.
+        """
+        procs = list(procs)
+        end_time = time.time() + timeout
+        while procs:
+            remaining = end_time - time.time()
+            proc = Process.wait_for_exit(procs, timeout=max(remaining, 0))
+            if proc is None:
+                print "Killed processes are still running: {0}".format([item.pid for item in procs])
+                return
+            procs.remove(proc)
+
+    @staticmethod
+    def kill_all(filters):
+        """
+        Kill processes that match any of the filters (process table is read only once) and wait until they exit.
+        :param filters: List of (proc_name, proc_cmdline) tuples, None means any name/commandline.
+        :return: True if at least one process is killed.
+        """
         if CURRENT_OS is OSType.WINDOWS:
-            proc_name += ".exe"
-        result = False
-        for proc in psutil.process_iter():
-            name = ""
-            cmdline = ""
-            try:
-                name = str(proc.name())
-                cmdline = str(proc.cmdline())
-            except:
-                continue
-            if proc_name == name:
-                if (proc_cmdline is None) or (proc_cmdline is not None and proc_cmdline in cmdline):
-                    try:
-                        proc.kill()
-                        print "Process {0} has been killed.".format(proc_name)
-                        result = True
-                    except psutil.NoSuchProcess:
-                        continue
-        return result
+            filters = [(name + ".exe" if name is not None and not name.endswith(".exe") else name, cmdline)
+                       for name, cmdline in filters]
+        killed = ProcessSnapshot(Process.__killable_processes()).kill(filters)
+        Process.__wait_for_killed(killed)
+        return len(killed) > 0
+
+    @staticmethod
+    def kill(proc_name, proc_cmdline=None):
+        return Process.kill_all([(proc_name, proc_cmdline)])
 
     @staticmethod
     def kill_by_commandline(cmdline):
-        result = False
-        for proc in psutil.process_iter():
-            cmd = ""
-            try:
-                name = str(proc.name())
-                cmd = str(proc.cmdline())
-            except:
-                continue
-            if (cmdline in cmd):
-                try:
-                    proc.kill()
-                    print "Process {0} has been killed.".format(cmdline)
-                    result = True
-                except psutil.NoSuchProcess:
-                    continue
-        return result
+        return Process.kill_all([(None, cmdline)])
 
     @staticmethod
     def kill_by_handle(file_path):
-        for proc in psutil.process_iter():
+        killed = []
+        for proc in ProcessSnapshot(Process.__killable_processes()).find_by_open_file(file_path):
             try:
-                for item in proc.open_files():
-                    if file_path in item.path:
-                        print "{0} is locked by {1}".format(file_path, proc.name())
-                        print "Proc cmd: {0}".format(proc.cmdline())
-                        proc.kill()
+                print "{0} is locked by {1}".format(file_path, proc.name())
+                print "Proc cmd: {0}".format(proc.cmdline())
+                proc.kill()
+                killed.append(proc)
             except:
                 continue
+        Process.__wait_for_killed(killed)
 
     @staticmethod
     def list():
@@ -0,0 +1,142 @@
+"""
+Snapshot of process table.
+"""
+import bisect
+import os
+
+import psutil
+
+PROC_FOLDER = '/proc'
+DELETED_SUFFIX = ' (deleted)'
+
+
+class ProcessSnapshot(object):
+    """
+    Process table read once and indexed by name (cmdline and open files are matched in memory).
+
+    Use it when several kill requests are executed one after another, instead of scanning all host processes with
+    `psutil.process_iter()` for each of them. One-off queries should scan processes and stop at first match.
+    """
+
+    def __init__(self, processes=None):
+        """
+        :param processes: Processes to snapshot (by default all processes of the host).
+        """
+        self.entries = []
+        self.by_name = {}
+        self.__open_files = None
+        if processes is None:
+            processes = psutil.process_iter()
+        current_pid = os.getpid()
+        for proc in processes:
+            try:
+                if proc.pid == current_pid:
+                    continue
+                name = str(proc.name())
+                cmdline = str(proc.cmdline())
+            except:
+                continue
+            entry = (proc, name, cmdline)
+            self.entries.append(entry)
+            self.by_name.setdefault(name, []).append(entry)
+
+    def __match(self, name=None, cmdline=None):
+        if name is not None:
+            candidates = self.by_name.get(name, [])
+        else:
+            candidates = self.entries
+        for entry in candidates:
+            proc, proc_name, proc_cmdline = entry
+            if cmdline is not None and cmdline not in proc_cmdline:
+                continue
+            yield entry
+
+    def find(self, name=None, cmdline=None):
+        """
+        Find processes.
+        :param name: Process name.
+        :param cmdline: Sub string of process commandline.
+        :return: List of psutil.Process objects.
+        """
+        return [entry[0] for entry in self.__match(name=name, cmdline=cmdline)]
+
+    def __open_files_index(self):
+        """
+        Build sorted list of (path, pid) tuples from file descriptors listed in /proc/<pid>/fd.
+        Sockets, pipes and other descriptors that are not files are skipped.
+        """
+        index = []
+        for proc, _, _ in self.entries:
+            fd_folder = os.path.join(PROC_FOLDER, str(proc.pid), 'fd')
+            try:
+                fds = os.listdir(fd_folder)
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    path = os.readlink(os.path.join(fd_folder, fd))
+                except OSError:
+                    continue
+                if not path.startswith(os.sep):
+                    continue
+                if path.endswith(DELETED_SUFFIX):
+                    path = path[:-len(DELETED_SUFFIX)]
+                index.append((path, proc.pid))
+        index.sort()
+        return index
+
+    def find_by_open_file(self, file_path):
+        """
+        Find processes that have opened file (or any file in folder).
+        Open files of all processes are read only once per snapshot.
+
+        On Linux reverse index of paths is built from /proc/<pid>/fd and `file_path` is matched as path prefix,
+        on other systems `file_path` is matched as sub string of paths returned by `psutil.Process.open_files()`.
+        :param file_path: Path to file or folder.
+        :return: List of psutil.Process objects.
+        """
+        if os.path.isdir(PROC_FOLDER):
+            if self.__open_files is None:
+                self.__open_files = self.__open_files_index()
+            # Links in /proc/<pid>/fd point to resolved paths
+            prefix = os.path.realpath(file_path)
+            pids = set()
+            position = bisect.bisect_left(self.__open_files, (prefix,))
+            while position < len(self.__open_files) and self.__open_files[position][0].startswith(prefix):
+                path, pid = self.__open_files[position]
+                if len(path) == len(prefix) or prefix.endswith(os.sep) or path[len(prefix)] == os.sep:
+                    pids.add(pid)
+                position += 1
+            return [entry[0] for entry in self.entries if entry[0].pid in pids]
+
+        if self.__open_files is None:
+            self.__open_files = []
+            for entry in self.entries:
+                try:
+                    paths = [item.path for item in entry[0].open_files()]
+                except:
+                    continue
+                if paths:
+                    self.__open_files.append((entry, paths))
+        return [entry[0] for entry, paths in self.__open_files if any(file_path in path for path in paths)]
+
+    def kill(self, filters):
+        """
+        Kill all processes that match any of the filters (in one sweep).
+        :param filters: List of (name, cmdline) tuples, None means any name/cmdline.
+        :return: List of killed psutil.Process objects.
+        """
+        result = []
+        killed = set()
+        for name, cmdline in filters:
+            for proc, proc_name, proc_cmdline in self.__match(name=name, cmdline=cmdline):
+                if proc.pid in killed:
+                    continue
+                try:
+                    proc.kill()
+                    killed.add(proc.pid)
+                    print "Process {0} has been killed.".format(name if name is not None else cmdline)
+                    result.append(proc)
+                except psutil.NoSuchProcess:
+                    continue
+        return result
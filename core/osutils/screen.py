@@ -2,14 +2,15 @@ import os
 
 import time
 
-import pytesseract
 from PIL import Image
 
 from core.osutils.command import run
 from core.osutils.file import File
 from core.osutils.folder import Folder
+from core.osutils.ocr import Ocr
 from core.osutils.os_type import OSType
-from core.settings.settings import CURRENT_OS, OUTPUT_FOLDER
+from core.settings.context import Context
+from core.settings.settings import CURRENT_OS
 
 
 class Screen(object):
@@ -36,21 +37,35 @@ class Screen(object):
                     run('screencapture ' + path)
 
     @staticmethod
-    def get_screen_text():
+    def get_screen_image():
         """
-        Get text of current screen of host machine.
-        :return: All the text visible on screen as string
+        Get screen of host machine as PIL Image.
+        On Linux screen is saved (and overwritten on each call) in `out/images/host/host.png` first.
         """
-        base_path = os.path.join(OUTPUT_FOLDER, "images", "host")
+        if CURRENT_OS is not OSType.LINUX:
+            try:
+                from PIL import ImageGrab
+                return ImageGrab.grab()
+            except IOError:
+                print 'Failed to grab screen of host OS in memory.'
+        base_path = os.path.join(Context.current().output_folder, "images", "host")
         if not File.exists(base_path):
             Folder.create(base_path)
-        actual_image_path = os.path.join(base_path, "host_{0}.png".format(time.time()))
+        actual_image_path = os.path.join(base_path, "host.png")
         if File.exists(actual_image_path):
             File.remove(actual_image_path)
         Screen.save_screen(path=actual_image_path)
         image = Image.open(actual_image_path)
-        text = pytesseract.image_to_string(image.convert('L'))
-        return text
+        image.load()
+        return image
+
+    @staticmethod
+    def get_screen_text():
+        """
+        Get text of current screen of host machine.
+        :return: All the text visible on screen as string
+        """
+        return Ocr.get_text(Screen.get_screen_image())
 
     @staticmethod
     def wait_for_text(text, timeout=60):
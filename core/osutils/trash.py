@@ -0,0 +1,145 @@
+"""
+Background deletion of folders.
+
+Folder is renamed in trash folder (atomic on same file system) and then removed by pool of worker threads.
+"""
+import Queue
+import os
+import shutil
+import threading
+import uuid
+
+from core.settings.settings import TRASH_FOLDER
+
+try:
+    from scandir import scandir
+except ImportError:
+    scandir = None
+
+WORKERS_COUNT = 4
+
+
+class Trash(object):
+    __queue = Queue.Queue()
+    __workers = []
+    __lock = threading.Lock()
+
+    @staticmethod
+    def __start_workers():
+        with Trash.__lock:
+            if Trash.__workers:
+                return
+            for _ in range(WORKERS_COUNT):
+                worker = threading.Thread(target=Trash.__work)
+                worker.daemon = True
+                worker.start()
+                Trash.__workers.append(worker)
+
+    @staticmethod
+    def __work():
+        while True:
+            task = Trash.__queue.get()
+            try:
+                task()
+            except Exception as e:
+                print "Failed to empty trash: {0}".format(e)
+            finally:
+                Trash.__queue.task_done()
+
+    @staticmethod
+    def __list(path):
+        """
+        List folder.
+        :return: Lists of sub folders and other entries (files and symlinks).
+        """
+        folders = []
+        files = []
+        if scandir is not None:
+            for entry in scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                else:
+                    files.append(entry.path)
+        else:
+            for name in os.listdir(path):
+                entry_path = os.path.join(path, name)
+                if os.path.isdir(entry_path) and not os.path.islink(entry_path):
+                    folders.append(entry_path)
+                else:
+                    files.append(entry_path)
+        return folders, files
+
+    @staticmethod
+    def __remove(path, on_removed=None):
+        """
+        Remove files of folder and schedule removal of its sub folders (folder is removed once they are removed).
+        :param path: Path to folder in trash.
+        :param on_removed: Callback called once path is removed.
+        """
+        try:
+            folders, files = Trash.__list(path)
+        except OSError:
+            folders, files = [], []
+            if os.path.lexists(path) and not os.path.isdir(path):
+                files = [path]
+                path = None
+        for file_path in files:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+        def remove_folder():
+            if path is not None:
+                shutil.rmtree(path, ignore_errors=True)
+            if on_removed is not None:
+                on_removed()
+
+        if not folders:
+            remove_folder()
+            return
+
+        # Sub folders are removed in parallel, the last one removes current folder.
+        pending = [len(folders)]
+        lock = threading.Lock()
+
+        def sub_folder_removed():
+            with lock:
+                pending[0] -= 1
+                done = pending[0] == 0
+            if done:
+                remove_folder()
+
+        for folder in folders:
+            Trash.__queue.put(lambda f=folder: Trash.__remove(f, on_removed=sub_folder_removed))
+
+    @staticmethod
+    def move(path):
+        """
+        Move file or folder to trash, it is removed in background.
+        :param path: Path to file or folder.
+        :return: True if path is moved to trash, False if it can not be moved (for example it is locked).
+        """
+        path = os.path.abspath(path)
+        trash = os.path.abspath(TRASH_FOLDER)
+        if path == trash or path.startswith(trash + os.sep) or trash.startswith(path + os.sep):
+            return False
+        trash_path = os.path.join(trash, uuid.uuid4().hex)
+        try:
+            if not os.path.isdir(trash):
+                os.makedirs(trash)
+            os.rename(path, trash_path)
+        except OSError:
+            return False
+        Trash.__start_workers()
+        Trash.__queue.put(lambda: Trash.__remove(trash_path))
+        return True
+
+    @staticmethod
+    def empty():
+        """
+        Wait until everything moved to trash is removed and remove trash folder.
+        """
+        if Trash.__workers:
+            Trash.__queue.join()
+        shutil.rmtree(TRASH_FOLDER, ignore_errors=True)
@@ -0,0 +1,164 @@
+"""
+Wait for changes in file system.
+
+On Linux waiters are woken up by inotify events, on other OS file system is polled.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+
+from core.osutils.os_type import OSType
+from core.settings.settings import CURRENT_OS
+
+POLL_INTERVAL = 0.2
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+IN_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """
+    Load libc if it supports inotify.
+    :return: libc or None if inotify is not available.
+    """
+    if CURRENT_OS is not OSType.LINUX:
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    except OSError:
+        return None
+    if hasattr(libc, 'inotify_init1') and hasattr(libc, 'inotify_add_watch'):
+        return libc
+    else:
+        return None
+
+
+_LIBC = _load_libc()
+
+
+class Watcher(object):
+    @staticmethod
+    def is_inotify_available():
+        return _LIBC is not None
+
+    @staticmethod
+    def __stat(path):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime, stat.st_size, stat.st_ino
+        except OSError:
+            return None
+
+    @staticmethod
+    def __existing_parent(path):
+        """
+        Get closest existing folder of path.
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        while not os.path.isdir(folder):
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                break
+            folder = parent
+        return folder
+
+    @staticmethod
+    def __wait_inotify(folder, names, timeout, changed):
+        """
+        Wait for inotify event in folder.
+        :param folder: Folder to watch.
+        :param names: Names of files in folder we are interested in (None means any file).
+        :param timeout: Timeout in seconds.
+        :param changed: Callable called once watch is set (to avoid missing changes done before it).
+        :return: True if event is received (or `changed` returns True) before timeout.
+        """
+        fd = _LIBC.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        try:
+            if _LIBC.inotify_add_watch(fd, folder.encode('utf8') if isinstance(folder, unicode) else folder,
+                                       IN_MASK) < 0:
+                return None
+            if changed():
+                return True
+            t_end = time.time() + timeout
+            while True:
+                remaining = t_end - time.time()
+                if remaining <= 0:
+                    return False
+                try:
+                    readable, _, _ = select.select([fd], [], [], remaining)
+                except select.error as e:
+                    if e.args[0] == errno.EINTR:
+                        continue
+                    raise
+                if not readable:
+                    return False
+                data = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset + EVENT_HEADER.size <= len(data):
+                    _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip('\0')
+                    offset += EVENT_HEADER.size + length
+                    if names is None or name in names:
+                        return True
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def wait_for_change(file_path, timeout):
+        """
+        Wait until file is created, modified or truncated.
+        :param file_path: File path.
+        :param timeout: Timeout in seconds.
+        :return: True if file changed before timeout, False otherwise.
+        """
+        initial = Watcher.__stat(file_path)
+        changed = lambda: Watcher.__stat(file_path) != initial
+        if Watcher.is_inotify_available():
+            folder = os.path.dirname(os.path.abspath(file_path))
+            if os.path.isdir(folder):
+                result = Watcher.__wait_inotify(folder=folder, names=[os.path.basename(file_path)], timeout=timeout,
+                                                changed=changed)
+                if result is not None:
+                    return result
+        t_end = time.time() + timeout
+        while time.time() < t_end:
+            if changed():
+                return True
+            time.sleep(min(POLL_INTERVAL, max(t_end - time.time(), 0)))
+        return changed()
+
+    @staticmethod
+    def wait_for_path(path, timeout):
+        """
+        Wait until path exists.
+        :param path: File or folder path.
+        :param timeout: Timeout in seconds.
+        :return: True if path exists, False if it does not exist after timeout.
+        """
+        exists = lambda: os.path.exists(path)
+        t_end = time.time() + timeout
+        while not exists():
+            remaining = t_end - time.time()
+            if remaining <= 0:
+                return False
+            result = None
+            if Watcher.is_inotify_available():
+                # Watch closest existing folder, once something is created there check again (path may be nested).
+                result = Watcher.__wait_inotify(folder=Watcher.__existing_parent(path), names=None,
+                                                timeout=remaining, changed=exists)
+            if result is None:
+                time.sleep(min(POLL_INTERVAL, remaining))
+        return True
@@ -21,25 +21,26 @@ from core.osutils.command_log_level import CommandLogLevel
 
 from core.osutils.command import run
 
-from core.settings.settings import  SUT_FOLDER, PREVIEW_APP_PATH_ANDROID, PREVIEW_APP_PATH_IOS, EMULATOR_ID,TEST_RUN_HOME,PLAYGROUND_APP_PATH_IOS
+from core.settings.context import Context
+from core.settings.settings import PREVIEW_APP_PATH_ANDROID, PREVIEW_APP_PATH_IOS, PLAYGROUND_APP_PATH_IOS
 
 class Preview(object):
 
     @staticmethod
     def get_app_packages():
         """Copy Preview App packages from Shares to local folder"""
-        shutil.copy2(PREVIEW_APP_PATH_ANDROID.strip(), SUT_FOLDER)        
-        shutil.copy2(PREVIEW_APP_PATH_IOS.strip(), SUT_FOLDER)
-        shutil.copy2(PLAYGROUND_APP_PATH_IOS.strip(), SUT_FOLDER)
+        shutil.copy2(PREVIEW_APP_PATH_ANDROID.strip(), Context.current().sut_folder)        
+        shutil.copy2(PREVIEW_APP_PATH_IOS.strip(), Context.current().sut_folder)
+        shutil.copy2(PLAYGROUND_APP_PATH_IOS.strip(), Context.current().sut_folder)
         """Unpack the .tgz file to get the nsplaydev.app"""
-        File.unpack_tar(os.path.join(SUT_FOLDER, 'nsplaydev.tgz'), SUT_FOLDER)
-        File.unpack_tar(os.path.join(SUT_FOLDER, 'nsplay.tgz'), SUT_FOLDER)
+        File.unpack_tar(os.path.join(Context.current().sut_folder, 'nsplaydev.tgz'), Context.current().sut_folder)
+        File.unpack_tar(os.path.join(Context.current().sut_folder, 'nsplay.tgz'), Context.current().sut_folder)
 
     @staticmethod
     def install_preview_app(device_id, platform=Platform.BOTH):
         """Installs Preview App on emulator and simulator"""
-        package_android = os.path.join(SUT_FOLDER, 'app-universal-release.apk')
-        package_ios = os.path.join(SUT_FOLDER, 'nsplaydev.app')
+        package_android = os.path.join(Context.current().sut_folder, 'app-universal-release.apk')
+        package_ios = os.path.join(Context.current().sut_folder, 'nsplaydev.app')
         if platform is Platform.IOS:
             Simulator.install(package_ios)
         elif platform is Platform.ANDROID: 
@@ -51,8 +52,8 @@ class Preview(object):
     @staticmethod
     def install_playground_app(device_id, platform=Platform.BOTH):
         """Installs Playground App on emulator and simulator"""
-        package_android = os.path.join(SUT_FOLDER, "app-release.apk")
-        package_ios = os.path.join(SUT_FOLDER, 'nsplay.app')
+        package_android = os.path.join(Context.current().sut_folder, "app-release.apk")
+        package_ios = os.path.join(Context.current().sut_folder, 'nsplay.app')
         if platform is Platform.IOS:
             Simulator.install(package_ios)
         elif platform is Platform.ANDROID: 
@@ -85,6 +86,7 @@ class Preview(object):
     def dismiss_simulator_alert():
         """When preview url is loaded in simulator there is alert for confirmation.
            This method will dismiss it. It is implemented only for one instance of simulator for the moment"""
-        dismiss_sim_alert = os.path.join(TEST_RUN_HOME, 'core', 'device', 'helpers', 'send_enter_to_simulator.scpt')
+        dismiss_sim_alert = os.path.join(Context.current().test_run_home, 'core', 'device', 'helpers',
+                                         'send_enter_to_simulator.scpt')
         command = "osascript " + dismiss_sim_alert
         run(command, log_level=CommandLogLevel.FULL)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Runtime context of test run.
+
+All paths and device ids that must be unique for parallel test runs on same host are resolved via `Context.current()`.
+Default context (built from `core.settings.settings`) can be replaced per process with `Context.set_default()`
+or overwritten per thread with `with Context(...):`.
+"""
+import os
+import threading
+
+from core.settings.settings import TEST_RUN_HOME, EMULATOR_PORT, SIMULATOR_NAME
+
+_thread_data = threading.local()
+_default = []
+
+
+class Context(object):
+    def __init__(self, test_run_home=TEST_RUN_HOME, emulator_port=EMULATOR_PORT, simulator_name=SIMULATOR_NAME,
+                 app_suffix=''):
+        """
+        :param test_run_home: Root folder of test run (`out` folder and test apps are created here).
+        :param emulator_port: Port of Android emulator.
+        :param simulator_name: Name of iOS Simulator.
+        :param app_suffix: Suffix appended to names of test apps.
+        """
+        self.test_run_home = test_run_home
+        self.output_folder = os.path.join(test_run_home, 'out')
+        self.sut_folder = os.path.join(test_run_home, 'sut')
+        self.output_file_async = os.path.join(self.output_folder, 'output_async.txt')
+        self.test_log = os.path.join(self.output_folder, 'testLog.txt')
+        self.emulator_port = str(emulator_port)
+        self.emulator_id = 'emulator-{0}'.format(self.emulator_port)
+        self.simulator_name = simulator_name
+        self.app_name = 'TestApp' + app_suffix
+        self.app_name_ts = 'TestAppTS' + app_suffix
+        self.app_name_ng = 'TestAppNG' + app_suffix
+
+    def __enter__(self):
+        stack = getattr(_thread_data, 'stack', None)
+        if stack is None:
+            stack = _thread_data.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _thread_data.stack.pop()
+
+    @staticmethod
+    def current():
+        """
+        :return: Context of current thread (or default context of the process).
+        """
+        stack = getattr(_thread_data, 'stack', None)
+        if stack:
+            return stack[-1]
+        if not _default:
+            _default.append(Context())
+        return _default[0]
+
+    @staticmethod
+    def set_default(context):
+        """
+        Set context of current process.
+        :param context: Context object.
+        """
+        del _default[:]
+        _default.append(context)
+
+
+class ContextAttribute(object):
+    """
+    Class attribute resolved from current context on each access (for example `BaseClass.app_name`).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        return getattr(Context.current(), self.name)
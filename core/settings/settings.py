@@ -100,6 +100,15 @@ PLAYGROUND_APP_PATH_ANDROID =  os.environ.get("PLAYGROUND_APP_PATH_ANDROID", os.
 # Root folder for local packages
 SUT_FOLDER = os.path.join(TEST_RUN_HOME, "sut")
 
+# Cache of created projects (see `core.tns.app_cache.AppCache`)
+APP_CACHE_FOLDER = os.path.join(TEST_RUN_HOME, "cache")
+
+# History of start time benchmarks (see `core.device.helpers.start_time.StartTime`), it is kept between test runs
+START_TIME_FOLDER = os.environ.get("START_TIME_FOLDER", os.path.join(TEST_RUN_HOME, "start_time"))
+
+# Folders removed by `Folder.cleanup` are moved here and deleted in background (see `core.osutils.trash.Trash`)
+TRASH_FOLDER = os.path.join(TEST_RUN_HOME, ".trash")
+
 # Set local location of test packages
 TNS_PATH = os.path.join("node_modules", ".bin", "tns")
 UPDATE_WEBPACK_PATH = os.path.join("node_modules", ".bin", "update-ns-webpack")
@@ -128,11 +137,17 @@ OUTPUT_FILE_ASYNC = os.path.join(OUTPUT_FOLDER, 'output_async.txt')
 TEST_LOG = os.path.join(OUTPUT_FOLDER, 'testLog.txt')
 VERBOSE_LOG = os.path.join(OUTPUT_FOLDER, 'verboseLog.txt')
 
-# Default Simulator and Emulator settings
+# Index of parallel worker (None if tests are not sharded, see `runNose.py --shards=N`)
+SHARD_INDEX = os.environ.get("SHARD_INDEX")
+
+# Default Simulator and Emulator settings (port and simulator name are overwritten for each shard)
 EMULATOR_NAME = "Emulator-Api23-Default"
-EMULATOR_PORT = "5554"
+EMULATOR_PORT = os.environ.get("EMULATOR_PORT", "5554")
 EMULATOR_ID = "emulator-{0}".format(EMULATOR_PORT)
-SIMULATOR_NAME = "iPhone7N"
+# Number of warm emulators booted from snapshot and reused by test classes (0 means pool is not used)
+EMULATOR_POOL_SIZE = int(os.environ.get("EMULATOR_POOL_SIZE", "0"))
+EMULATOR_SNAPSHOT = os.environ.get("EMULATOR_SNAPSHOT", "clean")
+SIMULATOR_NAME = os.environ.get("SIMULATOR_NAME", "iPhone7N")
 SIMULATOR_TYPE = 'iPhone 7'
 SIMULATOR_SDK = '12.0'
 
@@ -0,0 +1,120 @@
+"""
+Cache of created projects (with platform added).
+"""
+import hashlib
+import os
+import uuid
+
+from core.osutils.folder import Folder
+from core.settings.context import Context
+from core.settings.settings import APP_CACHE_FOLDER, ANDROID_PACKAGE, IOS_PACKAGE, MODULES_PACKAGE, BRANCH
+from core.tns.tns import Tns
+from core.tns.tns_platform_type import Platform
+
+
+class AppCache(object):
+    """
+    Content addressed cache of pristine projects.
+
+    Project is created with `Tns.create_app` and `Tns.platform_add` only once per key (template, modules package,
+    platform package, CLI version and test run home, because projects contain absolute paths).
+    Next calls just copy cached project to `app_name`.
+    """
+    __cli_version = None
+    __file_hashes = {}
+
+    @staticmethod
+    def __file_hash(file_path):
+        """
+        Get sha1 of file (cached in memory until file is changed).
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+        file_hash = AppCache.__file_hashes.get(key)
+        if file_hash is None:
+            sha1 = hashlib.sha1()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha1.update(chunk)
+            file_hash = sha1.hexdigest()
+            AppCache.__file_hashes[key] = file_hash
+        return file_hash
+
+    @staticmethod
+    def __package_id(package):
+        """
+        Get identifier of package (content hash for local files, package string for npm packages).
+        """
+        package = str(package).replace('"', '')
+        if os.path.isfile(package):
+            return AppCache.__file_hash(package)
+        return package
+
+    @staticmethod
+    def __get_cli_version():
+        if AppCache.__cli_version is None:
+            AppCache.__cli_version = Tns.version()
+        return AppCache.__cli_version
+
+    @staticmethod
+    def get_key(app_name, attributes, update_modules, platform, platform_attributes):
+        """
+        Get cache key of project.
+        :return: sha1 of all inputs that affect created project.
+        """
+        parts = ['app:' + app_name, 'cli:' + AppCache.__get_cli_version(), 'platform:' + str(platform),
+                 'home:' + os.path.abspath(Context.current().test_run_home)]
+        if not any(k in attributes for k in ("--ng", "--template", "--tsc", "--vue")):
+            default_template = os.path.join(Context.current().sut_folder, "tns-template-hello-world.tgz")
+            if BRANCH == "master":
+                parts.append('template:' + AppCache.__package_id(default_template))
+            else:
+                parts.append('template:tns-template-hello-world')
+        for k in sorted(attributes.keys()):
+            parts.append('{0}={1}'.format(k, AppCache.__package_id(attributes[k])))
+        if update_modules:
+            parts.append('modules:' + AppCache.__package_id(MODULES_PACKAGE))
+        for k in sorted(platform_attributes.keys()):
+            parts.append('platform {0}={1}'.format(k, AppCache.__package_id(platform_attributes[k])))
+        return hashlib.sha1('\n'.join(parts)).hexdigest()
+
+    @staticmethod
+    def create_app(app_name, attributes={}, update_modules=True, platform=Platform.ANDROID, platform_attributes=None):
+        """
+        Create project with platform added (restore it from cache if same project is already created).
+        :param app_name: Application name.
+        :param attributes: Attributes for `tns create` command.
+        :param update_modules: If true update modules (same as in `Tns.create_app`).
+        :param platform: Platform.ANDROID or Platform.IOS.
+        :param platform_attributes: Attributes for `tns platform add` (default is `--frameworkPath` of package under test).
+        :return: Path to cached project.
+        """
+        if platform_attributes is None:
+            if platform is Platform.IOS:
+                platform_attributes = {"--frameworkPath": IOS_PACKAGE}
+            else:
+                platform_attributes = {"--frameworkPath": ANDROID_PACKAGE}
+        key = AppCache.get_key(app_name=app_name, attributes=attributes, update_modules=update_modules,
+                               platform=platform, platform_attributes=platform_attributes)
+        cache_path = os.path.join(APP_CACHE_FOLDER, key, app_name)
+
+        if Folder.exists(cache_path):
+            print "Restore {0} from cache {1}".format(app_name, key)
+            Folder.cleanup(app_name)
+            Folder.copy(cache_path, app_name, clone=True)
+        else:
+            print "{0} not found in cache. Create it...".format(app_name)
+            Tns.create_app(app_name, attributes=attributes, update_modules=update_modules)
+            add_attributes = {"--path": app_name}
+            add_attributes.update(platform_attributes)
+            Tns.platform_add(platform=platform, attributes=add_attributes)
+
+            # Copy in temp folder and rename it, so parallel test runs never see partially copied project
+            temp_path = os.path.join(APP_CACHE_FOLDER, 'tmp_' + uuid.uuid4().hex)
+            Folder.copy(app_name, os.path.join(temp_path, app_name), clone=True)
+            try:
+                os.rename(temp_path, os.path.dirname(cache_path))
+            except OSError:
+                # Same project is already cached by other test run
+                Folder.cleanup(temp_path)
+        return cache_path
@@ -5,15 +5,17 @@ import os
 import time
 
 from core.npm.npm import Npm
-from core.osutils.command import run
+from core.osutils.command import run, CommandHandle
 from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.folder import Folder
+from core.osutils.log_matcher import LogMatcher
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
-from core.settings.settings import COMMAND_TIMEOUT, TNS_PATH, TAG, TEST_RUN_HOME, CURRENT_OS, \
-    SUT_FOLDER, PROVISIONING, BRANCH, MODULES_PACKAGE, ANGULAR_PACKAGE, TYPESCRIPT_PACKAGE, UPDATE_WEBPACK_PATH, \
-    WEBPACK_PACKAGE, USE_YARN
+from core.osutils.watcher import Watcher
+from core.settings.context import Context
+from core.settings.settings import COMMAND_TIMEOUT, TNS_PATH, TAG, CURRENT_OS, PROVISIONING, BRANCH, MODULES_PACKAGE, \
+    ANGULAR_PACKAGE, TYPESCRIPT_PACKAGE, UPDATE_WEBPACK_PATH, WEBPACK_PACKAGE, USE_YARN
 from core.tns.tns_platform_type import Platform
 from core.tns.tns_verifications import TnsAsserts
 from core.xcode.xcode import Xcode
@@ -82,13 +84,10 @@ class Tns(object):
         Kill all running `tns` processes
         """
         print "Kill all tns processes."
-        Process.kill(proc_name='node', proc_cmdline=os.sep + 'tns')
-        time.sleep(1)
-        Process.kill(proc_name='node', proc_cmdline=TEST_RUN_HOME.split(os.sep)[-1])
-        time.sleep(1)
-        Process.kill_by_commandline('webpack.js')
-        time.sleep(1)
-        Process.kill_by_commandline('tsc')
+        Process.kill_all([('node', os.sep + 'tns'),
+                          ('node', Context.current().test_run_home.split(os.sep)[-1]),
+                          (None, 'webpack.js'),
+                          (None, 'tsc')])
 
     @staticmethod
     def get_app_id(app_name, platform=Platform.NONE):
@@ -102,7 +101,7 @@ class Tns(object):
 
     @staticmethod
     def run_tns_command(command, tns_path=None, attributes={}, log_trace=False, timeout=COMMAND_TIMEOUT, wait=True,
-                        measureTime=False):
+                        measureTime=False, handle=False):
         cmd = TNS_PATH + " " + command
         if tns_path is not None:
             cmd = tns_path + " " + command
@@ -116,7 +115,7 @@ class Tns(object):
         if measureTime:
             cmd = "TIME " + cmd
         print cmd
-        output = run(command=cmd, timeout=timeout, wait=wait)
+        output = run(command=cmd, timeout=timeout, wait=wait, handle=handle)
         return output
 
     @staticmethod
@@ -130,7 +129,7 @@ class Tns(object):
         output = run(command=cmd)
 
         if folder is not None:
-            Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+            Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
 
         return output
 
@@ -178,7 +177,7 @@ class Tns(object):
                 assert "ERR" not in output, "Something went wrong when angular are installed."
 
         # Update NG dependencies
-        update_script = os.path.join(TEST_RUN_HOME, path,
+        update_script = os.path.join(Context.current().test_run_home, path,
                                      "node_modules", ".bin", "update-app-ng-deps")
         update_out = run(update_script)
         assert "Angular dependencies updated" in update_out
@@ -212,11 +211,11 @@ class Tns(object):
                 assert "ERR" not in output, "Something went wrong when webpack are installed."
 
         # Update webpack dependencies
-        update_script = os.path.join(TEST_RUN_HOME, path,
+        update_script = os.path.join(Context.current().test_run_home, path,
                                      "node_modules", ".bin", "update-ns-webpack --deps --configs")
         run(update_script)
         if USE_YARN == "True":
-            Folder.cleanup(folder=os.path.join(TEST_RUN_HOME, path, "node_modules"))
+            Folder.cleanup(folder=os.path.join(Context.current().test_run_home, path, "node_modules"))
             Npm.yarn_install(folder=path)
         else:
             Npm.install(folder=path)
@@ -244,7 +243,7 @@ class Tns(object):
                 assert "ERR" not in output, "Something went wrong when typescript are installed."
 
         # Update TS dependencies
-        update_script = os.path.join(TEST_RUN_HOME, path,
+        update_script = os.path.join(Context.current().test_run_home, path,
                                      "node_modules", ".bin", "ns-upgrade-tsconfig")
         run(update_script)
         if USE_YARN == "True":
@@ -261,8 +260,8 @@ class Tns(object):
             pass
         else:
             print "AppResources not found. Will copy from default template..."
-            src = os.path.join(TEST_RUN_HOME, "sut", "template-hello-world", "app", "App_Resources")
-            dest = os.path.join(TEST_RUN_HOME, path, "app", "App_Resources")
+            src = os.path.join(Context.current().sut_folder, "template-hello-world", "app", "App_Resources")
+            dest = os.path.join(Context.current().test_run_home, path, "app", "App_Resources")
             Folder.copy(src, dest)
 
     @staticmethod
@@ -282,7 +281,7 @@ class Tns(object):
         attr = {}
         if not any(s in attributes_to_string for s in ("--ng", "--template", "--tsc", "--vue")):
             if BRANCH == "master":
-                attr = {"--template": SUT_FOLDER + os.path.sep + "tns-template-hello-world.tgz"}
+                attr = {"--template": Context.current().sut_folder + os.path.sep + "tns-template-hello-world.tgz"}
             else:
                 attr = {"--template": "tns-template-hello-world"}
         attr.update(attributes)
@@ -310,7 +309,7 @@ class Tns(object):
         :return: output of `tns create command`
         """
         if BRANCH is "master":
-            attr = {"--template": SUT_FOLDER + os.path.sep + "tns-template-hello-world-ts.tgz"}
+            attr = {"--template": Context.current().sut_folder + os.path.sep + "tns-template-hello-world-ts.tgz"}
         else:
             attr = {"--template": "tns-template-hello-world-ts"}
         attributes.update(attr)
@@ -331,7 +330,7 @@ class Tns(object):
             attr = {"--template": template}
         else:
             if BRANCH is "master":
-                attr = {"--template": SUT_FOLDER + os.path.sep + "tns-template-hello-world-ng.tgz"}
+                attr = {"--template": Context.current().sut_folder + os.path.sep + "tns-template-hello-world-ng.tgz"}
             else:
                 attr = {"--template": "tns-template-hello-world-ng"}
         attributes.update(attr)
@@ -478,7 +477,7 @@ class Tns(object):
             assert "https://docs.nativescript.org/plugins/building-plugins" in output, 'Link to docs is missing.'
 
             # Verify created files and folders
-            plugin_root = os.path.join(TEST_RUN_HOME, folder)
+            plugin_root = os.path.join(Context.current().test_run_home, folder)
             readme = os.path.join(plugin_root, "README.md")
             src = os.path.join(plugin_root, "src")
             demo = os.path.join(plugin_root, "demo")
@@ -695,10 +694,11 @@ class Tns(object):
 
     @staticmethod
     def run_android(attributes={}, assert_success=True, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None,
-                    wait=True):
+                    wait=True, handle=False):
         output = Tns.run_tns_command("run android", attributes=attributes, log_trace=log_trace, timeout=timeout,
-                                     tns_path=tns_path, wait=wait)
-        if assert_success:
+                                     tns_path=tns_path, wait=wait, handle=handle)
+        # Output of handle is not complete until process exits, so it is not verified here
+        if assert_success and not isinstance(output, CommandHandle):
             assert "Project successfully built" in output
             assert "Successfully installed on device with identifier" in output
             app_name = Tns.__get_app_name_from_attributes(attributes=attributes)
@@ -715,30 +715,32 @@ class Tns(object):
         return output
 
     @staticmethod
-    def run_ios(attributes={}, assert_success=True, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None, wait=True):
+    def run_ios(attributes={}, assert_success=True, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None, wait=True,
+                handle=False):
         if "--emulator" not in attributes.keys():
             attr = {"--provision": PROVISIONING}
             attributes.update(attr)
         output = Tns.run_tns_command("run ios", attributes=attributes, log_trace=log_trace, timeout=timeout,
-                                     tns_path=tns_path, wait=wait)
-        if assert_success:
+                                     tns_path=tns_path, wait=wait, handle=handle)
+        if assert_success and not isinstance(output, CommandHandle):
             assert "Project successfully built" in output
             assert "Successfully installed on device with identifier" in output
         return output
 
     @staticmethod
-    def preview(attributes={}, assert_success=True, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None, wait=True):
+    def preview(attributes={}, assert_success=True, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None, wait=True,
+                handle=False):
         output = Tns.run_tns_command("preview", attributes=attributes, log_trace=log_trace, timeout=timeout,
-                                     tns_path=tns_path, wait=wait)
-        if assert_success:
+                                     tns_path=tns_path, wait=wait, handle=handle)
+        if assert_success and not isinstance(output, CommandHandle):
             assert "Generating qrcode for url https://play.nativescript.org/" in output
             assert "Press c to display the QR code of the current application." in output
         return output
 
     @staticmethod
-    def debug_android(attributes={}, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None):
+    def debug_android(attributes={}, log_trace=False, timeout=COMMAND_TIMEOUT, tns_path=None, handle=False):
         log_file = Tns.run_tns_command("debug android", attributes=attributes, log_trace=log_trace, timeout=timeout,
-                                       tns_path=tns_path, wait=False)
+                                       tns_path=tns_path, wait=False, handle=handle)
         return log_file
 
     @staticmethod
@@ -778,58 +780,54 @@ class Tns(object):
                      clean_log=True):
         """
         Wait until log file contains list of string.
-        :param log_file: Path to log file.
+        :param log_file: Path to log file (or CommandHandle, then waiting wakes up on each line of its output).
         :param string_list: List of strings.
         :param not_existing_string_list: List of string that should not be in logs.
         :param timeout: Timeout.
         :param check_interval: Check interval.
         :param clean_log: Specify if content of log file should be delete after check.
         """
+        handle = log_file if isinstance(log_file, CommandHandle) else None
+        if handle is not None:
+            log_file = handle.log_file
+        line_count = 0
         t_end = time.time() + timeout
+        matcher = LogMatcher(log_file=log_file, string_list=string_list,
+                             not_existing_string_list=not_existing_string_list)
         all_items_found = False
-        not_found_list = []
-        log = ""
+        not_found_list = None
         while time.time() < t_end:
-            not_found_list = []
-            log = File.read(log_file)
-            log = str(log.decode('utf8').encode('utf8')).strip()
-            for item in string_list:
-                if item in log:
-                    print "'{0}' found.".format(item)
-                else:
-                    not_found_list.append(item)
-            if not_found_list == []:
+            if matcher.check():
                 all_items_found = True
                 print "Log contains: {0}".format(string_list)
                 break
-            else:
-                print "'{0}' NOT found. Wait...".format(not_found_list)
-                time.sleep(check_interval)
-            if 'BUILD FAILED' in log:
-                print 'BUILD FAILED. No need to wait more time!'
-                break
-            if 'Unable to sync files' in log:
-                print 'Sync process failed. No need to wait more time!'
-                break
-            if '????????????????????????????' in log:
-                print 'Log seems to be corrupted. No need to wait more time!'
-                break
-            if 'errors were thrown' in log:
-                print 'Multiple errors were thrown. No need to wait more time!'
+            if matcher.abort_reason is not None:
+                print matcher.abort_reason
                 break
+            if matcher.not_found != not_found_list:
+                not_found_list = matcher.not_found
+                print "'{0}' NOT found. Wait...".format(not_found_list)
+            # Wake up as soon as log file is changed (but not later than `check_interval`)
+            wait_timeout = min(check_interval, max(t_end - time.time(), 0))
+            if handle is not None:
+                line_count = handle.wait_for_output(count=line_count, timeout=wait_timeout)
+            else:
+                Watcher.wait_for_change(file_path=log_file, timeout=wait_timeout)
+
+        # Full log is read only when it should be reported
+        log = ""
+        if not all_items_found or matcher.existing:
+            log = File.read(log_file).strip()
 
         if clean_log and (CURRENT_OS is not OSType.WINDOWS) and all_items_found:
             File.write(file_path=log_file, text="")
 
         if all_items_found:
-            if not_existing_string_list is None:
-                pass
-            else:
-                for item in not_existing_string_list:
-                    assert item not in log, "{0} found! It should not be in logs.\nLog:\n{1}".format(item, log)
+            existing = matcher.existing
+            assert not existing, "{0} found! It should not be in logs.\nLog:\n{1}".format(existing[0], log)
         else:
             print "##### OUTPUT BEGIN #####\n"
             print log
             print "##### OUTPUT END #####\n"
             print ""
-            assert False, "Output does not contain {0}".format(not_found_list)
+            assert False, "Output does not contain {0}".format(matcher.not_found)
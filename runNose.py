@@ -1,11 +1,16 @@
-﻿import os
+﻿import ast
+import os
+import re
 import shutil
+import subprocess
 import sys
+import xml.etree.ElementTree as ElementTree
 
 import nose
 
 from core.device.device import Device
-from core.device.emulator import Emulator
+from core.device.emulator import Emulator, EmulatorPool
+from core.device.helpers.logcat import Logcat
 from core.device.simulator import Simulator
 from core.git.git import Git
 from core.gradle.gradle import Gradle
@@ -13,9 +18,10 @@ from core.installer.cli import Cli
 from core.npm.npm import Npm
 from core.osutils.command import run
 from core.osutils.folder import Folder
+from core.osutils.trash import Trash
 from core.settings.settings import OUTPUT_FOLDER, CURRENT_OS, OSType, \
     ANDROID_PATH, IOS_PATH, SUT_FOLDER, CLI_PATH, IOS_INSPECTOR_PATH, SIMULATOR_NAME, SIMULATOR_TYPE, SIMULATOR_SDK, \
-    TEST_RUN_HOME
+    TEST_RUN_HOME, EMULATOR_PORT, SHARD_INDEX, APP_CACHE_FOLDER, EMULATOR_POOL_SIZE, START_TIME_FOLDER
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
 from core.xcode.xcode import Xcode
@@ -61,12 +67,199 @@ def get_repos():
              output_file=os.path.join(SUT_FOLDER, 'tns-template-hello-world-ng.tgz'))
 
 
+# Folders shared between all shards (symlinked in working directory of each shard)
+SHARED_FOLDERS = ['cache', 'core', 'node_modules', 'sut', 'tests']
+# Folders created in working directory of each shard with their content symlinked
+# (tests create scratch projects like `data/TestApp` in them, so they must not be shared)
+SHARD_LOCAL_FOLDERS = ['data']
+SHARDS_FOLDER = os.path.join(TEST_RUN_HOME, 'shards')
+# Tests that change state shared by all shards (CLI config in shared `node_modules`), they are not run in parallel
+SERIAL_TESTS = ['usage_reporting_tests.py', 'plugin_ios_cocoa_pods_sandbox_tests.py']
+TEST_MATCH = re.compile(r'(?:^|[\b_\.-])[Tt]est')
+
+
+def parse_shards(argv):
+    """
+    Get `--shards=N` (or `--shards N`) from arguments.
+    :param argv: Command line arguments.
+    :return: Tuple of shards count (0 if not specified) and arguments without `--shards`.
+    """
+    shards = 0
+    args = []
+    i = 0
+    while i < len(argv):
+        if argv[i].startswith('--shards='):
+            shards = int(argv[i].split('=', 1)[1])
+        elif argv[i] == '--shards':
+            i += 1
+            shards = int(argv[i])
+        else:
+            args.append(argv[i])
+        i += 1
+    return shards, args
+
+
+def get_test_classes(paths):
+    """
+    Find test classes in files and folders (without importing them).
+    :param paths: List of test files and folders.
+    :return: List of test classes in `path/to/file.py:ClassName` format.
+    """
+    files = []
+    for path in paths:
+        if ':' in path:
+            files.append(path)
+        elif os.path.isdir(path):
+            for root, dirs, file_names in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(file_names):
+                    if file_name.endswith('.py') and TEST_MATCH.search(file_name):
+                        files.append(os.path.join(root, file_name))
+        else:
+            files.append(path)
+
+    test_classes = []
+    for test_file in files:
+        if ':' in test_file or not os.path.isfile(test_file):
+            test_classes.append(test_file)
+            continue
+        with open(test_file) as f:
+            tree = ast.parse(f.read(), test_file)
+        for node in tree.body:
+            # Same as nose: collect TestCase subclasses (all inherit BaseClass) and classes with test-like names
+            if isinstance(node, ast.ClassDef) and \
+                    (TEST_MATCH.search(node.name) or any(getattr(b, 'id', None) != 'object' for b in node.bases)):
+                test_classes.append('{0}:{1}'.format(test_file, node.name))
+    return test_classes
+
+
+def merge_xunit_results(xunit_files, output_file):
+    """
+    Merge xunit results of all shards in one file.
+    :param xunit_files: List of xunit files.
+    :param output_file: Path to merged xunit file.
+    """
+    merged = ElementTree.Element('testsuite', name='nosetests')
+    counters = {'tests': 0, 'errors': 0, 'failures': 0, 'skip': 0}
+    for xunit_file in xunit_files:
+        if not os.path.isfile(xunit_file):
+            print "Missing xunit results: " + xunit_file
+            counters['errors'] += 1
+            continue
+        suite = ElementTree.parse(xunit_file).getroot()
+        for key in counters.keys():
+            counters[key] += int(suite.get(key, 0))
+        for test_case in suite:
+            merged.append(test_case)
+    for key, value in counters.iteritems():
+        merged.set(key, str(value))
+    ElementTree.ElementTree(merged).write(output_file, encoding='UTF-8', xml_declaration=True)
+
+
+def start_shard(index, test_classes, options):
+    """
+    Start worker process of sharded run.
+    :param index: Index of worker.
+    :param test_classes: Test classes run by worker.
+    :param options: Options passed to nose.
+    :return: Tuple of process, its log file and path to its xunit results.
+    """
+    shard_home = os.path.join(SHARDS_FOLDER, 'shard_{0}'.format(index))
+    Folder.create(os.path.join(shard_home, 'out'))
+    for folder in SHARED_FOLDERS:
+        if os.path.exists(os.path.join(TEST_RUN_HOME, folder)):
+            os.symlink(os.path.join(TEST_RUN_HOME, folder), os.path.join(shard_home, folder))
+    for folder in SHARD_LOCAL_FOLDERS:
+        src = os.path.join(TEST_RUN_HOME, folder)
+        if os.path.isdir(src):
+            Folder.create(os.path.join(shard_home, folder))
+            for name in os.listdir(src):
+                os.symlink(os.path.join(src, name), os.path.join(shard_home, folder, name))
+
+    env = os.environ.copy()
+    env['SHARD_INDEX'] = str(index)
+    env['EMULATOR_PORT'] = str(int(EMULATOR_PORT) + 2 * index)
+    env['SIMULATOR_NAME'] = '{0}_{1}'.format(SIMULATOR_NAME, index)
+    env['START_TIME_FOLDER'] = START_TIME_FOLDER
+    if CURRENT_OS == OSType.OSX:
+        Simulator.create(env['SIMULATOR_NAME'], SIMULATOR_TYPE, SIMULATOR_SDK)
+
+    xunit_file = os.path.join(shard_home, 'nosetests.xml')
+    command = [sys.executable, os.path.join(TEST_RUN_HOME, 'runNose.py'), '--xunit-file=' + xunit_file] + \
+              options + test_classes
+    log = open(os.path.join(shard_home, 'out', 'shard.txt'), 'w')
+    print "Shard {0}: {1}".format(index, ' '.join(command))
+    process = subprocess.Popen(command, cwd=shard_home, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, log, xunit_file
+
+
+def run_shards(shards, args):
+    """
+    Split test classes across worker processes.
+    Each worker runs in own working directory (own `out` folder and test apps), uses own emulator port and simulator.
+    Test classes from SERIAL_TESTS files run in one more worker after all other workers are done.
+    :param shards: Number of workers.
+    :param args: Arguments passed to nose (options and test files/folders).
+    :return: True if all workers passed.
+    """
+    options = [arg for arg in args if arg.startswith('-')]
+    names = [arg for arg in args if not arg.startswith('-')]
+    test_classes = get_test_classes(names)
+    serial_classes = [c for c in test_classes if os.path.basename(c.split(':')[0]) in SERIAL_TESTS]
+    parallel_classes = [c for c in test_classes if c not in serial_classes]
+    shards = min(shards, len(parallel_classes))
+    print "Run {0} test classes in {1} shards ({2} after shards).".format(len(test_classes), shards,
+                                                                          len(serial_classes))
+
+    Folder.cleanup(SHARDS_FOLDER)
+    workers = [start_shard(index, parallel_classes[index::shards], options) for index in range(shards)]
+
+    passed = True
+    for process, log, xunit_file in workers:
+        if process.wait() != 0:
+            passed = False
+        log.close()
+    if serial_classes:
+        process, log, xunit_file = start_shard(shards, serial_classes, options)
+        if process.wait() != 0:
+            passed = False
+        log.close()
+        workers.append((process, log, xunit_file))
+    merge_xunit_results([w[2] for w in workers], os.path.join(TEST_RUN_HOME, 'nosetests.xml'))
+    return passed
+
+
 if __name__ == '__main__':
 
+    # Worker of sharded run (environment is already prepared by main process)
+    if SHARD_INDEX is not None:
+        arguments = ['nosetests', '-v', '-s', '--nologcapture', '--with-doctest', '--with-xunit', '--with-flaky']
+        arguments.extend(str(i) for i in sys.argv)
+        if EMULATOR_POOL_SIZE > 0:
+            EmulatorPool.start()
+        result = nose.run(argv=arguments)
+        Logcat.stop()
+        if EmulatorPool.is_started():
+            EmulatorPool.stop()
+        Trash.empty()
+        sys.exit(0 if result else 1)
+
+    shards_count, test_args = parse_shards(sys.argv[1:])
+    if shards_count > 1 and CURRENT_OS == OSType.WINDOWS:
+        print 'Sharded test run is not supported on Windows, run tests in single process.'
+        shards_count = 0
+    if shards_count > 1 and not [arg for arg in test_args if not arg.startswith('-')]:
+        print 'No test files or folders specified, run tests in single process (nose discovers tests).'
+        shards_count = 0
+    passed = True
+
     # Cleanup files and folders created by the test execution
+    Trash.empty()
     Folder.cleanup(OUTPUT_FOLDER)
     Folder.create(OUTPUT_FOLDER)
     Folder.cleanup(SUT_FOLDER)
+    Folder.cleanup(APP_CACHE_FOLDER)
+    Folder.create(APP_CACHE_FOLDER)
     Folder.cleanup("node_modules")
     Npm.cache_clean()
     Gradle.kill()
@@ -111,13 +304,25 @@ if __name__ == '__main__':
     assert base_path in run(command=where_command), 'Global installation is not the local one!'
 
     # Run Tests
-    arguments = ['nosetests', '-v', '-s', '--nologcapture', '--with-doctest', '--with-xunit', '--with-flaky']
-    for i in sys.argv:
-        arguments.append(str(i))
-    nose.run(argv=arguments)
+    if shards_count > 1:
+        if EMULATOR_POOL_SIZE > 0:
+            EmulatorPool.prepare()
+        passed = run_shards(shards=shards_count, args=test_args)
+    else:
+        arguments = ['nosetests', '-v', '-s', '--nologcapture', '--with-doctest', '--with-xunit', '--with-flaky']
+        for i in [sys.argv[0]] + test_args:
+            arguments.append(str(i))
+        if EMULATOR_POOL_SIZE > 0:
+            EmulatorPool.start()
+        passed = nose.run(argv=arguments)
+        if EmulatorPool.is_started():
+            EmulatorPool.stop()
 
     # Cleanup and reset after test run is complete
+    Logcat.stop()
+    Trash.empty()
     if CURRENT_OS == OSType.OSX:
         Simulator.reset()
         Gradle.kill()
         Gradle.cache_clean()
+    sys.exit(0 if passed else 1)
@@ -4,9 +4,9 @@ import urllib
 
 import unittest
 
-from core.settings.settings import SUT_FOLDER, EMULATOR_NAME, EMULATOR_ID, \
-     ANDROID_KEYSTORE_PASS, ANDROID_KEYSTORE_ALIAS, ANDROID_KEYSTORE_PATH,\
-     ANDROID_KEYSTORE_ALIAS_PASS, CURRENT_OS, OSType, ANDROID_PACKAGE, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import EMULATOR_NAME, ANDROID_KEYSTORE_PASS, ANDROID_KEYSTORE_ALIAS, \
+    ANDROID_KEYSTORE_PATH, ANDROID_KEYSTORE_ALIAS_PASS, CURRENT_OS, OSType, ANDROID_PACKAGE
 
 from core.device.helpers.adb import Adb
 
@@ -22,12 +22,12 @@ from core.osutils.command import run
 
 from core.osutils.command_log_level import CommandLogLevel
 
-from core.device.emulator import Emulator, EMULATOR_ID, EMULATOR_NAME
+from core.device.emulator import Emulator, EMULATOR_NAME
 
 from core.tns.tns import Tns
 class AndroidAppBundleTests(BaseClass):
     
-    bundletool_path = os.path.join(SUT_FOLDER,"bundletool.jar")
+    bundletool_path = os.path.join(Context.current().sut_folder,"bundletool.jar")
     path_to_apks = os.path.join(BaseClass.app_name,'app.apks')
 
     @classmethod
@@ -39,23 +39,24 @@ class AndroidAppBundleTests(BaseClass):
         Tns.create_app(BaseClass.app_name)
         Tns.platform_add_android(attributes={"--path": BaseClass.app_name, "--frameworkPath": ANDROID_PACKAGE})
         Tns.update_webpack(BaseClass.app_name)
-        Folder.copy(os.path.join(TEST_RUN_HOME, BaseClass.app_name), os.path.join(TEST_RUN_HOME, "data", "TestApp"))
+        Folder.copy(os.path.join(Context.current().test_run_home, BaseClass.app_name),
+                    os.path.join(Context.current().test_run_home, "data", "TestApp"))
 
         #Download bundletool
         url = 'https://github.com/google/bundletool/releases/download/0.8.0/bundletool-all-0.8.0.jar'
-        urllib.urlretrieve(url, os.path.join(SUT_FOLDER, 'bundletool.jar'))
+        urllib.urlretrieve(url, os.path.join(Context.current().sut_folder, 'bundletool.jar'))
 
     @classmethod
     def tearDownClass(cls):
         BaseClass.tearDownClass()
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
 
     def setUp(self):
         BaseClass.setUp(self)
         # Ensure app is in initial state
-        Folder.navigate_to(folder=TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(folder=Context.current().test_run_home, relative_from_current_folder=False)
         Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
+        Folder.copy(Context.current().test_run_home + "/data/TestApp", Context.current().test_run_home + "/TestApp")
 
     def tearDown(self):
         BaseClass.tearDown(self)
@@ -71,7 +72,8 @@ class AndroidAppBundleTests(BaseClass):
 
     @staticmethod
     def bundletool_deploy(bundletool_path, path_to_apks, device_id):
-        deploy_command = ('java -jar {0} install-apks --apks="{1}" --device-id={2}').format(bundletool_path, path_to_apks, EMULATOR_ID)
+        deploy_command = ('java -jar {0} install-apks --apks="{1}" --device-id={2}').format(
+            bundletool_path, path_to_apks, Context.current().emulator_id)
         output = run(deploy_command, log_level=CommandLogLevel.FULL)
         assert not "Error" in output, "deploy of app failed"
         assert  "The APKs have been extracted in the directory:" in output, "deploy of app failed"
@@ -91,13 +93,13 @@ class AndroidAppBundleTests(BaseClass):
         assert File.exists(self.path_to_apks)
 
         # Deploy on device
-        self.bundletool_deploy(self.bundletool_path, self.path_to_apks, device_id=EMULATOR_ID)
+        self.bundletool_deploy(self.bundletool_path, self.path_to_apks, device_id=Context.current().emulator_id)
         
         # Start the app on device
-        Adb.start_app(EMULATOR_ID, "org.nativescript.TestApp")
+        Adb.start_app(Context.current().emulator_id, "org.nativescript.TestApp")
         
         # Verify app looks correct inside emulator
-        app_started = Device.wait_for_text(device_id=EMULATOR_ID, text='TAP')
+        app_started = Device.wait_for_text(device_id=Context.current().emulator_id, text='TAP')
         assert app_started, 'App is not started on device'
 
     @unittest.skipIf(CURRENT_OS == OSType.WINDOWS, "Skip on Windows")
@@ -144,13 +146,13 @@ class AndroidAppBundleTests(BaseClass):
         assert File.exists(os.path.join(self.app_name, 'base_apk', 'lib', 'x86', 'libNativeScript.so'))
 
         # Deploy on device
-        self.bundletool_deploy(self.bundletool_path, self.path_to_apks, device_id=EMULATOR_ID)
+        self.bundletool_deploy(self.bundletool_path, self.path_to_apks, device_id=Context.current().emulator_id)
         
         # Start the app on device
-        Adb.start_app(EMULATOR_ID, "org.nativescript.TestApp")
+        Adb.start_app(Context.current().emulator_id, "org.nativescript.TestApp")
         
         # Verify app looks correct inside emulator
-        app_started = Device.wait_for_text(device_id=EMULATOR_ID, text='TAP')
+        app_started = Device.wait_for_text(device_id=Context.current().emulator_id, text='TAP')
         assert app_started, 'App is not started on device'
 
 
@@ -12,10 +12,11 @@ from core.npm.npm import Npm
 from core.osutils.command import run
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import ANDROID_PACKAGE, TNS_PATH, \
-    ANDROID_KEYSTORE_PASS, ANDROID_KEYSTORE_ALIAS, ANDROID_KEYSTORE_PATH, ANDROID_KEYSTORE_ALIAS_PASS, CURRENT_OS, \
-    OSType, TEST_RUN_HOME, USE_YARN
+from core.settings.context import Context
+from core.settings.settings import ANDROID_PACKAGE, TNS_PATH, ANDROID_KEYSTORE_PASS, ANDROID_KEYSTORE_ALIAS, \
+    ANDROID_KEYSTORE_PATH, ANDROID_KEYSTORE_ALIAS_PASS, CURRENT_OS, OSType, USE_YARN
 from core.settings.strings import *
+from core.tns.app_cache import AppCache
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -43,8 +44,7 @@ class BuildAndroidTests(BaseClass):
         File.remove(cls.release_apk)
         Folder.cleanup('temp')
 
-        Tns.create_app(cls.app_name)
-        Tns.platform_add_android(attributes={"--path": cls.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(cls.app_name)
 
         # Add release and debug configs
         debug = os.path.join(cls.app_name, 'app', 'config.debug.json')
@@ -153,7 +153,7 @@ class BuildAndroidTests(BaseClass):
         Folder.navigate_to(self.app_name)
         output = Tns.build_android(tns_path=os.path.join("..", TNS_PATH), attributes={"--path": self.app_name},
                                    assert_success=False, log_trace=True)
-        Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         assert successfully_prepared in output
         assert build_successful in output
         assert successfully_built in output
@@ -235,8 +235,7 @@ class BuildAndroidTests(BaseClass):
     def test_310_build_android_with_custom_compile_sdk_new(self):
         # This is required when build with different SDK
         Folder.cleanup(self.app_name)
-        Tns.create_app(self.app_name)
-        Tns.platform_add_android(attributes={"--path": self.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(self.app_name)
         Tns.build_android(attributes={"--compileSdk": "28", "--path": self.app_name})
 
     @unittest.skip("https://github.com/NativeScript/nativescript-cli/issues/4052")
@@ -244,15 +243,13 @@ class BuildAndroidTests(BaseClass):
         #https://github.com/NativeScript/nativescript-cli/issues/4052
         # This is required when build with different SDK
         Folder.cleanup(self.app_name)
-        Tns.create_app(self.app_name)
-        Tns.platform_add_android(attributes={"--path": self.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(self.app_name)
         Tns.build_android(attributes={"--compileSdk": "27", "--path": self.app_name})
 
     def test_313_build_android_with_invalid_compile_sdk(self):
         # This is required when build with different SDK
         Folder.cleanup(self.app_name)
-        Tns.create_app(self.app_name)
-        Tns.platform_add_android(attributes={"--path": self.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(self.app_name)
 
         output = Tns.build_android(attributes={"--compileSdk": "99", "--path": self.app_name},
                                    assert_success=False)
@@ -262,8 +259,7 @@ class BuildAndroidTests(BaseClass):
         # TODO: Remove those lines after https://github.com/NativeScript/nativescript-cli/issues/2547 is fixed.
         # This is required when build with different SDK
         Folder.cleanup(self.app_name)
-        Tns.create_app(self.app_name)
-        Tns.platform_add_android(attributes={"--path": self.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(self.app_name)
 
         File.remove(self.debug_apk)
         Tns.build_android(attributes={"--path": self.app_name, "--copy-to": "./"})
@@ -274,8 +270,7 @@ class BuildAndroidTests(BaseClass):
     def test_399_build_project_with_gz_file(self):
         # This is required when build with different SDK
         Folder.cleanup(self.app_name)
-        Tns.create_app(self.app_name)
-        Tns.platform_add_android(attributes={"--path": self.app_name, "--frameworkPath": ANDROID_PACKAGE})
+        AppCache.create_app(self.app_name)
 
         # Create zip
         run("tar -czf " + self.app_name + "/app/app.tar.gz " + self.app_name + "/app/app.js")
@@ -331,8 +326,8 @@ class BuildAndroidTests(BaseClass):
 
     @unittest.skip("temporary stop this test")
     def test_450_resources_update_android(self):
-        target_app = os.path.join(TEST_RUN_HOME, BaseClass.app_name)
-        source_app = os.path.join(TEST_RUN_HOME, 'data', 'apps', 'test-app-js-41')
+        target_app = os.path.join(Context.current().test_run_home, BaseClass.app_name)
+        source_app = os.path.join(Context.current().test_run_home, 'data', 'apps', 'test-app-js-41')
         Folder.cleanup(target_app)
         Folder.copy(source_app, target_app)
 
@@ -351,8 +346,8 @@ class BuildAndroidTests(BaseClass):
 
     @unittest.skip("temporary stop this test")
     def test_451_resources_update(self):
-        target_app = os.path.join(TEST_RUN_HOME, BaseClass.app_name)
-        source_app = os.path.join(TEST_RUN_HOME, 'data', 'apps', 'test-app-js-41')
+        target_app = os.path.join(Context.current().test_run_home, BaseClass.app_name)
+        source_app = os.path.join(Context.current().test_run_home, 'data', 'apps', 'test-app-js-41')
         Folder.cleanup(target_app)
         Folder.copy(source_app, target_app)
 
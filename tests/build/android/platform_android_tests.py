@@ -7,7 +7,8 @@ from core.base_class.BaseClass import BaseClass
 from core.java.java import Java
 from core.npm.npm import Npm
 from core.osutils.folder import Folder
-from core.settings.settings import TNS_PATH, ANDROID_PACKAGE, TEST_RUN_HOME, USE_YARN
+from core.settings.context import Context
+from core.settings.settings import TNS_PATH, ANDROID_PACKAGE, USE_YARN
 from core.settings.strings import *
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -42,7 +43,7 @@ class PlatformAndroidTests(BaseClass):
         """ Add platform inside project folder (not using --path)"""
         Folder.navigate_to(self.app_name)
         output = Tns.platform_add_android(tns_path=os.path.join("..", TNS_PATH), assert_success=False)
-        Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         TnsAsserts.platform_added(self.app_name, platform=Platform.ANDROID, output=output)
 
     def test_130_platform_remove_and_platform_add_android_custom_version(self):
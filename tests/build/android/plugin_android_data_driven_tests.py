@@ -9,8 +9,8 @@ from nose_parameterized import parameterized
 from core.base_class.BaseClass import BaseClass
 from core.java.java import Java
 from core.osutils.file import File
-from core.osutils.folder import Folder
-from core.settings.settings import ANDROID_PACKAGE, TEST_RUN_HOME
+from core.settings.context import Context
+from core.tns.app_cache import AppCache
 from core.tns.tns import Tns
 
 
@@ -30,10 +30,7 @@ class PluginsAndroidDataDrivenTests(BaseClass):
     @classmethod
     def setUpClass(cls):
         BaseClass.setUpClass(cls.__name__)
-        Tns.create_app(cls.app_name)
-        Tns.platform_add_android(attributes={"--path": cls.app_name, "--frameworkPath": ANDROID_PACKAGE})
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
-        Folder.copy(TEST_RUN_HOME + "/" + cls.app_name, TEST_RUN_HOME + "/data/TestApp")
+        AppCache.create_app(cls.app_name)
 
     def setUp(self):
         BaseClass.setUp(self)
@@ -43,16 +40,14 @@ class PluginsAndroidDataDrivenTests(BaseClass):
 
     @classmethod
     def tearDownClass(cls):
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
         BaseClass.tearDownClass()
 
     @parameterized.expand(PLUGIN_DEMOS)
     @unittest.skipIf(Java.version() != "1.8", "Some of test plugins are not compatible with java 10+")
     def test_200_plugin(self, plugin, verification, comment):
         print "Test case: " + comment
-        Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
-        plugin_path = os.path.join(TEST_RUN_HOME, 'data', 'plugins', 'android', plugin)
+        AppCache.create_app(self.app_name)
+        plugin_path = os.path.join(Context.current().test_run_home, 'data', 'plugins', 'android', plugin)
         plugin_name = plugin.replace(".tgz", "")
         Tns.plugin_add(plugin_path, attributes={"--path": self.app_name})
         output = Tns.prepare_android(attributes={"--path": self.app_name})
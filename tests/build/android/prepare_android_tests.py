@@ -13,7 +13,9 @@ from core.osutils.command import run
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.os_type import OSType
-from core.settings.settings import ANDROID_PACKAGE, TNS_PATH, TEST_RUN_HOME, CURRENT_OS, USE_YARN
+from core.settings.context import Context
+from core.settings.settings import ANDROID_PACKAGE, TNS_PATH, CURRENT_OS, USE_YARN
+from core.tns.app_cache import AppCache
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -25,20 +27,20 @@ class PrepareAndroidTests(BaseClass):
     @classmethod
     def setUpClass(cls):
         BaseClass.setUpClass(cls.__name__)
-        Tns.create_app(cls.app_name, update_modules=False)
-        Tns.platform_add_android(attributes={"--path": cls.app_name, "--frameworkPath": ANDROID_PACKAGE})
-        Folder.copy(TEST_RUN_HOME + "/" + cls.app_name, TEST_RUN_HOME + "/data/TestApp")
+        AppCache.create_app(cls.app_name, update_modules=False)
+        Folder.copy(Context.current().test_run_home + "/" + cls.app_name,
+                    Context.current().test_run_home + "/data/TestApp")
 
     @classmethod
     def tearDownClass(cls):
         BaseClass.tearDownClass()
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
 
     def setUp(self):
         BaseClass.setUp(self)
-        Folder.navigate_to(folder=TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(folder=Context.current().test_run_home, relative_from_current_folder=False)
         Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
+        Folder.copy(Context.current().test_run_home + "/data/TestApp", Context.current().test_run_home + "/TestApp")
 
     def test_101_prepare_android(self):
         # Initial prepare should be full.
@@ -57,7 +59,7 @@ class PrepareAndroidTests(BaseClass):
     def test_102_prepare_android_inside_project(self):
         Folder.navigate_to(self.app_name)
         output = Tns.prepare_android(tns_path=os.path.join("..", TNS_PATH), assert_success=False)
-        Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         TnsAsserts.prepared(self.app_name, platform=Platform.ANDROID, output=output, prepare=Prepare.FULL)
 
     def test_200_prepare_android_platform_not_added(self):
@@ -81,7 +83,7 @@ class PrepareAndroidTests(BaseClass):
         run("touch a")
         run("ln -s a b")
         run("rm a")
-        Folder.navigate_to(folder=TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(folder=Context.current().test_run_home, relative_from_current_folder=False)
         output = Tns.prepare_android(attributes={"--path": self.app_name})
         assert "Project successfully prepared" in output
 
@@ -168,7 +170,7 @@ class PrepareAndroidTests(BaseClass):
                        local_folder="nativescript-facebook")
         Folder.navigate_to(folder="nativescript-facebook/src")
         output = run(command="npm run build")
-        Folder.navigate_to(folder=TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(folder=Context.current().test_run_home, relative_from_current_folder=False)
         assert "tsc" in output
         assert "ERR" not in output
         Tns.prepare_android(attributes={"--path": "nativescript-facebook/demo"})
@@ -10,16 +10,17 @@ from core.osutils.folder import Folder
 from core.osutils.file import File
 from core.osutils.image_utils import ImageUtils
 from core.osutils.os_type import OSType
-from core.settings.settings import CURRENT_OS, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import CURRENT_OS
 from core.tns.tns import Tns
 
 
 class ResourcesGenerateTests(BaseClass):
-    image_path = os.path.join(TEST_RUN_HOME, "data", "images", "resources_generate", "star.png")
+    image_path = os.path.join(Context.current().test_run_home, "data", "images", "resources_generate", "star.png")
 
-    expected_images = os.path.join(TEST_RUN_HOME, "data", "images", "resources_generate")
-    expected_images_android = os.path.join(TEST_RUN_HOME, expected_images, "Android")
-    expected_images_ios = os.path.join(TEST_RUN_HOME, expected_images, "iOS")
+    expected_images = os.path.join(Context.current().test_run_home, "data", "images", "resources_generate")
+    expected_images_android = os.path.join(Context.current().test_run_home, expected_images, "Android")
+    expected_images_ios = os.path.join(Context.current().test_run_home, expected_images, "iOS")
 
     app_resources = os.path.join("app", "App_Resources", "Android", "src", "main", "res")
     app_resources_old = os.path.join("app", "App_Resources", "Android")
@@ -124,8 +125,8 @@ class ResourcesGenerateTests(BaseClass):
                                                                                    str(result[1]))
 
     def test_001_tns_resources_generate_icons(self):
-        app_resources_android = os.path.join(TEST_RUN_HOME, self.app_name, self.app_resources)
-        app_resources_ios = os.path.join(TEST_RUN_HOME, self.app_name, self.assets_icons)
+        app_resources_android = os.path.join(Context.current().test_run_home, self.app_name, self.app_resources)
+        app_resources_ios = os.path.join(Context.current().test_run_home, self.app_name, self.assets_icons)
 
         output = run("tns resources generate icons \"" + self.image_path + "\"" + " --path " + self.app_name)
         assert "Generating icons" in output
@@ -134,8 +135,8 @@ class ResourcesGenerateTests(BaseClass):
         ResourcesGenerateTests.check_icons(app_resources_android, app_resources_ios)
 
     def test_002_tns_resources_generate_splashes(self):
-        app_resources_android = os.path.join(TEST_RUN_HOME, self.app_name, self.app_resources)
-        app_resources_ios = os.path.join(TEST_RUN_HOME, self.app_name, self.assets_base)
+        app_resources_android = os.path.join(Context.current().test_run_home, self.app_name, self.app_resources)
+        app_resources_ios = os.path.join(Context.current().test_run_home, self.app_name, self.assets_base)
 
         output = run("tns resources generate splashes \"" + self.image_path + "\"" + " --background green --path "
                      + self.app_name)
@@ -148,7 +149,7 @@ class ResourcesGenerateTests(BaseClass):
         #https://github.com/NativeScript/nativescript-cli/issues/3666
         Folder.cleanup(os.path.join(self.app_name, 'app', 'App_Resources', 'iOS', 'Assets.xcassets',
                                     'AppIcon.appiconset'))
-        folder = os.path.join(TEST_RUN_HOME, "data", "images", "resources_generate", "apetool",
+        folder = os.path.join(Context.current().test_run_home, "data", "images", "resources_generate", "apetool",
                               "AppIcon.appiconset")
         destination = os.path.join(self.app_name, 'app', 'App_Resources', 'iOS', 'Assets.xcassets', 'AppIcon.appiconset')
         Folder.copy(folder, destination)
@@ -161,8 +162,10 @@ class ResourcesGenerateTests(BaseClass):
         assert "Invalid settings specified for the resizer." not in output
 
     def test_100_tns_resources_generate_icons_old_template_structure(self):
-        app_resources_android = os.path.join(TEST_RUN_HOME, self.app_based_on_old_template, self.app_resources_old)
-        app_resources_ios = os.path.join(TEST_RUN_HOME, self.app_based_on_old_template, self.assets_icons)
+        app_resources_android = os.path.join(Context.current().test_run_home, self.app_based_on_old_template,
+                                             self.app_resources_old)
+        app_resources_ios = os.path.join(Context.current().test_run_home, self.app_based_on_old_template,
+                                         self.assets_icons)
 
         output = run(
             "tns resources generate icons \"" + self.image_path + "\"" + " --path " + self.app_based_on_old_template)
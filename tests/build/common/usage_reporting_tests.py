@@ -5,13 +5,13 @@ import os
 
 from core.base_class.BaseClass import BaseClass
 from core.osutils.file import File
-from core.settings.settings import TEST_RUN_HOME
+from core.settings.context import Context
 from core.settings.strings import *
 from core.tns.tns import Tns
 
 
 class UsageReportingTests(BaseClass):
-    config = os.path.join(TEST_RUN_HOME, 'node_modules', 'nativescript', 'config', 'config.json')
+    config = os.path.join(Context.current().test_run_home, 'node_modules', 'nativescript', 'config', 'config.json')
 
     @classmethod
     def setUpClass(cls):
@@ -10,8 +10,9 @@ from core.npm.npm import Npm
 from core.osutils.command import run
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, TNS_PATH, TEST_RUN_HOME, ANDROID_PACKAGE, PROVISIONING, \
-    DISTRIBUTION_PROVISIONING, DEVELOPMENT_TEAM
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE, TNS_PATH, ANDROID_PACKAGE, PROVISIONING, DISTRIBUTION_PROVISIONING, \
+    DEVELOPMENT_TEAM
 from core.settings.strings import *
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -115,7 +116,7 @@ class BuildiOSTests(BaseClass):
         Folder.navigate_to(self.app_name)
         output = Tns.build_ios(tns_path=os.path.join("..", TNS_PATH), attributes={"--path": self.app_name},
                                assert_success=False, log_trace=True)
-        Folder.navigate_to(TEST_RUN_HOME, relative_from_current_folder=False)
+        Folder.navigate_to(Context.current().test_run_home, relative_from_current_folder=False)
         assert "build/Debug-iphonesimulator/TestApp.app" in output
         assert File.exists(self.app_name + "/platforms/ios/build/Debug-iphonesimulator/TestApp.app")
 
@@ -162,7 +163,7 @@ class BuildiOSTests(BaseClass):
         Tns.build_ios(attributes={"--path": self.app_name})
 
         # Add entitlements in app/App_Resources/iOS/app.entitlements
-        source = os.path.join(TEST_RUN_HOME, 'data', 'entitlements', 'app.entitlements')
+        source = os.path.join(Context.current().test_run_home, 'data', 'entitlements', 'app.entitlements')
         target = os.path.join(self.app_name, 'app', 'App_Resources', 'iOS', 'app.entitlements')
         File.copy(src=source, dest=target)
 
@@ -175,7 +176,8 @@ class BuildiOSTests(BaseClass):
         assert '<string>development</string>' in entitlements_content, "Entitlements file content is wrong!"
 
         # Install plugin with entitlements, build again and verify entitlements are merged
-        plugin_path = os.path.join(TEST_RUN_HOME, 'data', 'plugins', 'nativescript-test-entitlements-1.0.0.tgz')
+        plugin_path = os.path.join(Context.current().test_run_home, 'data', 'plugins',
+                                   'nativescript-test-entitlements-1.0.0.tgz')
         Npm.install(package=plugin_path, option='--save', folder=self.app_name)
         Tns.build_ios(attributes={"--path": self.app_name})
         entitlements_content = File.read(entitlements_path)
@@ -198,8 +200,8 @@ class BuildiOSTests(BaseClass):
         assert error not in output.lower()
 
     def test_450_resources_update_ios(self):
-        target_app = os.path.join(TEST_RUN_HOME, BaseClass.app_name)
-        source_app = os.path.join(TEST_RUN_HOME, 'data', 'apps', 'test-app-js-34')
+        target_app = os.path.join(Context.current().test_run_home, BaseClass.app_name)
+        source_app = os.path.join(Context.current().test_run_home, 'data', 'apps', 'test-app-js-34')
         Folder.cleanup(target_app)
         Folder.copy(source_app, target_app)
 
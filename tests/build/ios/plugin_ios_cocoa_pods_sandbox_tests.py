@@ -6,7 +6,8 @@ import os
 from core.base_class.BaseClass import BaseClass
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE
 from core.tns.tns import Tns
 from core.xcode.xcode import Xcode
 
@@ -27,7 +28,8 @@ class PluginsiOSSandboxPodsTests(BaseClass):
         Folder.cleanup(self.app_name)
 
     def tearDown(self):
-        File.replace(TEST_RUN_HOME + "/node_modules/nativescript/config/config.json", '"USE_POD_SANDBOX": true',
+        File.replace(Context.current().test_run_home + "/node_modules/nativescript/config/config.json",
+                     '"USE_POD_SANDBOX": true',
                      '"USE_POD_SANDBOX": false')
 
     def test_100_plugin_add_sandbox_pod_can_write_in_app_folder(self):
@@ -35,7 +37,8 @@ class PluginsiOSSandboxPodsTests(BaseClass):
         Tns.platform_add_ios(attributes={"--path": self.app_name,
                                          "--frameworkPath": IOS_PACKAGE})
 
-        plugin = os.path.join(TEST_RUN_HOME, "data", "CocoaPods", "nativescript-ios-working-with-sandbox-plugin.tgz")
+        plugin = os.path.join(Context.current().test_run_home, "data", "CocoaPods",
+                              "nativescript-ios-working-with-sandbox-plugin.tgz")
         output = Tns.plugin_add(plugin, attributes={"--path": self.app_name}, assert_success=False)
         assert "Successfully installed plugin nativescript-ios-working-with-sandbox-plugin." in output
         assert "nativescript-ios-working-with-sandbox-plugin" in File.read(self.app_name + "/package.json")
@@ -51,7 +54,8 @@ class PluginsiOSSandboxPodsTests(BaseClass):
         Tns.platform_add_ios(attributes={"--path": self.app_name,
                                          "--frameworkPath": IOS_PACKAGE})
 
-        plugin = os.path.join(TEST_RUN_HOME, "data", "CocoaPods", "nativescript-ios-fail-with-sandbox-plugin.tgz")
+        plugin = os.path.join(Context.current().test_run_home, "data", "CocoaPods",
+                              "nativescript-ios-fail-with-sandbox-plugin.tgz")
         output = Tns.plugin_add(plugin, attributes={"--path": self.app_name}, assert_success=False)
         assert "Successfully installed plugin nativescript-ios-fail-with-sandbox-plugin." in output
         assert "nativescript-ios-fail-with-sandbox-plugin" in File.read(self.app_name + "/package.json")
@@ -69,7 +73,8 @@ class PluginsiOSSandboxPodsTests(BaseClass):
         Tns.create_app(self.app_name)
         Tns.platform_add_ios(attributes={"--path": self.app_name, "--frameworkPath": IOS_PACKAGE})
 
-        plugin = os.path.join(TEST_RUN_HOME, "data", "CocoaPods", "nativescript-ios-fail-with-sandbox-plugin.tgz")
+        plugin = os.path.join(Context.current().test_run_home, "data", "CocoaPods",
+                              "nativescript-ios-fail-with-sandbox-plugin.tgz")
         output = Tns.plugin_add(plugin, attributes={"--path": self.app_name}, assert_success=False)
         assert "Successfully installed plugin nativescript-ios-fail-with-sandbox-plugin." in output
         assert "nativescript-ios-fail-with-sandbox-plugin" in File.read(self.app_name + "/package.json")
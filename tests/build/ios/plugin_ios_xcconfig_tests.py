@@ -5,7 +5,8 @@ Test for plugin* commands in context of iOS
 from core.base_class.BaseClass import BaseClass
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE
 from core.tns.tns import Tns
 from core.xcode.xcode import Xcode
 
@@ -15,21 +16,22 @@ class PluginsiOSXcconfigTests(BaseClass):
     def setUpClass(cls):
         BaseClass.setUpClass(cls.__name__)
         Tns.create_app(cls.app_name)
-        Folder.copy(TEST_RUN_HOME + "/" + cls.app_name, TEST_RUN_HOME + "/data/TestApp")
+        Folder.copy(Context.current().test_run_home + "/" + cls.app_name,
+                    Context.current().test_run_home + "/data/TestApp")
 
     @classmethod
     def tearDownClass(cls):
         BaseClass.tearDownClass()
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
 
     def setUp(self):
         BaseClass.setUp(self)
         Xcode.cleanup_cache()
         Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
+        Folder.copy(Context.current().test_run_home + "/data/TestApp", Context.current().test_run_home + "/TestApp")
 
     def test_100_plugin_add_xcconfig_before_platform_add_ios(self):
-        plugin_path = TEST_RUN_HOME + "/data/CocoaPods/xcconfig-plugin.tgz"
+        plugin_path = Context.current().test_run_home + "/data/CocoaPods/xcconfig-plugin.tgz"
         output = Tns.plugin_add(plugin_path, attributes={"--path": self.app_name}, assert_success=False)
         assert "Successfully installed plugin xcconfig-plugin." in output
         assert File.exists(self.app_name + "/node_modules/xcconfig-plugin/package.json")
@@ -54,7 +56,7 @@ class PluginsiOSXcconfigTests(BaseClass):
     def test_202_plugin_add_xcconfig_after_platform_add_ios(self):
         Tns.platform_add_ios(attributes={"--path": self.app_name, "--frameworkPath": IOS_PACKAGE})
 
-        plugin_path = TEST_RUN_HOME + "/data/CocoaPods/xcconfig-plugin.tgz"
+        plugin_path = Context.current().test_run_home + "/data/CocoaPods/xcconfig-plugin.tgz"
         output = Tns.plugin_add(plugin_path, attributes={"--path": self.app_name}, assert_success=False)
         assert "Successfully installed plugin xcconfig-plugin." in output
         assert File.exists(self.app_name + "/node_modules/xcconfig-plugin/package.json")
@@ -10,8 +10,8 @@ from core.device.simulator import Simulator
 from core.osutils.command import run
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, CURRENT_OS, OSType, TEST_RUN_HOME, ANDROID_PACKAGE, \
-    PROVISIONING
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE, CURRENT_OS, OSType, ANDROID_PACKAGE, PROVISIONING
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -29,17 +29,18 @@ class PrepareiOSTests(BaseClass):
             Simulator.stop()
         Tns.create_app(cls.app_name)
         Tns.platform_add_ios(attributes={"--path": cls.app_name, "--frameworkPath": IOS_PACKAGE})
-        Folder.copy(TEST_RUN_HOME + "/" + cls.app_name, TEST_RUN_HOME + "/data/TestApp")
+        Folder.copy(Context.current().test_run_home + "/" + cls.app_name,
+                    Context.current().test_run_home + "/data/TestApp")
 
     @classmethod
     def tearDownClass(cls):
         BaseClass.tearDownClass()
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
 
     def setUp(self):
         BaseClass.setUp(self)
         Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
+        Folder.copy(Context.current().test_run_home + "/data/TestApp", Context.current().test_run_home + "/TestApp")
 
     def tearDown(self):
         assert not Simulator.is_running()[0], 'iOS Simulator started after prepare!'
@@ -104,13 +105,15 @@ class PrepareiOSTests(BaseClass):
 
     def test_220_build_ios_with_custom_plist(self):
         # Update Info.plist
-        src_file = os.path.join(TEST_RUN_HOME, 'data', 'Info.plist')
-        target_file = os.path.join(TEST_RUN_HOME, self.app_name, 'app', 'App_Resources', 'iOS', 'Info.plist')
+        src_file = os.path.join(Context.current().test_run_home, 'data', 'Info.plist')
+        target_file = os.path.join(Context.current().test_run_home, self.app_name, 'app', 'App_Resources', 'iOS',
+                                   'Info.plist')
         File.remove(target_file)
         File.copy(src=src_file, dest=target_file)
 
         # Prepare in debug
-        final_plist = os.path.join(TEST_RUN_HOME, self.app_name, 'platforms', 'ios', 'TestApp', 'TestApp-Info.plist')
+        final_plist = os.path.join(Context.current().test_run_home, self.app_name, 'platforms', 'ios', 'TestApp',
+                                   'TestApp-Info.plist')
         Tns.prepare_ios(attributes={"--path": self.app_name})
         assert "<string>fbXXXXXXXXX</string>" in File.read(final_plist)
         assert "<string>orgnativescriptTestApp</string>" in File.read(final_plist)
@@ -25,7 +25,8 @@ from core.device.emulator import Emulator
 from core.device.helpers.adb import Adb
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import ANDROID_PACKAGE, EMULATOR_ID
+from core.settings.context import Context
+from core.settings.settings import ANDROID_PACKAGE
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -129,7 +130,7 @@ class RunAndroidDeviceTests(BaseClass):
             attributes={'--path': self.app_name, '--timeout': '180', '--emulator': '', '--justlaunch': ''},
             assert_success=False)
         assert 'Starting Android emulator with image' in output
-        assert Emulator.wait(device_id=EMULATOR_ID), 'Emulator not started by `tns run android`!'
+        assert Emulator.wait(device_id=Context.current().emulator_id), 'Emulator not started by `tns run android`!'
 
     def test_310_tns_run_android_emulator_should_run_only_on_emulator(self):
         """
@@ -140,6 +141,6 @@ class RunAndroidDeviceTests(BaseClass):
         output = Tns.run_android(attributes={'--path': self.app_name, '--emulator': '', '--justlaunch': ''},
                                  assert_success=False)
         assert 'Starting Android emulator with image' not in output
-        assert EMULATOR_ID in output
+        assert Context.current().emulator_id in output
         for device_id in self.DEVICES:
             assert device_id not in output, 'Application is deployed on {0} device.'.format(device_id)
\ No newline at end of file
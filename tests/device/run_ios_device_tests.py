@@ -27,7 +27,8 @@ from core.device.emulator import Emulator
 from core.device.simulator import Simulator
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, SIMULATOR_NAME, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -39,7 +40,7 @@ class RunIOSDeviceTests(BaseClass):
     SIMULATOR_ID = ''
     DEVICES = Device.get_ids(platform=Platform.IOS)
     DEVICE_ID = Device.get_id(platform=Platform.IOS)
-    TEMP_FOLDER = os.path.join(TEST_RUN_HOME, 'out',
+    TEMP_FOLDER = os.path.join(Context.current().output_folder,
                                'livesync-hello-world_app_' + datetime.now().strftime('%Y_%m_%d_%H_%M_%S'))
 
     @classmethod
@@ -119,7 +120,7 @@ class RunIOSDeviceTests(BaseClass):
         """
         `tns run ios --emulator` should start emulator even if physical device is connected
         """
-        self.SIMULATOR_ID = Simulator.ensure_available(simulator_name=SIMULATOR_NAME)
+        self.SIMULATOR_ID = Simulator.ensure_available(simulator_name=Context.current().simulator_name)
         output = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--justlaunch': ''},
                              assert_success=False)
         TnsAsserts.prepared(app_name=self.app_name, output=output, platform=Platform.IOS, prepare=Prepare.INCREMENTAL)
@@ -15,7 +15,8 @@ from core.device.emulator import Emulator
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.os_type import OSType
-from core.settings.settings import ANDROID_PACKAGE, EMULATOR_ID, EMULATOR_NAME, CURRENT_OS
+from core.settings.context import Context
+from core.settings.settings import ANDROID_PACKAGE, EMULATOR_NAME, CURRENT_OS
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -68,10 +69,11 @@ class RunAndroidEmulatorTestsNG(BaseClass):
         File.copy(src=source_xml, dest=target_xml)
 
         # Verify the app is running
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
         strings = ['Project successfully built',
-                   'Successfully installed on device with identifier', EMULATOR_ID,
+                   'Successfully installed on device with identifier', Context.current().emulator_id,
                    'Successfully synced application']
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=180, check_interval=10)
 
@@ -88,7 +90,8 @@ class RunAndroidEmulatorTestsNG(BaseClass):
         File.copy(src=source, dest=target)
 
         # `tns run android` and wait until app is deployed
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
 
         # Verify the app is running
@@ -99,7 +102,7 @@ class RunAndroidEmulatorTestsNG(BaseClass):
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=180, check_interval=10, clean_log=False)
 
         # Verify initial state of the app
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image='ng-hello-world-home-white', tolerance=5.0)
 
         # Verify console.time() works
@@ -29,8 +29,9 @@ from core.osutils.command_log_level import CommandLogLevel
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.os_type import OSType
+from core.settings.context import Context
 from core.settings.settings import ANDROID_PACKAGE, ANDROID_KEYSTORE_PATH, ANDROID_KEYSTORE_PASS, \
-    ANDROID_KEYSTORE_ALIAS, ANDROID_KEYSTORE_ALIAS_PASS, EMULATOR_ID, EMULATOR_NAME, CURRENT_OS, TEST_RUN_HOME
+    ANDROID_KEYSTORE_ALIAS, ANDROID_KEYSTORE_ALIAS_PASS, EMULATOR_NAME, CURRENT_OS
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -39,8 +40,8 @@ from core.tns.tns_verifications import TnsAsserts
 
 
 class RunAndroidEmulatorTests(BaseClass):
-    source_app = os.path.join(TEST_RUN_HOME, BaseClass.app_name)
-    temp_app = os.path.join(TEST_RUN_HOME, 'data', BaseClass.app_name)
+    source_app = os.path.join(Context.current().test_run_home, BaseClass.app_name)
+    temp_app = os.path.join(Context.current().test_run_home, 'data', BaseClass.app_name)
     one_hundred_symbols_string = "123456789012345678901234567890123456789012345678901234567890" \
                                  "1234567890123456789012345678901234567890"
     very_long_string = ''
@@ -103,10 +104,11 @@ class RunAndroidEmulatorTests(BaseClass):
         target_js = os.path.join(self.app_name, 'app', 'main-page.js')
         File.copy(src=source_js, dest=target_js)
 
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
         strings = ['Project successfully built',
-                   'Successfully installed on device with identifier', EMULATOR_ID,
+                   'Successfully installed on device with identifier', Context.current().emulator_id,
                    'Successfully synced application',
                    "true",
                    "false",
@@ -150,10 +152,11 @@ class RunAndroidEmulatorTests(BaseClass):
         target_js = os.path.join(self.app_name, 'app', 'main-page.js')
         File.copy(src=source_js, dest=target_js)
 
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
         strings = ['Project successfully built',
-                   'Successfully installed on device with identifier', EMULATOR_ID,
+                   'Successfully installed on device with identifier', Context.current().emulator_id,
                    'Successfully synced application',
                    "true",
                    "false",
@@ -189,15 +192,16 @@ class RunAndroidEmulatorTests(BaseClass):
         File.copy(src=source, dest=target)
 
         # `tns run android` and wait until app is deployed
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
         strings = ['Project successfully built',
-                   'Successfully installed on device with identifier', EMULATOR_ID,
+                   'Successfully installed on device with identifier', Context.current().emulator_id,
                    'Successfully synced application']
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=180, check_interval=10)
 
         # Verify app looks correct inside emulator
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image='livesync-hello-world_home')
 
     def test_370_tns_run_android_with_jar_and_aar_files_in_app_res(self):
@@ -224,13 +228,14 @@ class RunAndroidEmulatorTests(BaseClass):
         File.copy(src=source, dest=target)
 
         # `tns run android` and wait until app is deployed
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID}, wait=False,
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id},
+                              wait=False,
                               assert_success=False)
         strings = ['Project successfully built',
-                   'Successfully installed on device with identifier', EMULATOR_ID,
+                   'Successfully installed on device with identifier', Context.current().emulator_id,
                    'Successfully synced application']
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=180, check_interval=10)
 
         # Verify app looks correct inside emulator
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image='livesync-hello-world_home')
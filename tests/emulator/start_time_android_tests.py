@@ -0,0 +1,41 @@
+"""
+Benchmark of Android application start time.
+
+Cold and warm start of default template app are measured several times and results are appended to history
+in START_TIME_FOLDER (see `core.device.helpers.start_time.StartTime`), so start time can be compared between runs.
+"""
+
+import os
+
+from core.base_class.BaseClass import BaseClass
+from core.device.device import Device
+from core.device.emulator import Emulator
+from core.device.helpers.start_time import StartTime
+from core.settings.context import Context
+from core.tns.app_cache import AppCache
+from core.tns.tns import Tns
+from core.tns.tns_platform_type import Platform
+from core.tns.tns_verifications import TnsAsserts
+
+
+class StartTimeAndroidTests(BaseClass):
+    app_id = 'org.nativescript.TestApp'
+    runs = 10
+
+    @classmethod
+    def setUpClass(cls):
+        BaseClass.setUpClass(cls.__name__)
+        Emulator.ensure_available()
+        Device.uninstall_app(app_prefix="org.nativescript.", platform=Platform.ANDROID)
+        AppCache.create_app(cls.app_name)
+        Tns.build_android(attributes={'--path': cls.app_name})
+        apk = os.path.join(cls.app_name, TnsAsserts.PLATFORM_ANDROID_APK_DEBUG_PATH, 'app-debug.apk')
+        Device.install_app(app_file_path=apk, device_id=Context.current().emulator_id)
+
+    def test_001_start_time_benchmark(self):
+        report = StartTime.benchmark(device_id=Context.current().emulator_id, app_id=self.app_id, runs=self.runs,
+                                     name='template-hello-world')
+        for mode in ('cold', 'warm'):
+            stats = report[mode]['total_time']
+            assert stats['count'] == self.runs, 'Start time is not reported for all {0} starts.'.format(mode)
+            assert stats['median'] > 0, 'Invalid {0} start time: {1}'.format(mode, stats)
@@ -6,7 +6,8 @@ from core.device.device import Device
 from core.device.emulator import Emulator
 from core.device.helpers.adb import Adb
 from core.osutils.file import File
-from core.settings.settings import EMULATOR_ID, ANDROID_PACKAGE, WEBPACK_PACKAGE, EMULATOR_NAME
+from core.settings.context import Context
+from core.settings.settings import ANDROID_PACKAGE, WEBPACK_PACKAGE, EMULATOR_NAME
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -44,8 +45,9 @@ class HelloWorldJSHMRAndroid(BaseClass):
         BaseClass.tearDownClass()
 
     def test_001_android_run_hmr(self):
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                        assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                        assert_success=False, handle=True)
 
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr, not_existing_string_list=HelpersHMR.errors_hmr,
                          timeout=240)
@@ -55,8 +57,9 @@ class HelloWorldJSHMRAndroid(BaseClass):
         HelpersHMR.revert_changes(app_name=self.app_name, log=log, platform=Platform.ANDROID)
 
     def test_002_android_run_hmr_uninstall_app(self):
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                        assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                        assert_success=False, handle=True)
 
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr_with_platforms, not_existing_string_list=HelpersHMR.errors_hmr,
                          timeout=240)
@@ -75,13 +78,14 @@ class HelloWorldJSHMRAndroid(BaseClass):
 
     @unittest.skip("https://github.com/NativeScript/nativescript-cli/issues/4123")
     def test_003_android_run_hmr_wrong_xml(self):
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                              assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                              assert_success=False, handle=True)
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr,
                          not_existing_string_list=HelpersHMR.errors_hmr, timeout=240)
 
         # Verify app looks correct inside emulator
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image=HelpersHMR.image_original)
 
         # Break the app with invalid xml changes
@@ -89,18 +93,20 @@ class HelloWorldJSHMRAndroid(BaseClass):
 
         # Verify console notify user for broken xml
         # strings = ['for activity org.nativescript.TestApp / com.tns.ErrorReportActivity']
-        strings = ['com.tns.NativeScriptException', 'Parsing XML at', 'Successfully synced application', EMULATOR_ID]
+        strings = ['com.tns.NativeScriptException', 'Parsing XML at', 'Successfully synced application',
+                   Context.current().emulator_id]
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=120, check_interval=10)
-        assert Adb.wait_for_text(device_id=EMULATOR_ID, text="Exception", timeout=30), "Error activity not found!"
+        assert Adb.wait_for_text(device_id=Context.current().emulator_id, text="Exception",
+                                 timeout=30), "Error activity not found!"
 
         # Revert changes
         ReplaceHelper.rollback(self.app_name, ReplaceHelper.CHANGE_XML_INVALID_SYNTAX)
         strings = ['JS: HMR: Hot Module Replacement Enabled. Waiting for signal.',
-                   'Successfully synced application', EMULATOR_ID]
+                   'Successfully synced application', Context.current().emulator_id]
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=120, check_interval=10)
 
         # Verify app looks correct inside emulator
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image=HelpersHMR.image_original)
 
     def test_008_android_run_hmr_console_log(self):
@@ -108,20 +114,22 @@ class HelloWorldJSHMRAndroid(BaseClass):
         target_js = os.path.join(self.app_name, 'app', 'main-view-model.js')
         File.copy(src=source_js, dest=target_js)
 
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                              assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                              assert_success=False, handle=True)
 
         strings = ['LOG Hello']
         Tns.wait_for_log(log_file=log, string_list=strings, timeout=120, check_interval=10)
 
         # Verify app looks correct inside emulator
-        Device.screen_match(device_name=EMULATOR_NAME, device_id=EMULATOR_ID,
+        Device.screen_match(device_name=EMULATOR_NAME, device_id=Context.current().emulator_id,
                             expected_image=HelpersHMR.image_original)
 
     @unittest.skip("Don't clear behavior")
     def test_009_android_run_hmr_delete_file(self):
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                        assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                        assert_success=False, handle=True)
 
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.wp_run, not_existing_string_list=HelpersHMR.wp_errors,
                          timeout=240)
@@ -4,7 +4,8 @@ import unittest
 from core.base_class.BaseClass import BaseClass
 from core.device.simulator import Simulator
 from core.osutils.file import File
-from core.settings.settings import IOS_PACKAGE, SIMULATOR_NAME, WEBPACK_PACKAGE, EMULATOR_ID
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE, WEBPACK_PACKAGE
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
 from tests.hmr.helpers_hmr import HelpersHMR
@@ -21,7 +22,7 @@ class HelloWorldJSHMRIOS(BaseClass):
     def setUpClass(cls):
         BaseClass.setUpClass(cls.__name__)
         Simulator.stop()
-        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=SIMULATOR_NAME)
+        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=Context.current().simulator_name)
 
         Tns.create_app(cls.app_name, update_modules=True)
         Tns.install_npm(package=WEBPACK_PACKAGE, option='--save-dev', folder=cls.app_name)
@@ -41,7 +42,7 @@ class HelloWorldJSHMRIOS(BaseClass):
 
     def test_001_ios_run_hmr(self):
         log = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--hmr': ''}, wait=False,
-                        assert_success=False)
+                        assert_success=False, handle=True)
 
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr, not_existing_string_list=HelpersHMR.errors_hmr,
                          timeout=240)
@@ -57,7 +58,7 @@ class HelloWorldJSHMRIOS(BaseClass):
 
     def test_002_ios_run_hmr_uninstall_app(self):
         log = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--hmr': ''}, wait=False,
-                            assert_success=False)
+                            assert_success=False, handle=True)
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr_with_platforms, not_existing_string_list=HelpersHMR.errors_hmr,
                          timeout=240)
         Helpers.ios_screen_match(sim_id=self.SIMULATOR_ID, image=HelpersHMR.image_original, timeout=120)
@@ -78,7 +79,7 @@ class HelloWorldJSHMRIOS(BaseClass):
     @unittest.skip("https://github.com/NativeScript/nativescript-cli/issues/4123")
     def test_003_ios_run_hmr_wrong_xml(self):
         log = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--hmr': ''}, wait=False,
-                            assert_success=False)
+                            assert_success=False, handle=True)
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.run_hmr_with_platforms, not_existing_string_list=HelpersHMR.errors_hmr,
                          timeout=240)
         Helpers.ios_screen_match(sim_id=self.SIMULATOR_ID, image=HelpersHMR.image_original, timeout=120)
@@ -99,7 +100,7 @@ class HelloWorldJSHMRIOS(BaseClass):
         File.copy(src=source_js, dest=target_js)
 
         log = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--hmr': ''}, wait=False,
-                                assert_success=False)
+                                assert_success=False, handle=True)
         strings = ['LOG Hello']
         Tns.wait_for_log(log_file=log, string_list=strings)
 
@@ -107,8 +108,9 @@ class HelloWorldJSHMRIOS(BaseClass):
 
     @unittest.skip("Don't clear behavior")
     def test_004_android_run_hmr_delete_file(self):
-        log = Tns.run_android(attributes={'--path': self.app_name, '--device': EMULATOR_ID, '--hmr': ''}, wait=False,
-                        assert_success=False)
+        log = Tns.run_android(attributes={'--path': self.app_name, '--device': Context.current().emulator_id,
+                                          '--hmr': ''}, wait=False,
+                        assert_success=False, handle=True)
 
         Tns.wait_for_log(log_file=log, string_list=HelpersHMR.wp_run, not_existing_string_list=HelpersHMR.wp_errors,
                          timeout=240)
@@ -7,7 +7,8 @@ from core.device.helpers.adb import Adb
 from core.osutils.file import File
 from core.osutils.os_type import OSType
 from core.osutils.process import Process
-from core.settings.settings import EMULATOR_ID, EMULATOR_NAME, SIMULATOR_NAME, TEST_RUN_HOME, CURRENT_OS
+from core.settings.context import Context
+from core.settings.settings import EMULATOR_NAME, CURRENT_OS
 from core.tns.tns import Tns
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns_platform_type import Platform
@@ -54,7 +55,8 @@ class HelpersHMR(object):
         #            'JS: HMR: Successfully applied update with hmr hash {0}'.format(hashlib.sha1)]
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='42 clicks left', timeout=20)
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='42 clicks left',
+                                                timeout=20)
             assert text_changed, 'Changes in JS file not applied (UI is not refreshed).'
 
         ReplaceHelper.replace(app_name, HelpersHMR.xml_change, sleep=10)
@@ -62,7 +64,7 @@ class HelpersHMR(object):
                    './main-page.xml', 'HMR: Successfully applied update with hmr hash']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='TEST')
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='TEST')
             assert text_changed, 'Changes in XML file not applied (UI is not refreshed).'
 
         ReplaceHelper.replace(app_name, HelpersHMR.css_change, sleep=10)
@@ -88,7 +90,8 @@ class HelpersHMR(object):
                    'HMR: Successfully applied update with hmr hash ']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='42 clicks left', timeout=20)
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='42 clicks left',
+                                                timeout=20)
             assert text_changed, 'Changes in JS file not applied (UI is not refreshed).'
 
     @staticmethod
@@ -98,7 +101,7 @@ class HelpersHMR(object):
         strings = ['Refreshing application on device', 'JS: HMR: Hot Module Replacement Enabled. Waiting for signal.']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='TEST')
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='TEST')
             assert text_changed, 'Changes in XML file not applied (UI is not refreshed).'
 
     @staticmethod
@@ -108,7 +111,8 @@ class HelpersHMR(object):
         strings = ['Refreshing application on device', 'HMR: Hot Module Replacement Enabled. Waiting for signal.']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='42 taps left', timeout=20)
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='42 taps left',
+                                                timeout=20)
             assert text_changed, 'Changes in JS file not applied (UI is not refreshed)'
 
     @staticmethod
@@ -118,14 +122,14 @@ class HelpersHMR(object):
         strings = ['Refreshing application on device', 'HMR: Checking for updates to the bundle with hmr hash']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='TAP')
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='TAP')
             assert text_changed, 'Changes in XML file not applied (UI is not refreshed).'
 
     @staticmethod
     def revert_changes(app_name, log, platform):
         # Clean old logs
         if CURRENT_OS is not OSType.WINDOWS:
-            File.write(file_path=log, text="")
+            File.write(file_path=log.log_file, text="")
 
         # Revert XML changes
         ReplaceHelper.rollback(app_name, HelpersHMR.xml_change, sleep=10)
@@ -133,7 +137,7 @@ class HelpersHMR(object):
                    'HMR: Checking for updates to the bundle with hmr hash']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='TAP')
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='TAP')
             assert text_changed, 'Changes in XML file not applied (UI is not refreshed).'
 
         # Revert JS changes
@@ -142,7 +146,8 @@ class HelpersHMR(object):
                    'Successfully transferred bundle.', 'HMR: Successfully applied update with hmr hash ']
         Tns.wait_for_log(log_file=log, string_list=strings)
         if platform == Platform.ANDROID:
-            text_changed = Device.wait_for_text(device_id=EMULATOR_ID, text='42 taps left', timeout=20)
+            text_changed = Device.wait_for_text(device_id=Context.current().emulator_id, text='42 taps left',
+                                                timeout=20)
             assert text_changed, 'HMR: The following modules were updated:'
 
         # Revert CSS changes
@@ -12,7 +12,8 @@ from core.npm.npm import Npm
 from core.osutils.file import File
 from core.osutils.folder import Folder
 from core.osutils.process import Process
-from core.settings.settings import IOS_PACKAGE, IOS_INSPECTOR_PACKAGE, SIMULATOR_NAME, USE_YARN
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE, IOS_INSPECTOR_PACKAGE, USE_YARN
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -31,7 +32,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         Process.kill('NativeScript Inspector')
         Emulator.stop()
         Simulator.stop()
-        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=SIMULATOR_NAME)
+        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=Context.current().simulator_name)
         Folder.cleanup(cls.INSPECTOR_GLOBAL_PATH)
         Tns.create_app(cls.app_name,
                        attributes={'--template': os.path.join('data', 'apps', 'livesync-hello-world.tgz')},
@@ -83,7 +84,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         DebugiOSInspectorSimulatorTests.__verify_debugger_attach(log)
 
         # Verify app starts and do not stop on first line of code
-        Device.screen_match(device_name=SIMULATOR_NAME,
+        Device.screen_match(device_name=Context.current().simulator_name,
                             device_id=self.SIMULATOR_ID, expected_image='livesync-hello-world_home')
 
     def test_002_debug_ios_simulator_debug_brk(self):
@@ -98,7 +99,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         # '--debug-brk' stops before app loaded.
 
         # Verify app starts and do not stop on first line of code
-        Device.screen_match(device_name=SIMULATOR_NAME, tolerance=3.0, device_id=self.SIMULATOR_ID,
+        Device.screen_match(device_name=Context.current().simulator_name, tolerance=3.0, device_id=self.SIMULATOR_ID,
                             expected_image='livesync-hello-world_debug_brk')
 
     def test_003_debug_ios_simulator_start(self):
@@ -110,7 +111,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         log = Tns.run_ios(attributes={'--path': self.app_name, '--emulator': '', '--justlaunch': ''},
                           assert_success=False, timeout=30)
         TnsAsserts.prepared(app_name=self.app_name, platform=Platform.IOS, output=log, prepare=Prepare.SKIP)
-        Device.screen_match(device_name=SIMULATOR_NAME, device_id=self.SIMULATOR_ID,
+        Device.screen_match(device_name=Context.current().simulator_name, device_id=self.SIMULATOR_ID,
                             expected_image='livesync-hello-world_home')
 
         # Attach debugger
@@ -126,7 +127,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         DebugiOSInspectorSimulatorTests.__verify_debugger_attach(log)
 
         # Verify app starts and do not stop on first line of code
-        Device.screen_match(device_name=SIMULATOR_NAME,
+        Device.screen_match(device_name=Context.current().simulator_name,
                             device_id=self.SIMULATOR_ID, expected_image='livesync-hello-world_home')
 
         # Change JS and wait until app is synced
@@ -147,7 +148,7 @@ class DebugiOSInspectorSimulatorTests(BaseClass):
         Tns.wait_for_log(log_file=log, string_list=strings)
 
         # Verify application looks correct
-        Device.screen_match(device_name=SIMULATOR_NAME, device_id=self.SIMULATOR_ID,
+        Device.screen_match(device_name=Context.current().simulator_name, device_id=self.SIMULATOR_ID,
                             expected_image='livesync-hello-world_js_css_xml', tolerance=0.26)
 
         assert Process.is_running('NativeScript Inspector')
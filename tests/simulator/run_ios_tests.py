@@ -23,7 +23,8 @@ from core.device.emulator import Emulator
 from core.device.simulator import Simulator
 from core.osutils.file import File
 from core.osutils.folder import Folder
-from core.settings.settings import IOS_PACKAGE, SIMULATOR_NAME, TEST_RUN_HOME
+from core.settings.context import Context
+from core.settings.settings import IOS_PACKAGE
 from core.tns.replace_helper import ReplaceHelper
 from core.tns.tns import Tns
 from core.tns.tns_platform_type import Platform
@@ -44,27 +45,28 @@ class RunIOSSimulatorTests(BaseClass):
         max_long_string = max_long_string + one_hundred_symbols_string
     max_long_string = max_long_string + "12345678901234567890123456789012345678901234567890123456789012345678901"
                                         
-    plugin_path = os.path.join(TEST_RUN_HOME, 'data', 'plugins', 'sample-plugin', 'src')
+    plugin_path = os.path.join(Context.current().test_run_home, 'data', 'plugins', 'sample-plugin', 'src')
 
     @classmethod
     def setUpClass(cls):
         BaseClass.setUpClass(cls.__name__)
         Emulator.stop()
         Simulator.stop()
-        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=SIMULATOR_NAME)
+        cls.SIMULATOR_ID = Simulator.ensure_available(simulator_name=Context.current().simulator_name)
         Folder.cleanup(cls.app_name)
         Tns.create_app(cls.app_name,
                        attributes={'--template': os.path.join('data', 'apps', 'livesync-hello-world.tgz')},
                        update_modules=True)
         Tns.platform_add_ios(attributes={'--path': cls.app_name, '--frameworkPath': IOS_PACKAGE})
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
-        Folder.copy(TEST_RUN_HOME + "/" + cls.app_name, TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
+        Folder.copy(Context.current().test_run_home + "/" + cls.app_name,
+                    Context.current().test_run_home + "/data/TestApp")
 
     def setUp(self):
         BaseClass.setUp(self)
-        self.SIMULATOR_ID = Simulator.ensure_available(simulator_name=SIMULATOR_NAME)
+        self.SIMULATOR_ID = Simulator.ensure_available(simulator_name=Context.current().simulator_name)
         Folder.cleanup(self.app_name)
-        Folder.copy(TEST_RUN_HOME + "/data/TestApp", TEST_RUN_HOME + "/TestApp")
+        Folder.copy(Context.current().test_run_home + "/data/TestApp", Context.current().test_run_home + "/TestApp")
 
     def tearDown(self):
         Tns.kill()
@@ -74,7 +76,7 @@ class RunIOSSimulatorTests(BaseClass):
     def tearDownClass(cls):
         BaseClass.tearDownClass()
         Emulator.stop()
-        Folder.cleanup(TEST_RUN_HOME + "/data/TestApp")
+        Folder.cleanup(Context.current().test_run_home + "/data/TestApp")
 
     def test_180_tns_run_ios_console_log(self):
         """